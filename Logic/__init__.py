@@ -1,4 +1,5 @@
 from .core import *
+from .services import *
 from .utils import *
 
 
@@ -1,26 +1,60 @@
-import hashlib
 import itertools
 import random
+import zlib
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
 
 import numpy as np
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+# the offset basis and the prime of the 64 bit FNV-1a hash
+fnv_offset = np.uint64(0xcbf29ce484222325)
+fnv_prime = np.uint64(0x100000001b3)
+
 
 class MinHashLSH:
-    def __init__(self, documents, num_hashes):
+    # a Mersenne prime, so (a * x + b) of the 31 bit hashes fits in 64 bits
+    prime = 2 ** 31 - 1
+    # the number of shingles that are hashed at once, it bounds the memory to batch_size * num_hashes integers
+    batch_size = 100000
+
+    def __init__(self, documents, num_hashes, seed=None, k=2, words=False, chunk_size=10000):
         """
         Initialize the MinHashLSH
 
+        The permutations of the min-hashing are the hash functions (a * x + b) mod p of the shingle
+        hashes, with random a and b.
+
         Parameters
         ----------
-        documents : list of str
-            The input documents for similarity analysis.
+        documents : iterable of str
+            The input documents for similarity analysis. They are read chunk_size at a time, so
+            they can be a generator over a corpus that does not fit in memory.
         num_hashes : int
             Number of hashes for mini-hashing.
+        seed : int
+            The seed of the hash functions.
+        k : int
+            The size of each shingle.
+        words : bool
+            Make the shingles of k words instead of k characters.
+        chunk_size : int
+            The number of documents that are shingled at once.
         """
         self.documents = documents
         self.num_hashes = num_hashes
-
-    def shingle_document(self, document, k=2):
+        self.k = k
+        self.words = words
+        self.chunk_size = chunk_size
+        generator = np.random.default_rng(seed)
+        self.a = generator.integers(1, self.prime, size=num_hashes, dtype=np.int64)
+        self.b = generator.integers(0, self.prime, size=num_hashes, dtype=np.int64)
+
+    def shingle_document(self, document, k=2, words=False):
         """
         Convert a document into a set of shingles.
 
@@ -30,57 +64,166 @@ class MinHashLSH:
             The input document.
         k : int
             The size of each shingle.
+        words : bool
+            Make the shingles of k words instead of k characters.
 
         Returns
         ----------
         set
             A set of shingles.
         """
+        if words:
+            tokens = document.split()
+            return {' '.join(tokens[i:i+k]) for i in range(len(tokens) - k + 1)}
         shingles = {document[i:i+k] for i in range(len(document) - k + 1)}
         return shingles
 
+    def hash_shingles(self, shingles):
+        """
+        Hash the shingles of a document to integers below the prime.
+
+        Parameters
+        ----------
+        shingles : set
+            A set of shingles.
+
+        Returns
+        ----------
+        numpy.ndarray
+            The hashes of the shingles.
+        """
+        return np.fromiter(
+            (zlib.crc32(shingle.encode('utf8')) % self.prime for shingle in shingles),
+            dtype=np.int64, count=len(shingles),
+        )
+
+    def hash_documents(self, documents):
+        """
+        Hash the shingles of documents into the buffers of a sparse row for every document.
+
+        Parameters
+        ----------
+        documents : list of str
+            The input documents.
+
+        Returns
+        ----------
+        tuple of numpy.ndarray
+            (indices, indptr) where the shingle hashes of document i are indices[indptr[i]:indptr[i + 1]].
+        """
+        hashes = [self.hash_shingles(self.shingle_document(doc, self.k, self.words)) for doc in documents]
+        indptr = np.zeros(len(hashes) + 1, dtype=np.int64)
+        np.cumsum([len(doc_hashes) for doc_hashes in hashes], out=indptr[1:])
+        indices = np.concatenate(hashes) if hashes else np.zeros(0, dtype=np.int64)
+        return indices, indptr
+
+    def iter_hashed_chunks(self):
+        """
+        Hash the documents chunk_size at a time.
+
+        Yields
+        ----------
+        tuple of numpy.ndarray
+            The (indices, indptr) of a chunk of documents, as returned by hash_documents.
+        """
+        documents = iter(self.documents)
+        while chunk := list(itertools.islice(documents, self.chunk_size)):
+            yield self.hash_documents(chunk)
+
+    def iter_characteristic_matrices(self):
+        """
+        Build the characteristic matrix of the documents chunk_size documents at a time.
+
+        Yields
+        ----------
+        scipy.sparse.csr_matrix
+            The binary characteristic matrix of a chunk, with a row for every document and a column
+            for every shingle hash. It is the transpose of the shingles by documents matrix.
+        """
+        if sparse is None:
+            raise ImportError('scipy is needed to build the sparse characteristic matrix')
+        for indices, indptr in self.iter_hashed_chunks():
+            data = np.ones(len(indices), dtype=np.bool_)
+            yield sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, self.prime))
+
     def build_characteristic_matrix(self):
         """
         Build the characteristic matrix representing the presence of shingles in documents.
 
         Returns
         ----------
-        numpy.ndarray
-            The binary characteristic matrix.
+        scipy.sparse.csr_matrix
+            The binary characteristic matrix, with a row for every document and a column for every
+            shingle hash.
         """
         #* DONE
-        shingles = np.array([self.shingle_document(doc) for doc in self.documents])
-        shingles_sum = np.unique(shingles.flatten())
-        matrix = np.zeros(shape=(shingles_sum.shape[0], len(self.documents)))
-        for i, shingle in enumerate(shingles_sum):
-            matrix[i,:] = np.isin(shingle, shingles)
-        return matrix
+        matrices = list(self.iter_characteristic_matrices())
+        if not matrices:
+            return sparse.csr_matrix((0, self.prime), dtype=np.bool_)
+        return sparse.vstack(matrices, format='csr')
 
     def min_hash_signature(self):
         """
         Perform Min-Hashing to generate hash signatures for documents.
 
+        The signatures are found from the hashed shingles of the documents, chunk by chunk,
+        without a dense characteristic matrix.
+
         Returns
         ----------
         numpy.ndarray
             The Min-Hash signatures matrix.
         """
         #* DONE
+        signatures = [self.signatures_of_hashes(indices, indptr) for indices, indptr in self.iter_hashed_chunks()]
+        if not signatures:
+            return np.zeros((self.num_hashes, 0), dtype=np.int64)
+        return np.hstack(signatures)
+
+    def signatures_of_hashes(self, indices, indptr):
+        """
+        Find the Min-Hash signatures of documents from the hashes of their shingles.
+
+        The documents are taken in batches of about batch_size shingles, and every batch is
+        hashed by all the hash functions at once. A document without shingles has the prime
+        as all its signature.
 
-        c_matrix = self.build_characteristic_matrix()
-        sig_matrix = np.full((self.num_hashes, len(self.documents)), np.inf)
-        for row in range(sig_matrix.shape[0]):
-            perm = np.random.permutation(c_matrix.shape[0])
-            for col in range(sig_matrix.shape[1]):
-                ones = np.where(c_matrix[:,col])
-                sig_matrix[row, col] = np.min(np.intersect1d(perm, ones))
+        Parameters
+        ----------
+        indices : numpy.ndarray
+            The shingle hashes of all the documents.
+        indptr : numpy.ndarray
+            The shingle hashes of document i are indices[indptr[i]:indptr[i + 1]], as in the rows of
+            the sparse characteristic matrix.
 
-        return sig_matrix
+        Returns
+        ----------
+        numpy.ndarray
+            The Min-Hash signatures matrix, with a column for every document.
+        """
+        count = len(indptr) - 1
+        lengths = np.diff(indptr)
+        signature = np.full((self.num_hashes, count), self.prime, dtype=np.int64)
+        start = 0
+        while start < count:
+            # the documents that fit in a batch, and at least one
+            end = max(int(np.searchsorted(indptr, indptr[start] + self.batch_size, side='right')) - 1, start + 1)
+            rows = start + np.flatnonzero(lengths[start:end])
+            if len(rows):
+                values = indices[indptr[start]:indptr[end]]
+                permuted = (np.outer(self.a, values) + self.b[:, None]) % self.prime
+                # the empty documents are skipped, so every segment ends where the next one starts
+                signature[:, rows] = np.minimum.reduceat(permuted, indptr[rows] - indptr[start], axis=1)
+            start = end
+        return signature
 
     def lsh_buckets(self, signature, bands=10, rows_per_band=10):
         """
         Group documents into Locality-Sensitive Hashing (LSH) buckets based on Min-Hash signatures.
 
+        The band of every document is hashed to an integer at once, and the documents of a band
+        are sorted by their hashes so the buckets are the runs of equal hashes.
+
         Parameters
         ----------
         signature : numpy.ndarray
@@ -93,22 +236,52 @@ class MinHashLSH:
         Returns
         ----------
         dict
-            A dictionary mapping bucket IDs to lists of document indices.
+            A dictionary mapping bucket IDs to lists of document indices. Only the buckets of more
+            than one document are kept.
         """
         #* DONE
         if bands * rows_per_band != self.num_hashes:
             raise ValueError("number of hashes must be equal to number of bands times rows_per_band")
-        
-        buckets = defaultdict(list)
 
-        for doc in range(signature.shape[1]):
-            for band in range(bands):
-                i = band * rows_per_band
-                band_signature = signature[i:i + rows_per_band, doc]
-                bucket_id = hashlib.md5(','.join(band_signature).encode('utf8')).hexdigest()
-                buckets[bucket_id].append(doc)
+        buckets = {}
+        for band in range(bands):
+            i = band * rows_per_band
+            for bucket_hash, docs in group_band(hash_band(signature[i:i + rows_per_band])):
+                buckets[f'{band}-{bucket_hash:016x}'] = docs.tolist()
+
+        return buckets
+
+    def candidate_pairs(self, signature, bands=10, rows_per_band=10, processes=None):
+        """
+        Find the pairs of documents that share a bucket in at least one band.
+
+        Parameters
+        ----------
+        signature : numpy.ndarray
+            Min-Hash signatures for documents.
+        bands : int
+            Number of bands for LSH.
+        rows_per_band : int
+            Number of rows per band.
+        processes : int
+            The number of processes that the bands are divided between. None to find the pairs
+            in this process.
+
+        Returns
+        ----------
+        numpy.ndarray
+            The sorted unique pairs of document indices, as rows of (first, second) with first < second.
+        """
+        if bands * rows_per_band != self.num_hashes:
+            raise ValueError("number of hashes must be equal to number of bands times rows_per_band")
 
-        return buckets       
+        band_signatures = [signature[i:i + rows_per_band] for i in range(0, bands * rows_per_band, rows_per_band)]
+        if processes is None:
+            pairs = [band_candidate_pairs(band_signature) for band_signature in band_signatures]
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                pairs = list(executor.map(band_candidate_pairs, band_signatures))
+        return np.unique(np.concatenate(pairs), axis=0)
 
     def perform_lsh(self):
         """
@@ -194,3 +367,250 @@ class MinHashLSH:
 
         # a good score is around 0.8
         print("your final score in near duplicate detection:", correct_near_duplicates / all_near_duplicates)
+
+
+class IncrementalMinHashLSH(MinHashLSH):
+    def __init__(self, num_hashes=100, bands=20, threshold=0.8, k=5, words=False, seed=0):
+        """
+        Initialize the IncrementalMinHashLSH
+
+        Keeps the LSH buckets of the documents as they arrive, so a new document is checked
+        against the buckets of its bands instead of all the documents. The permutations are
+        the hash functions of MinHashLSH, so they stay the same as the shingles of new documents
+        come in.
+
+        Parameters
+        ----------
+        num_hashes : int
+            Number of hashes for mini-hashing.
+        bands : int
+            Number of bands for LSH. It must divide num_hashes.
+        threshold : float
+            The smallest estimated jaccard score of a near duplicate.
+        k : int
+            The size of each shingle.
+        words : bool
+            Make the shingles of k words instead of k characters.
+        seed : int
+            The seed of the hash functions.
+        """
+        if num_hashes % bands:
+            raise ValueError("number of hashes must be equal to number of bands times rows_per_band")
+        super().__init__([], num_hashes, seed, k=k, words=words)
+        self.bands = bands
+        self.rows_per_band = num_hashes // bands
+        self.threshold = threshold
+        # {band: {band signature: [document ids]}}
+        self.buckets = [defaultdict(list) for _ in range(bands)]
+        self.signatures = {}
+        self.lock = Lock()
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def get_signature(self, document):
+        """
+        Find the Min-Hash signature of a document.
+
+        Parameters
+        ----------
+        document : str
+            The input document.
+
+        Returns
+        ----------
+        numpy.ndarray
+            The signature, None if the document is shorter than a shingle.
+        """
+        indices, indptr = self.hash_documents([document])
+        if not len(indices):
+            return None
+        return self.signatures_of_hashes(indices, indptr)[:, 0]
+
+    def get_band_keys(self, signature):
+        return [
+            int(hash_band(signature[i:i + self.rows_per_band, None])[0])
+            for i in range(0, self.num_hashes, self.rows_per_band)
+        ]
+
+    def find_near_duplicates(self, signature, doc_id=None):
+        """
+        Find the documents other than doc_id that share a bucket with a signature and are similar
+        enough to it. The caller must hold the lock.
+
+        Returns
+        ----------
+        list of str
+            The ids of the near duplicates, the most similar first.
+        """
+        candidates = set()
+        for band, key in enumerate(self.get_band_keys(signature)):
+            candidates.update(self.buckets[band].get(key, ()))
+        candidates.discard(doc_id)
+        scores = [(np.mean(self.signatures[doc_id] == signature), doc_id) for doc_id in candidates]
+        return [doc_id for score, doc_id in sorted(scores, reverse=True) if score >= self.threshold]
+
+    def insert(self, doc_id, signature):
+        """
+        Add a signature to the buckets, in place of the old signature of the document if it has
+        one. The caller must hold the lock.
+        """
+        self.delete(doc_id)
+        self.signatures[doc_id] = signature
+        for band, key in enumerate(self.get_band_keys(signature)):
+            self.buckets[band][key].append(doc_id)
+
+    def query(self, document):
+        """
+        Find the near duplicates of a document.
+
+        Parameters
+        ----------
+        document : str
+            The input document.
+
+        Returns
+        ----------
+        list of str
+            The ids of the near duplicates, the most similar first.
+        """
+        signature = self.get_signature(document)
+        if signature is None:
+            return []
+        with self.lock:
+            return self.find_near_duplicates(signature)
+
+    def add(self, doc_id, document):
+        """
+        Add a document to the buckets.
+
+        Parameters
+        ----------
+        doc_id : str
+            The id of the document.
+        document : str
+            The input document.
+        """
+        signature = self.get_signature(document)
+        if signature is not None:
+            with self.lock:
+                self.insert(doc_id, signature)
+
+    def remove(self, doc_id):
+        """
+        Remove a document from the buckets.
+
+        Parameters
+        ----------
+        doc_id : str
+            The id of the document.
+        """
+        with self.lock:
+            self.delete(doc_id)
+
+    def delete(self, doc_id):
+        """
+        Remove a signature from the buckets. The caller must hold the lock.
+        """
+        signature = self.signatures.pop(doc_id, None)
+        if signature is None:
+            return
+        for band, key in enumerate(self.get_band_keys(signature)):
+            bucket = self.buckets[band][key]
+            bucket.remove(doc_id)
+            if not bucket:
+                del self.buckets[band][key]
+
+    def add_if_unique(self, doc_id, document):
+        """
+        Add a document to the buckets if it is not a near duplicate of a document in them.
+
+        Parameters
+        ----------
+        doc_id : str
+            The id of the document.
+        document : str
+            The input document.
+
+        Returns
+        ----------
+        list of str
+            The ids of the near duplicates, the most similar first. The document is added only
+            if there are none. A document that was added before is replaced, or removed if it
+            is a near duplicate now.
+        """
+        signature = self.get_signature(document)
+        with self.lock:
+            if signature is None:
+                self.delete(doc_id)
+                return []
+            duplicates = self.find_near_duplicates(signature, doc_id)
+            if duplicates:
+                self.delete(doc_id)
+            else:
+                self.insert(doc_id, signature)
+        return duplicates
+
+
+def hash_band(band_signature):
+    """
+    Hash the rows of a band of the signatures of all the documents, with FNV-1a over the rows.
+
+    Parameters
+    ----------
+    band_signature : numpy.ndarray
+        The rows of the signatures matrix of a band.
+
+    Returns
+    ----------
+    numpy.ndarray
+        The 64 bit hash of the band of every document.
+    """
+    hashes = np.full(band_signature.shape[1], fnv_offset, dtype=np.uint64)
+    for row in band_signature.astype(np.uint64):
+        # the multiplication wraps around 64 bits, as the hash needs
+        hashes = (hashes ^ row) * fnv_prime
+    return hashes
+
+
+def group_band(hashes):
+    """
+    Group the documents with the same hash of a band, by sorting them by their hashes.
+
+    Parameters
+    ----------
+    hashes : numpy.ndarray
+        The hash of the band of every document.
+
+    Returns
+    ----------
+    list of tuple
+        The (hash, sorted document indices) of every bucket of more than one document.
+    """
+    order = np.argsort(hashes, kind='stable')
+    sorted_hashes = hashes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_hashes[1:] != sorted_hashes[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+    return [(int(sorted_hashes[start]), order[start:end]) for start, end in zip(starts, ends) if end - start > 1]
+
+
+def band_candidate_pairs(band_signature):
+    """
+    Find the pairs of documents that share a bucket in a band. It is a function of the module,
+    so the bands can be divided between processes.
+
+    Parameters
+    ----------
+    band_signature : numpy.ndarray
+        The rows of the signatures matrix of a band.
+
+    Returns
+    ----------
+    numpy.ndarray
+        The pairs of document indices, as rows of (first, second) with first < second.
+    """
+    pairs = [np.zeros((0, 2), dtype=np.int64)]
+    for _, docs in group_band(hash_band(band_signature)):
+        first, second = np.triu_indices(len(docs), 1)
+        pairs.append(np.stack([docs[first], docs[second]], axis=1))
+    return np.concatenate(pairs)
@@ -1,10 +1,18 @@
+from .bitmap import *
 from .document_lengths_index import *
+from .document_store import *
+from .facet_index import *
 from .index import *
 from .index_reader import *
 from .indexes_enum import *
 from .LSH import *
 from .metadata_index import *
+from .numeric_index import *
+from .positional_index import *
+from .posting_list import *
+from .snippet_index import *
 from .tiered_index import *
+from .vocabulary_index import *
 
 
 __all__ = [k for k in globals().keys() if not k.startswith("_")]
@@ -0,0 +1,187 @@
+class Roaring_bitmap:
+    """
+    A compressed bitmap of non-negative integers, in the style of Roaring bitmaps.
+
+    The integers are split by their high 16 bits into containers. A container with at most
+    `array_limit` integers is a sorted list of the low 16 bits (array container), and a denser
+    one is a Python int used as a bitset of 2^16 bits (bitmap container).
+    """
+    array_limit = 4096
+
+    def __init__(self, containers=None):
+        """
+        Initialize the Roaring_bitmap
+
+        Parameters
+        ----------
+        containers : dict
+            The containers with the structure of {high_bits: list | int}.
+        """
+        self.containers = containers if containers is not None else {}
+
+    @classmethod
+    def from_integers(cls, integers):
+        """
+        Build a bitmap from integers.
+
+        Parameters
+        ----------
+        integers : iterable of int
+            The integers to put in the bitmap.
+
+        Returns
+        ----------
+        Roaring_bitmap
+            The bitmap of the integers.
+        """
+        groups = {}
+        for integer in integers:
+            groups.setdefault(integer >> 16, set()).add(integer & 0xFFFF)
+        return cls({high: cls.make_container(lows) for high, lows in groups.items()})
+
+    @classmethod
+    def make_container(cls, lows):
+        """
+        Build the smallest container for a set of low bits.
+        """
+        if len(lows) <= cls.array_limit:
+            return sorted(lows)
+        bits = 0
+        for low in lows:
+            bits |= 1 << low
+        return bits
+
+    @classmethod
+    def shrink(cls, bits):
+        """
+        Convert a bitmap container back to an array container if it got sparse.
+        """
+        if bits.bit_count() > cls.array_limit:
+            return bits
+        return cls.to_lows(bits)
+
+    @staticmethod
+    def to_lows(bits):
+        lows = []
+        for i, byte in enumerate(bits.to_bytes(8192, 'little')):
+            while byte:
+                lowest = byte & -byte
+                lows.append(i * 8 + lowest.bit_length() - 1)
+                byte ^= lowest
+        return lows
+
+    @staticmethod
+    def cardinality(container):
+        return len(container) if isinstance(container, list) else container.bit_count()
+
+    @staticmethod
+    def to_bits(container):
+        if isinstance(container, int):
+            return container
+        bits = 0
+        for low in container:
+            bits |= 1 << low
+        return bits
+
+    @classmethod
+    def intersect_containers(cls, first, second):
+        if isinstance(first, list) and isinstance(second, list):
+            if len(first) > len(second):
+                first, second = second, first
+            second = set(second)
+            return [low for low in first if low in second]
+        if isinstance(first, list):
+            return [low for low in first if second >> low & 1]
+        if isinstance(second, list):
+            return [low for low in second if first >> low & 1]
+        return cls.shrink(first & second)
+
+    def __len__(self):
+        return sum(self.cardinality(container) for container in self.containers.values())
+
+    def __iter__(self):
+        for high in sorted(self.containers):
+            container = self.containers[high]
+            if isinstance(container, int):
+                container = self.to_lows(container)
+            for low in container:
+                yield high << 16 | low
+
+    def __and__(self, other):
+        containers = {}
+        for high in self.containers.keys() & other.containers.keys():
+            container = self.intersect_containers(self.containers[high], other.containers[high])
+            if self.cardinality(container):
+                containers[high] = container
+        return Roaring_bitmap(containers)
+
+    def __or__(self, other):
+        containers = dict(self.containers)
+        for high, container in other.containers.items():
+            if high not in containers:
+                containers[high] = container
+                continue
+            mine = containers[high]
+            if isinstance(mine, list) and isinstance(container, list):
+                lows = set(mine).union(container)
+                containers[high] = self.make_container(lows)
+            else:
+                containers[high] = self.to_bits(mine) | self.to_bits(container)
+        return Roaring_bitmap(containers)
+
+    def intersection_cardinality(self, other):
+        """
+        Count the integers that are in both bitmaps, without building their intersection.
+
+        Parameters
+        ----------
+        other : Roaring_bitmap
+            The other bitmap.
+
+        Returns
+        ----------
+        int
+            The size of the intersection.
+        """
+        count = 0
+        for high in self.containers.keys() & other.containers.keys():
+            first, second = self.containers[high], other.containers[high]
+            if isinstance(first, int) and isinstance(second, int):
+                count += (first & second).bit_count()
+            else:
+                count += len(self.intersect_containers(first, second))
+        return count
+
+    def serialize(self):
+        """
+        Convert the bitmap to a JSON serializable dict.
+
+        Returns
+        ----------
+        dict
+            The containers with the structure of {high_bits: [low_bits] | hex_bitset}.
+        """
+        return {
+            str(high): container if isinstance(container, list) else hex(container)
+            for high, container in self.containers.items()
+        }
+
+    @classmethod
+    def deserialize(cls, data):
+        """
+        Build a bitmap from the output of `serialize`.
+
+        Parameters
+        ----------
+        data : dict
+            The serialized bitmap.
+
+        Returns
+        ----------
+        Roaring_bitmap
+            The bitmap.
+        """
+        return cls({
+            int(high): container if isinstance(container, list) else int(container, 16)
+            for high, container in data.items()
+        })
@@ -0,0 +1,225 @@
+import json
+import os
+import zlib
+from collections import OrderedDict
+from threading import Lock
+
+from .indexes_enum import Indexes, Index_types
+
+
+class Document_store:
+    def __init__(self, path='data/index/', cache_size=16):
+        """
+        Initializes the Document_store.
+
+        The documents are kept in zlib compressed blocks of JSON lines in a binary file, and an
+        offset table maps every document ID to its block and line. Only the blocks of the
+        requested documents are read and decompressed, and only their lines are parsed.
+
+        Parameters
+        ----------
+        path : str
+            The path to the directory where the store is saved.
+        cache_size : int
+            The number of decompressed blocks to keep in memory.
+        """
+        self.data_path = Document_store.get_path(path, '.bin')
+        with open(Document_store.get_path(path, '.json'), 'r') as file:
+            table = json.load(file)
+        self.blocks = table['blocks']
+        self.documents = table['documents']
+
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lock = Lock()
+        self.file = None
+
+    @staticmethod
+    def get_path(path, extension):
+        return path + Indexes.DOCUMENTS.value + '_' + Index_types.STORE.value + extension
+
+    @staticmethod
+    def store_documents(documents, path='data/index/', block_size=64):
+        """
+        Writes the documents to a new store.
+
+        Parameters
+        ----------
+        documents : list
+            The documents to store. Each one must have an 'id'.
+        path : str
+            The path to the directory where the store is saved.
+        block_size : int
+            The number of documents in each compressed block.
+        """
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        blocks = []
+        table = {}
+        offset = 0
+        with open(Document_store.get_path(path, '.bin'), 'wb') as file:
+            for start in range(0, len(documents), block_size):
+                block = documents[start:start + block_size]
+                lines = [json.dumps(document) for document in block]
+                data = zlib.compress('\n'.join(lines).encode('utf8'))
+                file.write(data)
+                for line, document in enumerate(block):
+                    table[document['id']] = [len(blocks), line]
+                blocks.append([offset, len(data)])
+                offset += len(data)
+
+        with open(Document_store.get_path(path, '.json'), 'w') as file:
+            json.dump({'blocks': blocks, 'documents': table}, file)
+
+    @staticmethod
+    def get_projection_path(path, fields):
+        return Document_store.get_path(path, '_' + '_'.join(fields) + '.json')
+
+    @staticmethod
+    def store_projection(documents, path='data/index/', fields=('title', 'stars')):
+        """
+        Writes a projection of the documents on a few fields, as one column per field.
+
+        Parameters
+        ----------
+        documents : list
+            The documents to project. Each one must have an 'id'.
+        path : str
+            The path to the directory where the store is saved.
+        fields : tuple
+            The fields to keep.
+        """
+        columns = {'id': [document['id'] for document in documents]}
+        for field in fields:
+            columns[field] = [document.get(field, None) for document in documents]
+        with open(Document_store.get_projection_path(path, fields), 'w') as file:
+            json.dump(columns, file)
+
+    @staticmethod
+    def load_projection(path='data/index/', fields=('title', 'stars')):
+        """
+        Loads a projection that was written by `store_projection`.
+
+        Parameters
+        ----------
+        path : str
+            The path to the directory where the store is saved.
+        fields : tuple
+            The fields of the projection.
+
+        Returns
+        ----------
+        dict
+            The columns of the projection with the structure of {'id': [...], field: [...]}.
+        """
+        with open(Document_store.get_projection_path(path, fields), 'r') as file:
+            return json.load(file)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.documents
+
+    def keys(self):
+        return self.documents.keys()
+
+    def read_block(self, number):
+        """
+        Reads and decompresses a block, or gets it from the cache.
+
+        Parameters
+        ----------
+        number : int
+            The number of the block.
+
+        Returns
+        ----------
+        List[bytes]
+            The JSON lines of the documents in the block.
+        """
+        with self.lock:
+            if number in self.cache:
+                self.cache.move_to_end(number)
+                return self.cache[number]
+
+            if self.file is None:
+                self.file = open(self.data_path, 'rb')
+            offset, length = self.blocks[number]
+            self.file.seek(offset)
+            lines = zlib.decompress(self.file.read(length)).split(b'\n')
+
+            self.cache[number] = lines
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            return lines
+
+    def get(self, doc_id, default=None, fields=None):
+        """
+        Gets a document by its ID, like dict.get.
+
+        Parameters
+        ----------
+        doc_id : str
+            The ID of the document.
+        default : any
+            The value to return if the document is not in the store.
+        fields : list
+            The fields of the document to return. If None, all the fields are returned.
+
+        Returns
+        ----------
+        dict
+            The document.
+        """
+        return self.get_many([doc_id], fields).get(doc_id, default)
+
+    def get_many(self, doc_ids, fields=None):
+        """
+        Gets a number of documents by their IDs, reading each needed block once.
+
+        Parameters
+        ----------
+        doc_ids : list
+            The IDs of the documents. The IDs that are not in the store are ignored.
+        fields : list
+            The fields of the documents to return. If None, all the fields are returned.
+
+        Returns
+        ----------
+        dict
+            The documents with the structure of {doc_id: document}, in the order of doc_ids.
+        """
+        by_block = {}
+        for doc_id in doc_ids:
+            if doc_id in self.documents:
+                number, line = self.documents[doc_id]
+                by_block.setdefault(number, []).append((doc_id, line))
+
+        found = {}
+        for number, requested in by_block.items():
+            lines = self.read_block(number)
+            for doc_id, line in requested:
+                document = json.loads(lines[line])
+                if fields is not None:
+                    document = {field: document.get(field, None) for field in fields}
+                found[doc_id] = document
+
+        return {doc_id: found[doc_id] for doc_id in doc_ids if doc_id in found}
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.cache.clear()
+
+
+if __name__ == '__main__':
+    # the store keeps the crawled (not preprocessed) documents, as they are shown to the user
+    with open('data/IMDB_crawled.json', 'r') as f:
+        documents = json.load(f)
+    Document_store.store_documents(documents)
+    Document_store.store_projection(documents)
+    print('Document store saved successfully.')
@@ -0,0 +1,98 @@
+import json
+
+from .bitmap import Roaring_bitmap
+from .document_store import Document_store
+from .indexes_enum import Indexes, Index_types
+
+
+class Facet_index:
+    fields = ['genres', 'languages', 'countries_of_origin', 'mpaa']
+
+    def __init__(self, path='data/index/'):
+        """
+        Initializes the Facet_index.
+
+        The values are read from the crawled documents, as the preprocessor lemmatizes them and
+        removes their punctuation, and are only normalized with `normalize_facet_value`.
+
+        Parameters
+        ----------
+        path : str
+            The path to the indexes. The crawled documents are read from the document store in it.
+        """
+
+        store = Document_store(path)
+        self.documents = store.get_many(list(store.keys()), fields=self.fields)
+        store.close()
+        # the bitmaps store the position of each document in this list
+        self.doc_ids = sorted(self.documents)
+        self.facet_index = {field: self.index_values(field) for field in self.fields}
+        self.store_facet_index(path)
+
+    def index_values(self, where):
+        """
+        Builds a bitmap of the documents for each value of a field.
+
+        Parameters
+        ----------
+        where : str
+            The field to index.
+
+        Returns
+        ----------
+        dict
+            The serialized bitmaps of the field with the structure of {value: bitmap}.
+        """
+        values = {}
+        for number, doc_id in enumerate(self.doc_ids):
+            items = self.documents[doc_id].get(where, None)
+            if not items:
+                continue
+            if isinstance(items, str):
+                items = [items]
+            for value in items:
+                if value := normalize_facet_value(value):
+                    values.setdefault(value, []).append(number)
+
+        return {
+            value: Roaring_bitmap.from_integers(numbers).serialize()
+            for value, numbers in values.items()
+        }
+
+    def store_facet_index(self, path):
+        """
+        Stores the facet index to a file.
+
+        Parameters
+        ----------
+        path : str
+            The path to the directory where the indexes are stored.
+        """
+        path = path + Indexes.DOCUMENTS.value + '_' + Index_types.FACET.value + '.json'
+        with open(path, 'w') as file:
+            json.dump({'doc_ids': self.doc_ids, 'facets': self.facet_index}, file)
+
+
+def normalize_facet_value(value):
+    """
+    Normalizes a facet value, so "PG-13" and "pg-13" or "United  States" and "united states" are
+    the same value.
+
+    Parameters
+    ----------
+    value : str
+        The value as it is crawled or requested.
+
+    Returns
+    ----------
+    str
+        The lower-cased value with single spaces, or None if the value is empty.
+    """
+    if value is None:
+        return None
+    return ' '.join(str(value).lower().split()) or None
+
+
+if __name__ == '__main__':
+    facet_index = Facet_index()
+    print('Facet index stored successfully.')
@@ -5,14 +5,28 @@ import copy
 from collections import defaultdict
 
 from .indexes_enum import Indexes, Index_types
+from .LSH import IncrementalMinHashLSH
 
 class Index:
-    def __init__(self, preprocessed_documents: list):
+    def __init__(self, preprocessed_documents: list, near_duplicates=None, vocabulary=None):
         """
         Create a class for indexing.
+
+        Parameters
+        ----------
+        preprocessed_documents : list
+            The preprocessed documents.
+        near_duplicates : IncrementalMinHashLSH
+            The LSH index of the summaries. The documents whose summaries are near duplicates of an
+            indexed document are left out, as are the ones the crawler marked as near duplicates.
+        vocabulary : Vocabulary_index
+            The vocabulary of the spell correction. It should already hold the terms of the given
+            documents, and it is updated when documents are added to or removed from the index.
         """
 
-        self.preprocessed_documents = preprocessed_documents
+        self.near_duplicates = near_duplicates
+        self.vocabulary = vocabulary
+        self.preprocessed_documents = [doc for doc in preprocessed_documents if not self.register_unless_near_duplicate(doc)]
 
         self.index = {
             Indexes.DOCUMENTS.value: self.index_documents(),
@@ -140,7 +154,11 @@ class Index:
         """
 
         #* DONE
+        if self.register_unless_near_duplicate(document):
+            return
         self.preprocessed_documents.append(document)
+        if self.vocabulary is not None:
+            self.vocabulary.add_document(document)
 
         for key, idx in self.index.items():
             if key == Indexes.DOCUMENTS.value:
@@ -155,6 +173,26 @@ class Index:
                                 idx[term][document['id']] = 1    
 
 
+    def register_unless_near_duplicate(self, document: dict):
+        """
+        Add a document to the LSH index, unless it is a near duplicate of an indexed document.
+
+        Parameters
+        ----------
+        document : dict
+            The preprocessed document
+
+        Returns
+        ----------
+        bool
+            True if the document should not be indexed
+        """
+        if document.get('near_duplicate_of', None):
+            return True
+        if self.near_duplicates is None or not document.get('summaries', None):
+            return False
+        return bool(self.near_duplicates.add_if_unique(document['id'], ' '.join(document['summaries'])))
+
     def remove_document_from_index(self, document_id: str):
         """
         Remove a document from all the indexes
@@ -167,8 +205,12 @@ class Index:
 
         #* DONE
         document = self.index[Indexes.DOCUMENTS.value].pop(document_id, None)
+        if self.near_duplicates is not None:
+            self.near_duplicates.remove(document_id)
 
         if document:
+            if self.vocabulary is not None:
+                self.vocabulary.remove_document(document)
             for key, idx in self.index.items():
                 if key != Indexes.DOCUMENTS.value:
                     if document[key]:
@@ -280,8 +322,9 @@ class Index:
             raise ValueError('Invalid index name')
 
         #* DONE
+        # sorting the keys stores every postings list sorted by document ID
         with open(os.path.join(path, f"{index_name}.json"), 'w') as f:
-            json.dump(self.index[index_name], f)
+            json.dump(self.index[index_name], f, sort_keys=True)
 
     def load_index(self, path: str):
         """
@@ -389,7 +432,8 @@ if __name__ == '__main__':
     with open('data/IMDB_preped.json', 'r') as f:
         docs = json.load(f)
 
-    index = Index(docs)
+    # the near duplicates that the crawler missed are left out of the indexes
+    index = Index(docs, near_duplicates=IncrementalMinHashLSH())
     path = "data/index/"
     for index_type in Indexes:
         index.store_index(path, index_type.value)
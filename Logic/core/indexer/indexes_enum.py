@@ -10,4 +10,10 @@ class Indexes(Enum):
 class Index_types(Enum):
     TIERED = 'tiered'
     DOCUMENT_LENGTH = 'document_length'
-    METADATA = 'metadata'
\ No newline at end of file
+    METADATA = 'metadata'
+    POSITIONAL = 'positional'
+    NUMERIC = 'numeric'
+    FACET = 'facet'
+    STORE = 'store'
+    VOCABULARY = 'vocabulary'
+    SNIPPET = 'snippet'
\ No newline at end of file
@@ -0,0 +1,151 @@
+import json
+import re
+
+import numpy as np
+
+from .document_store import Document_store
+from .indexes_enum import Indexes, Index_types
+
+
+class Numeric_index:
+    fields = ['rating', 'release_year', 'budget', 'gross_worldwide']
+
+    def __init__(self, path='data/index/'):
+        """
+        Initializes the Numeric_index.
+
+        The values are parsed from the crawled documents, as the preprocessor removes the dots
+        and the currency signs of the numbers.
+
+        Parameters
+        ----------
+        path : str
+            The path to the indexes. The crawled documents are read from the document store in it.
+        """
+
+        store = Document_store(path)
+        self.documents = store.get_many(list(store.keys()), fields=self.fields)
+        store.close()
+        self.numeric_index = {
+            'rating': self.index_values('rating', self.parse_rating),
+            'release_year': self.index_values('release_year', self.parse_year),
+            'budget': self.index_values('budget', self.parse_amount),
+            'gross_worldwide': self.index_values('gross_worldwide', self.parse_amount),
+        }
+        self.store_numeric_index(path)
+
+    def index_values(self, where, parse):
+        """
+        Parses the values of a field and sorts the documents by them.
+
+        Parameters
+        ----------
+        where : str
+            The field to index.
+        parse : callable
+            Converts the raw string of the field to a number, or None if it has no value.
+
+        Returns
+        ----------
+        dict
+            The sorted columns of the field with the structure of
+            {
+                "values": List[float],
+                "doc_ids": List[str]
+            }
+        """
+        pairs = []
+        for doc_id, doc in self.documents.items():
+            value = parse(doc.get(where, None))
+            if value is not None:
+                pairs.append((value, doc_id))
+        pairs.sort()
+
+        return {
+            'values': [value for value, _ in pairs],
+            'doc_ids': [doc_id for _, doc_id in pairs],
+        }
+
+    def parse_rating(self, text):
+        """
+        Parses a rating like "8.5".
+        """
+        if text is None:
+            return None
+        if match := re.search(r'\d+(\.\d+)?', str(text)):
+            return float(match.group())
+        return None
+
+    def parse_year(self, text):
+        """
+        Parses the year out of a release date like "September 23, 1994 (United States)".
+        """
+        if text is None:
+            return None
+        if match := re.search(r'\b(1[89]|20)\d\d\b', str(text)):
+            return int(match.group())
+        return None
+
+    def parse_amount(self, text):
+        """
+        Parses an amount of money like "$25,000,000 (estimated)". The currency is ignored.
+        """
+        if text is None:
+            return None
+        if match := re.search(r'\d+', str(text).replace(',', '')):
+            return int(match.group())
+        return None
+
+    def store_numeric_index(self, path):
+        """
+        Stores the numeric index to a file.
+
+        Parameters
+        ----------
+        path : str
+            The path to the directory where the indexes are stored.
+        """
+        path = path + Indexes.DOCUMENTS.value + '_' + Index_types.NUMERIC.value + '.json'
+        with open(path, 'w') as file:
+            json.dump(self.numeric_index, file)
+
+
+class Numeric_column:
+    def __init__(self, values, doc_ids):
+        """
+        Initializes the Numeric_column.
+
+        Parameters
+        ----------
+        values : List[float]
+            The sorted values of a field.
+        doc_ids : List[str]
+            The document IDs, in the order of the values.
+        """
+        self.values = np.asarray(values, dtype=np.float64)
+        self.doc_ids = np.asarray(doc_ids, dtype=object)
+
+    def range(self, low=None, high=None):
+        """
+        Finds the documents with a value in a range, with two binary searches.
+
+        Parameters
+        ----------
+        low : float
+            The lower bound of the range (inclusive). None means no lower bound.
+        high : float
+            The upper bound of the range (inclusive). None means no upper bound.
+
+        Returns
+        ----------
+        numpy.ndarray
+            The IDs of the documents in the range.
+        """
+        start = 0 if low is None else np.searchsorted(self.values, low, side='left')
+        end = len(self.values) if high is None else np.searchsorted(self.values, high, side='right')
+        return self.doc_ids[start:end]
+
+
+if __name__ == '__main__':
+    numeric_index = Numeric_index()
+    print('Numeric index stored successfully.')
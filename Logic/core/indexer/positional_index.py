@@ -0,0 +1,195 @@
+import heapq
+import json
+from collections import defaultdict
+from itertools import accumulate
+
+from .indexes_enum import Indexes, Index_types
+from .index_reader import Index_reader
+
+
+class Positional_index:
+    def __init__(self, path='data/index/'):
+        """
+        Initializes the Positional_index.
+
+        Parameters
+        ----------
+        path : str
+            The path to the indexes.
+        """
+
+        self.documents = Index_reader(path, index_name=Indexes.DOCUMENTS).index
+        self.positional_index = {
+            Indexes.STARS: self.index_positions(Indexes.STARS.value),
+            Indexes.SUMMARIES: self.index_positions(Indexes.SUMMARIES.value),
+        }
+        self.store_positional_index(path, Indexes.STARS)
+        self.store_positional_index(path, Indexes.SUMMARIES)
+
+    def index_positions(self, where):
+        """
+        Index the positions of the terms of a field.
+
+        Each item of the field (a star name or a summary) is tokenized on white spaces and the
+        positions keep counting over the items of a document. A gap of one position is left
+        between two items, so a phrase never matches across the boundary of two star names or
+        two summaries.
+
+        Parameters
+        ----------
+        where : str
+            The field to index.
+
+        Returns
+        ----------
+        dict
+            The positional index of the field. The positions are delta-encoded, so the index type is:
+            {term: {document_id: [first_position, gap, gap, ...]}}
+        """
+        index = defaultdict(dict)
+        for doc_id, doc in self.documents.items():
+            items = doc.get(where, None)
+            if not items:
+                continue
+            if isinstance(items, str):
+                items = [items]
+
+            positions = defaultdict(list)
+            position = 0
+            for item in items:
+                for term in item.split():
+                    positions[term].append(position)
+                    position += 1
+                position += 1
+
+            for term, term_positions in positions.items():
+                index[term][doc_id] = encode_positions(term_positions)
+        return index
+
+    def store_positional_index(self, path, index_name):
+        """
+        Stores the positional index to a file.
+
+        Parameters
+        ----------
+        path : str
+            The path to the directory where the indexes are stored.
+        index_name : Indexes
+            The name of the index to store.
+        """
+        path = path + index_name.value + '_' + Index_types.POSITIONAL.value + '.json'
+        with open(path, 'w') as file:
+            json.dump(self.positional_index[index_name], file)
+
+
+def encode_positions(positions):
+    """
+    Delta-encodes a sorted list of positions.
+
+    Parameters
+    ----------
+    positions : List[int]
+        The sorted positions of a term in a document.
+
+    Returns
+    ----------
+    List[int]
+        The first position followed by the gaps between consecutive positions.
+    """
+    return [position - previous for previous, position in zip([0] + positions, positions)]
+
+
+def decode_positions(gaps):
+    """
+    Decodes a delta-encoded list of positions.
+
+    Parameters
+    ----------
+    gaps : List[int]
+        The delta-encoded positions.
+
+    Returns
+    ----------
+    List[int]
+        The absolute positions.
+    """
+    return list(accumulate(gaps))
+
+
+def intersect_phrase(positions_list):
+    """
+    Finds the places in which the terms appear one right after the other.
+
+    Parameters
+    ----------
+    positions_list : List[List[int]]
+        The sorted positions of each term of the phrase, in the order of the phrase.
+
+    Returns
+    ----------
+    List[int]
+        The positions in which the phrase starts.
+    """
+    starts = positions_list[0]
+    for offset, positions in enumerate(positions_list[1:], start=1):
+        matches = []
+        i = j = 0
+        while i < len(starts) and j < len(positions):
+            target = starts[i] + offset
+            if positions[j] == target:
+                matches.append(starts[i])
+                i += 1
+                j += 1
+            elif positions[j] < target:
+                j += 1
+            else:
+                i += 1
+        starts = matches
+        if not starts:
+            break
+    return starts
+
+
+def intersect_window(positions_list, window):
+    """
+    Finds the windows in which all the terms appear at most `window` positions apart.
+
+    The positions of all the terms are merged and a sliding window is moved over them, so the
+    cost is linear in the total number of positions.
+
+    Parameters
+    ----------
+    positions_list : List[List[int]]
+        The sorted positions of each term.
+    window : int
+        The maximum distance between the first and the last term of a window.
+
+    Returns
+    ----------
+    List[int]
+        The start positions of the minimal windows containing all the terms.
+    """
+    merged = list(heapq.merge(*[[(position, term) for position in positions]
+                               for term, positions in enumerate(positions_list)]))
+    counts = defaultdict(int)
+    covered = 0
+    starts = []
+    left = 0
+    for position, term in merged:
+        counts[term] += 1
+        if counts[term] == 1:
+            covered += 1
+        while covered == len(positions_list):
+            start, first_term = merged[left]
+            if position - start <= window and (not starts or starts[-1] != start):
+                starts.append(start)
+            counts[first_term] -= 1
+            if counts[first_term] == 0:
+                covered -= 1
+            left += 1
+    return starts
+
+
+if __name__ == '__main__':
+    positional_index = Positional_index()
+    print('Positional index stored successfully.')
@@ -0,0 +1,96 @@
+import math
+from bisect import bisect_left, bisect_right
+
+
+class Posting_list:
+    def __init__(self, postings: dict):
+        """
+        Initializes the Posting_list.
+
+        The postings are kept as two parallel lists of (document_id, tf) sorted by document_id,
+        with a skip pointer every sqrt(n) documents.
+
+        Parameters
+        ----------
+        postings : dict
+            The postings of a term with the structure of {document_id: tf}.
+        """
+        self.doc_ids = sorted(postings)
+        self.tfs = [postings[doc_id] for doc_id in self.doc_ids]
+        self.skip_length = max(int(math.sqrt(len(self.doc_ids))), 1)
+        self.skips = self.doc_ids[::self.skip_length]
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def advance(self, target, start=0):
+        """
+        Finds the first document ID that is not smaller than the target.
+
+        The skip pointers are searched with galloping (exponential) search starting from the
+        block of `start`, then a binary search is done inside the found block. So the cost is
+        logarithmic in the distance that is skipped, not in the length of the list.
+
+        Parameters
+        ----------
+        target : str
+            The document ID to look for.
+        start : int
+            The position to start searching from.
+
+        Returns
+        ----------
+        int
+            The position of the first document ID >= target, or len(self) if there is none.
+        """
+        doc_ids = self.doc_ids
+        if start >= len(doc_ids) or doc_ids[start] >= target:
+            return start
+
+        block = start // self.skip_length
+        step = 1
+        while block + step < len(self.skips) and self.skips[block + step] <= target:
+            block += step
+            step *= 2
+        block = bisect_right(self.skips, target, block, min(block + step, len(self.skips))) - 1
+
+        low = max(start, block * self.skip_length)
+        high = min((block + 1) * self.skip_length, len(doc_ids))
+        return bisect_left(doc_ids, target, low, high)
+
+
+def intersect_posting_lists(posting_lists):
+    """
+    Finds the documents that appear in all the posting lists.
+
+    The lists are intersected from the shortest to the longest one and every longer list is only
+    advanced through its skip pointers, so the cost is proportional to the shortest list.
+
+    Parameters
+    ----------
+    posting_lists : List[Posting_list]
+        The posting lists to intersect.
+
+    Returns
+    ----------
+    List[str]
+        The sorted document IDs that are in all the posting lists.
+    """
+    if not posting_lists:
+        return []
+
+    posting_lists = sorted(posting_lists, key=len)
+    result = posting_lists[0].doc_ids
+    for posting_list in posting_lists[1:]:
+        matches = []
+        pointer = 0
+        for doc_id in result:
+            pointer = posting_list.advance(doc_id, pointer)
+            if pointer == len(posting_list):
+                break
+            if posting_list.doc_ids[pointer] == doc_id:
+                matches.append(doc_id)
+        result = matches
+        if not result:
+            break
+    return result
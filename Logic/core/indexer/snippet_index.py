@@ -0,0 +1,78 @@
+import json
+import re
+
+from .document_store import Document_store
+from .indexes_enum import Indexes, Index_types
+
+token_pattern = re.compile(r"\w+(?:'\w+)*")
+
+
+class Snippet_index:
+    def __init__(self, path='data/index/', field='first_page_summary'):
+        """
+        Initializes the Snippet_index.
+
+        The raw text of a field is tokenized once, so the snippets do not have to split the
+        documents on every query.
+
+        Parameters
+        ----------
+        path : str
+            The path to the indexes. The raw documents are read from the document store in it.
+        field : str
+            The field that the snippets are made of.
+        """
+
+        store = Document_store(path)
+        documents = store.get_many(list(store.keys()), fields=[field])
+        store.close()
+        self.snippet_index = {
+            doc_id: index_tokens(document[field] or '')
+            for doc_id, document in documents.items()
+        }
+        self.store_snippet_index(path)
+
+    def store_snippet_index(self, path):
+        """
+        Stores the snippet index to a file.
+
+        Parameters
+        ----------
+        path : str
+            The path to the directory where the indexes are stored.
+        """
+        path = path + Indexes.DOCUMENTS.value + '_' + Index_types.SNIPPET.value + '.json'
+        with open(path, 'w') as file:
+            json.dump(self.snippet_index, file)
+
+
+def index_tokens(text):
+    """
+    Tokenizes a text and finds the positions and the character offsets of its tokens.
+
+    Parameters
+    ----------
+    text : str
+        The raw text.
+
+    Returns
+    ----------
+    dict
+        The tokens of the text with the structure of
+        {
+            "positions": {lowercase_token: [positions]},
+            "offsets": [[start, end], ...]
+        }
+        where the offsets of the token at position i are offsets[i].
+    """
+    positions = {}
+    offsets = []
+    for position, match in enumerate(token_pattern.finditer(text)):
+        positions.setdefault(match.group().lower(), []).append(position)
+        offsets.append([match.start(), match.end()])
+    return {'positions': positions, 'offsets': offsets}
+
+
+if __name__ == '__main__':
+    snippet_index = Snippet_index()
+    print('Snippet index stored successfully.')
@@ -0,0 +1,133 @@
+import json
+from collections import Counter
+
+from .indexes_enum import Indexes, Index_types
+from .index_reader import Index_reader
+
+
+class Vocabulary_index:
+    fields = [Indexes.STARS, Indexes.SUMMARIES]
+
+    def __init__(self, path='data/index/', vocabulary=None):
+        """
+        Initializes the Vocabulary_index.
+
+        The vocabulary holds the frequency and the shingles of every term of the stars and
+        summaries indexes, so the spell correction does not have to go over the documents.
+
+        Parameters
+        ----------
+        path : str
+            The path to the indexes.
+        vocabulary : dict
+            A vocabulary that was built before, with the structure of
+            {
+                "frequencies": {term: frequency},
+                "shingles": {term: [shingles]}
+            }
+            If None, the vocabulary is built from the postings of the indexes and stored.
+        """
+
+        if vocabulary is None:
+            self.frequencies = Counter()
+            self.shingles = {}
+            for field in self.fields:
+                self.index_postings(Index_reader(path, index_name=field).index)
+            self.store_vocabulary_index(path)
+        else:
+            self.frequencies = Counter(vocabulary['frequencies'])
+            self.shingles = {term: set(shingles) for term, shingles in vocabulary['shingles'].items()}
+
+    @classmethod
+    def load(cls, path='data/index/'):
+        """
+        Loads a stored vocabulary.
+
+        Parameters
+        ----------
+        path : str
+            The path to the indexes.
+
+        Returns
+        ----------
+        Vocabulary_index
+            The loaded vocabulary.
+        """
+        return cls(path, Index_reader(path, Indexes.DOCUMENTS, Index_types.VOCABULARY).index)
+
+    @staticmethod
+    def shingle_word(word, k=2):
+        return {word[i:i+k] for i in range(len(word) - k + 1)}
+
+    def add_term(self, term, frequency=1):
+        self.frequencies[term] += frequency
+        if term not in self.shingles:
+            self.shingles[term] = self.shingle_word(term)
+
+    def remove_term(self, term, frequency=1):
+        self.frequencies[term] -= frequency
+        if self.frequencies[term] <= 0:
+            del self.frequencies[term]
+            self.shingles.pop(term, None)
+
+    def index_postings(self, index):
+        """
+        Adds the terms of an index to the vocabulary.
+
+        Parameters
+        ----------
+        index : dict
+            The index with the structure of {term: {document_id: tf}}.
+        """
+        for term, postings in index.items():
+            self.add_term(term, sum(postings.values()))
+
+    def add_document(self, document):
+        """
+        Adds the terms of a preprocessed document to the vocabulary.
+
+        Parameters
+        ----------
+        document : dict
+            The preprocessed document.
+        """
+        for field in self.fields:
+            for item in document.get(field.value, None) or []:
+                for term in item.split():
+                    self.add_term(term)
+
+    def remove_document(self, document):
+        """
+        Removes the terms of a preprocessed document from the vocabulary. The terms that are left
+        without any occurrence are dropped.
+
+        Parameters
+        ----------
+        document : dict
+            The preprocessed document.
+        """
+        for field in self.fields:
+            for item in document.get(field.value, None) or []:
+                for term in item.split():
+                    self.remove_term(term)
+
+    def store_vocabulary_index(self, path):
+        """
+        Stores the vocabulary to a file.
+
+        Parameters
+        ----------
+        path : str
+            The path to the directory where the indexes are stored.
+        """
+        path = path + Indexes.DOCUMENTS.value + '_' + Index_types.VOCABULARY.value + '.json'
+        with open(path, 'w') as file:
+            json.dump({
+                'frequencies': self.frequencies,
+                'shingles': {term: sorted(shingles) for term, shingles in self.shingles.items()},
+            }, file)
+
+
+if __name__ == '__main__':
+    vocabulary_index = Vocabulary_index()
+    print('Vocabulary index stored successfully.')
@@ -1,15 +1,26 @@
 import json
 import numpy as np
 from collections import defaultdict, Counter
-from .utility import Preprocessor, Scorer
+from threading import Lock
+from .utility import Preprocessor, Scorer, QueryParser, BKTree
 from .indexer import Indexes, Index_types, Index_reader
+from .indexer import decode_positions, intersect_phrase, intersect_window
+from .indexer import Posting_list, intersect_posting_lists, Numeric_column, Roaring_bitmap
+from .indexer import normalize_facet_value
 
 
 class SearchEngine:
-    def __init__(self, path = "data/index/"):
+    def __init__(self, path = "data/index/", fuzzy_fields=(Indexes.STARS,)):
         """
         Initializes the search engine.
 
+        Parameters
+        ----------
+        path : str
+            The path to the indexes.
+        fuzzy_fields : tuple
+            The fields whose BK-trees are built here, so the first fuzzy search does not have to
+            wait for them. The trees of the other fields are built on their first fuzzy search.
         """
         
         self.document_indexes = {
@@ -38,6 +49,46 @@ class SearchEngine:
         self.metadata_index = Index_reader(
             path, Indexes.DOCUMENTS, Index_types.METADATA
         )
+        # positional indexes are optional, phrase and proximity search are only
+        # available for the fields that have one
+        self.positional_index = {}
+        for field in [Indexes.STARS, Indexes.SUMMARIES]:
+            try:
+                self.positional_index[field] = Index_reader(
+                    path, field, Index_types.POSITIONAL
+                )
+            except FileNotFoundError:
+                pass
+        # sorted posting lists with skip pointers, built once per term on first use
+        self.posting_lists = {field: {} for field in self.document_indexes}
+        self.all_documents = None
+        # BK-trees of the terms of each field for fuzzy search, the lock keeps two searches from
+        # building the same tree
+        self.bk_trees = {}
+        self.bk_trees_lock = Lock()
+        self.fuzzy_expansions = {field: {} for field in self.document_indexes}
+        for field in fuzzy_fields:
+            self.get_bk_tree(field)
+        # numeric columns for filtering, optional as well
+        try:
+            numeric_index = Index_reader(path, Indexes.DOCUMENTS, Index_types.NUMERIC).index
+        except FileNotFoundError:
+            numeric_index = {}
+        self.numeric_index = {
+            field: Numeric_column(column["values"], column["doc_ids"])
+            for field, column in numeric_index.items()
+        }
+        # bitmaps of the documents for each value of the facet fields, optional as well
+        try:
+            facet_index = Index_reader(path, Indexes.DOCUMENTS, Index_types.FACET).index
+        except FileNotFoundError:
+            facet_index = {"doc_ids": [], "facets": {}}
+        self.facet_doc_ids = facet_index["doc_ids"]
+        self.facet_numbers = {doc_id: number for number, doc_id in enumerate(self.facet_doc_ids)}
+        self.facet_index = {
+            field: {value: Roaring_bitmap.deserialize(bitmap) for value, bitmap in values.items()}
+            for field, values in facet_index["facets"].items()
+        }
 
     def search(
         self,
@@ -49,6 +100,14 @@ class SearchEngine:
         smoothing_method=None,
         alpha=0.5,
         lamda=0.5,
+        phrase=False,
+        window=None,
+        conjunctive=False,
+        filters=None,
+        facet_filters=None,
+        facet_counts=None,
+        fuzzy_distance=None,
+        fuzzy_fields=(Indexes.STARS,),
     ):
         """
         searches for the query in the indexes.
@@ -73,26 +132,77 @@ class SearchEngine:
         lamda : float, optional
             The parameter used in some smoothing methods to balance between the document
             probability and the collection probability. Defaults to 0.5.
+        phrase : bool
+            If True, only the documents that contain the query as a phrase are scored in the
+            fields that have a positional index.
+        window : int
+            If given, only the documents that contain all the query terms at most `window`
+            positions apart are scored in the fields that have a positional index.
+        conjunctive : bool
+            If True, only the documents that contain all the query terms of a field are scored
+            in that field. The terms that do not exist in a field are ignored for it.
+        filters : dict
+            The ranges that the numeric fields of the documents must be in, with the structure of
+            {field: (low, high)}, like {"rating": (8, None), "release_year": (1990, 2000)}.
+            The bounds are inclusive and None means unbounded. The fields are rating,
+            release_year, budget and gross_worldwide.
+        facet_filters : dict
+            The values that the facet fields of the documents must have, with the structure of
+            {field: [values]}, like {"genres": ["Drama", "Crime"], "mpaa": ["PG-13"]}. A document
+            must have one of the values of every field. The fields are genres, languages,
+            countries_of_origin and mpaa, and the values are the crawled ones compared
+            case-insensitively.
+        facet_counts : list
+            The facet fields to count the values of in the matched documents.
+        fuzzy_distance : int
+            If given, every query term is expanded to the terms of the `fuzzy_fields` that are at
+            most `fuzzy_distance` edits away from it, so misspelled names still match. The
+            phrase, window and conjunctive constraints use the query terms as they are.
+        fuzzy_fields : tuple
+            The fields to expand the query terms in.
 
         Returns
         -------
         list
             A list of tuples containing the document IDs and their scores sorted by their scores.
+        dict
+            Only if `facet_counts` is given. The number of matched documents for each value of
+            each requested field, with the structure of {field: {value: count}}.
         """
         preprocessor = Preprocessor([{'query':query}])
-        query = preprocessor.preprocess()[0]['query']
+        query = preprocessor.preprocess()[0]['query'].split()
 
-        scores = {}
-        if method == "unigram":
-            self.find_scores_with_unigram_model(
-                query, smoothing_method, weights, scores, alpha, lamda
-            )
-        elif safe_ranking:
-            self.find_scores_with_safe_ranking(query, method, weights, scores)
-        else:
-            self.find_scores_with_unsafe_ranking(
-                query, method, weights, max_results, scores
+        allowed = self.find_filtered_documents(filters) if filters else None
+        if facet_filters:
+            faceted = self.find_faceted_documents(facet_filters)
+            allowed = faceted if allowed is None else allowed.intersection(faceted)
+        queries = {
+            field: self.expand_fuzzy_terms(query, field, fuzzy_distance)
+            if fuzzy_distance and field in fuzzy_fields else query
+            for field in weights
+        }
+        candidates = {
+            field: self.get_candidate_documents(
+                query, field, phrase, window, conjunctive, allowed, queries[field]
             )
+            for field in weights
+        }
+
+        scores = {}
+        for field in weights:
+            field_weights = {field: weights[field]}
+            if method == "unigram":
+                self.find_scores_with_unigram_model(
+                    queries[field], smoothing_method, field_weights, scores, alpha, lamda, candidates
+                )
+            elif safe_ranking:
+                self.find_scores_with_safe_ranking(
+                    queries[field], method, field_weights, scores, candidates
+                )
+            else:
+                self.find_scores_with_unsafe_ranking(
+                    queries[field], method, field_weights, max_results, scores, candidates
+                )
 
         final_scores = {}
 
@@ -102,8 +212,58 @@ class SearchEngine:
         if max_results is not None:
             result = result[:max_results]
 
+        if facet_counts is not None:
+            return result, self.count_facets(final_scores.keys(), facet_counts)
         return result
 
+    def boolean_search(self, query, max_results=None):
+        """
+        searches for a boolean and fielded query, like `stars:"tom hanks" AND genres:drama -horror`.
+
+        The query is compiled into an operator tree, the operands are reordered by the length of
+        their posting lists and the tree is executed on the posting lists directly. The matched
+        documents are not scored.
+
+        Parameters
+        ----------
+        query : str
+            The query to search for. See `QueryParser` for the syntax.
+        max_results : int
+            The maximum number of results to return. If None, all results are returned.
+
+        Returns
+        -------
+        list
+            The IDs of the matched documents, sorted by ID.
+        """
+        preprocessor = Preprocessor([])
+        parser = QueryParser(
+            lambda text: preprocessor.normalize(preprocessor.remove_punctuations(text)).split()
+        )
+        plan = parser.parse(query)
+        if plan is None:
+            return []
+
+        result = plan.optimize(self).execute(self).doc_ids
+        if max_results is not None:
+            result = result[:max_results]
+        return result
+
+    def get_all_documents(self):
+        """
+        Gets all the documents of the indexes.
+
+        Returns
+        -------
+        Posting_list
+            The IDs of all the documents.
+        """
+        if self.all_documents is None:
+            self.all_documents = Posting_list(
+                self.document_lengths_index[Indexes.SUMMARIES].index
+            )
+        return self.all_documents
+
     def aggregate_scores(self, weights, scores, final_scores):
         """
         Aggregates the scores of the fields.
@@ -125,7 +285,7 @@ class SearchEngine:
             final_scores[doc_id] = score
 
     def find_scores_with_unsafe_ranking(
-        self, query, method, weights, max_results, scores
+        self, query, method, weights, max_results, scores, candidates=None
     ):
         """
         Finds the scores of the documents using the unsafe ranking method using the tiered index.
@@ -142,32 +302,34 @@ class SearchEngine:
             The maximum number of results to return.
         scores : dict
             The scores of the documents.
+        candidates : dict, optional
+            The documents to score in each field. A field that is missing or maps to None
+            scores every document of the tiers that contains at least one of the query terms.
         """
+        candidates = candidates or {}
+        number_of_documents = self.metadata_index.index["document_count"]
         for field in weights:
-            tiered = self.tiered_index[field]
-            scorer = Scorer(tiered, len(tiered))
+            tiered = self.tiered_index[field].index
+            scores[field] = {}
+            allowed = candidates.get(field, None)
+            allowed = set(allowed) if allowed is not None else None
             if method == "OkapiBM25":
                 lenghts = self.document_lengths_index[field].index
                 avg_doc_len = sum(lenghts.values()) / len(lenghts)
-                for tier in [
-                            "first_tier", 
-                            "second_tier", 
-                            "third_tier"
-                            ]:
-                    index = tiered[tier]
-                    if len(scores[field]) < max_results:
-                        scores[field].update(scorer.compute_socres_with_okapi_bm25(query, avg_doc_len, lenghts, index))
-                    else:
-                        break
-            else:
-                for tier in ["first_tier", "second_tier", "third_tier"]:
-                    index = tiered[tier]
-                    if len(scores[field]) < max_results:
-                        scores[field].update(scorer.compute_scores_with_vector_space_model(query, method, index))
-                    else:
-                        break
+            for tier in ["first_tier", "second_tier", "third_tier"]:
+                if max_results is not None and len(scores[field]) >= max_results:
+                    break
+                scorer = Scorer(tiered[tier], number_of_documents)
+                # a tier only scores the candidates that it has postings for
+                documents = scorer.get_list_of_documents(query)
+                if allowed is not None:
+                    documents = [doc_id for doc_id in documents if doc_id in allowed]
+                if method == "OkapiBM25":
+                    scores[field].update(scorer.compute_socres_with_okapi_bm25(query, avg_doc_len, lenghts, documents))
+                else:
+                    scores[field].update(scorer.compute_scores_with_vector_space_model(query, method, documents))
 
-    def find_scores_with_safe_ranking(self, query, method, weights, scores):
+    def find_scores_with_safe_ranking(self, query, method, weights, scores, candidates=None):
         """
         Finds the scores of the documents using the safe ranking method.
 
@@ -181,21 +343,26 @@ class SearchEngine:
             The weights of the fields.
         scores : dict
             The scores of the documents.
+        candidates : dict, optional
+            The documents to score in each field. A field that is missing or maps to None
+            scores every document that contains at least one of the query terms.
         """
 
         #* DONE
+        candidates = candidates or {}
         for field in weights:
             index = self.document_indexes[field].index
             scorer = Scorer(index, len(index))
+            documents = candidates.get(field, None)
             if method == "OkapiBM25":
                 doc_lengths = self.document_lengths_index[field].index
                 avg_doc_len = sum(doc_lengths.values()) / len(doc_lengths)
-                scores[field] = scorer.compute_socres_with_okapi_bm25(query, avg_doc_len, doc_lengths)
+                scores[field] = scorer.compute_socres_with_okapi_bm25(query, avg_doc_len, doc_lengths, documents)
             else:
-                scores[field] = scorer.compute_scores_with_vector_space_model(query, method)
+                scores[field] = scorer.compute_scores_with_vector_space_model(query, method, documents)
 
     def find_scores_with_unigram_model(
-        self, query, smoothing_method, weights, scores, alpha=0.5, lamda=0.5
+        self, query, smoothing_method, weights, scores, alpha=0.5, lamda=0.5, candidates=None
     ):
         """
         Calculates the scores for each document based on the unigram model.
@@ -215,21 +382,326 @@ class SearchEngine:
         lamda : float, optional
             The parameter used in some smoothing methods to balance between the document
             probability and the collection probability. Defaults to 0.5.
+        candidates : dict, optional
+            The documents to score in each field. A field that is missing or maps to None
+            scores every document that contains at least one of the query terms.
         """
         #* DONE
+        candidates = candidates or {}
         for field in weights:
             if weights[field] == 0:
                 continue
             if field not in scores:
                 scores[field] = {}
             scorer = Scorer(self.document_indexes[field].index, len(self.document_indexes[field].index))
-            field_scores = scorer.compute_scores_with_unigram_model(query, smoothing_method, document_lengths=self.document_lengths_index[field].index, alpha=alpha, lamda=lamda)
+            field_scores = scorer.compute_scores_with_unigram_model(query, smoothing_method, document_lengths=self.document_lengths_index[field].index, alpha=alpha, lamda=lamda, documents=candidates.get(field, None))
             for doc_id, score in field_scores.items():
                 if doc_id not in scores[field]:
                     scores[field] = {}
                 scores[field][doc_id] = score
         return scores
 
+    def get_candidate_documents(
+        self, query, field, phrase=False, window=None, conjunctive=False, allowed=None,
+        expanded_query=None,
+    ):
+        """
+        Finds the documents of a field that satisfy the constraints of the query.
+
+        Parameters
+        ----------
+        query : List[str]
+            The preprocessed query terms.
+        field : Indexes
+            The field to search in.
+        phrase : bool
+            If True, the query terms must appear as a phrase.
+        window : int
+            If given, the query terms must appear at most `window` positions apart.
+        conjunctive : bool
+            If True, all the query terms that exist in the field must appear in the document.
+        allowed : set
+            If given, only these documents can be candidates.
+        expanded_query : List[str]
+            The query terms with their fuzzy expansions, used to find the documents of `allowed`
+            when there is no other constraint. Defaults to `query`.
+
+        Returns
+        -------
+        list
+            The candidate document IDs, or None if there is no constraint to apply on the field.
+        """
+        documents = None
+        if field in self.positional_index and phrase:
+            documents = list(self.find_phrase_matches(query, field))
+        elif field in self.positional_index and window is not None:
+            documents = list(self.find_proximity_matches(query, field, window))
+        elif conjunctive:
+            documents = self.find_conjunctive_matches(query, field)
+
+        if allowed is not None:
+            if documents is None:
+                index = self.document_indexes[field].index
+                documents = Scorer(index, len(index)).get_list_of_documents(expanded_query or query)
+            documents = [doc_id for doc_id in documents if doc_id in allowed]
+        return documents
+
+    def expand_fuzzy_terms(self, query, field, max_distance):
+        """
+        Expands the query terms to the terms of a field that are within an edit distance.
+
+        Parameters
+        ----------
+        query : List[str]
+            The preprocessed query terms.
+        field : Indexes
+            The field to look for the terms in.
+        max_distance : int
+            The maximum edit distance of an expansion.
+
+        Returns
+        -------
+        List[str]
+            The terms of the field that are close to the query terms. A query term that has no
+            close term is kept as it is.
+        """
+        bk_tree = self.get_bk_tree(field)
+        expansions = self.fuzzy_expansions[field]
+        expanded = []
+        for term in query:
+            if (term, max_distance) not in expansions:
+                matches = bk_tree.search(term, max_distance)
+                expansions[(term, max_distance)] = [word for _, word in matches] or [term]
+            expanded.extend(expansions[(term, max_distance)])
+        return expanded
+
+    def get_bk_tree(self, field):
+        """
+        Gets the BK-tree of the terms of a field, building it if it is not built yet.
+
+        Parameters
+        ----------
+        field : Indexes
+            The field of the terms.
+
+        Returns
+        -------
+        BKTree
+            The BK-tree of the terms of the field.
+        """
+        with self.bk_trees_lock:
+            if field not in self.bk_trees:
+                self.bk_trees[field] = BKTree(sorted(self.document_indexes[field].index))
+            return self.bk_trees[field]
+
+    def find_filtered_documents(self, filters):
+        """
+        Finds the documents whose numeric fields are in the given ranges.
+
+        Parameters
+        ----------
+        filters : dict
+            The ranges of the fields with the structure of {field: (low, high)}.
+
+        Returns
+        -------
+        set
+            The IDs of the documents that are in all the ranges.
+        """
+        ranges = []
+        for field, (low, high) in filters.items():
+            if field not in self.numeric_index:
+                raise ValueError(f"Invalid filter field: {field}")
+            ranges.append(self.numeric_index[field].range(low, high))
+
+        # the narrowest range goes first, so the later intersections are cheap
+        ranges.sort(key=len)
+        allowed = set(ranges[0]) if ranges else set()
+        for documents in ranges[1:]:
+            allowed.intersection_update(documents)
+        return allowed
+
+    def get_posting_list(self, term, field):
+        """
+        Gets the sorted posting list of a term.
+
+        Parameters
+        ----------
+        term : str
+            The term to get the posting list for.
+        field : Indexes
+            The field to search in.
+
+        Returns
+        -------
+        Posting_list
+            The posting list of the term, or None if the term is not in the field.
+        """
+        posting_lists = self.posting_lists[field]
+        if term not in posting_lists:
+            postings = self.document_indexes[field].index.get(term, None)
+            if postings is None:
+                return None
+            posting_lists[term] = Posting_list(postings)
+        return posting_lists[term]
+
+    def find_conjunctive_matches(self, query, field):
+        """
+        Finds the documents that contain all the query terms of a field.
+
+        Parameters
+        ----------
+        query : List[str]
+            The preprocessed query terms.
+        field : Indexes
+            The field to search in. The terms that do not exist in it are ignored.
+
+        Returns
+        -------
+        list
+            The sorted IDs of the matched documents.
+        """
+        posting_lists = [self.get_posting_list(term, field) for term in set(query)]
+        return intersect_posting_lists([posting_list for posting_list in posting_lists if posting_list])
+
+    def find_faceted_documents(self, facet_filters):
+        """
+        Finds the documents that have one of the given values in every facet field.
+
+        Parameters
+        ----------
+        facet_filters : dict
+            The accepted values of the fields with the structure of {field: [values]}.
+
+        Returns
+        -------
+        set
+            The IDs of the matched documents.
+        """
+        matched = None
+        for field, values in facet_filters.items():
+            if field not in self.facet_index:
+                raise ValueError(f"Invalid facet field: {field}")
+            if isinstance(values, str):
+                values = [values]
+            bitmap = Roaring_bitmap()
+            for value in values:
+                bitmap = bitmap | self.facet_index[field].get(normalize_facet_value(value), Roaring_bitmap())
+            matched = bitmap if matched is None else matched & bitmap
+        if matched is None:
+            return set()
+        return {self.facet_doc_ids[number] for number in matched}
+
+    def count_facets(self, doc_ids, fields):
+        """
+        Counts the values of the facet fields in a set of documents.
+
+        Parameters
+        ----------
+        doc_ids : iterable of str
+            The IDs of the documents.
+        fields : list
+            The facet fields to count.
+
+        Returns
+        -------
+        dict
+            The number of documents for each value of each field, with the structure of
+            {field: {value: count}}, sorted by the counts.
+        """
+        documents = Roaring_bitmap.from_integers(
+            self.facet_numbers[doc_id] for doc_id in doc_ids if doc_id in self.facet_numbers
+        )
+        counts = {}
+        for field in fields:
+            if field not in self.facet_index:
+                raise ValueError(f"Invalid facet field: {field}")
+            field_counts = {}
+            for value, bitmap in self.facet_index[field].items():
+                if count := bitmap.intersection_cardinality(documents):
+                    field_counts[value] = count
+            counts[field] = dict(sorted(field_counts.items(), key=lambda x: x[1], reverse=True))
+        return counts
+
+    def get_positions(self, terms, field):
+        """
+        Gets the decoded positions of the terms in the documents that contain all of them.
+
+        Parameters
+        ----------
+        terms : List[str]
+            The terms to get the positions for.
+        field : Indexes
+            The field to search in.
+
+        Returns
+        -------
+        dict
+            A dictionary from the document IDs to the list of positions of each term.
+        """
+        index = self.positional_index[field].index
+        if not terms or any(term not in index for term in terms):
+            return {}
+
+        posting_lists = [self.get_posting_list(term, field) for term in set(terms)]
+        if None in posting_lists:
+            return {}
+
+        postings = [index[term] for term in terms]
+        documents = intersect_posting_lists(posting_lists)
+
+        return {
+            doc_id: [decode_positions(posting[doc_id]) for posting in postings]
+            for doc_id in documents
+        }
+
+    def find_phrase_matches(self, phrase, field):
+        """
+        Finds the documents in which the terms appear as a phrase.
+
+        Parameters
+        ----------
+        phrase : List[str]
+            The preprocessed terms of the phrase.
+        field : Indexes
+            The field to search in. It must have a positional index.
+
+        Returns
+        -------
+        dict
+            A dictionary from the matched document IDs to the number of occurrences of the phrase.
+        """
+        matches = {}
+        for doc_id, positions in self.get_positions(phrase, field).items():
+            if starts := intersect_phrase(positions):
+                matches[doc_id] = len(starts)
+        return matches
+
+    def find_proximity_matches(self, terms, field, window):
+        """
+        Finds the documents in which all the terms appear at most `window` positions apart.
+
+        Parameters
+        ----------
+        terms : List[str]
+            The preprocessed terms.
+        field : Indexes
+            The field to search in. It must have a positional index.
+        window : int
+            The maximum distance between the first and the last term.
+
+        Returns
+        -------
+        dict
+            A dictionary from the matched document IDs to the number of windows that contain all the terms.
+        """
+        terms = list(dict.fromkeys(terms))
+        matches = {}
+        for doc_id, positions in self.get_positions(terms, field).items():
+            if starts := intersect_window(positions, window):
+                matches[doc_id] = len(starts)
+        return matches
+
     def merge_scores(self, scores1, scores2):
         """
         Merges two dictionaries of scores.
@@ -1,6 +1,10 @@
+from .bk_tree import *
+from .context_spell_correction import *
 from .crawler import *
 from .evaluation import *
 from .preprocess import *
+from .query_parser import *
+from .rate_limiter import *
 from .scorer import *
 from .snippet import *
 from .spell_correction import *
@@ -0,0 +1,86 @@
+from .spell_correction import edit_distance
+
+
+class BKTree:
+    def __init__(self, words):
+        """
+        Initialize the BKTree
+
+        A BK-tree keeps every word under its parent by their edit distance. By the triangle
+        inequality, the words within distance k of a query are only in the subtrees whose edge
+        distance is within k of the distance of the query to their parent, so most of the
+        dictionary is never visited.
+
+        Parameters
+        ----------
+        words : iterable of str
+            The dictionary of the terms.
+        """
+        self.root = None
+        self.size = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, word):
+        """
+        Add a word to the tree.
+
+        Parameters
+        ----------
+        word : str
+            The word to add.
+        """
+        if self.root is None:
+            self.root = (word, {})
+            self.size = 1
+            return
+
+        node_word, children = self.root
+        while True:
+            distance = edit_distance(word, node_word, transpositions=False)
+            if distance == 0:
+                return
+            if distance not in children:
+                children[distance] = (word, {})
+                self.size += 1
+                return
+            node_word, children = children[distance]
+
+    def search(self, word, max_distance):
+        """
+        Find the words of the tree within an edit distance of a word.
+
+        Parameters
+        ----------
+        word : str
+            The query word.
+        max_distance : int
+            The maximum edit distance of a match.
+
+        Returns
+        -------
+        list of tuple
+            The matched words as (distance, word), sorted by the distance.
+        """
+        if self.root is None:
+            return []
+
+        matches = []
+        stack = [self.root]
+        while stack:
+            node_word, children = stack.pop()
+            # the exact distance is only needed up to the farthest child that can be followed
+            limit = max_distance + max(children, default=0)
+            distance = edit_distance(word, node_word, limit, transpositions=False)
+            if distance is None:
+                continue
+            if distance <= max_distance:
+                matches.append((distance, node_word))
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        matches.sort()
+        return matches
@@ -0,0 +1,167 @@
+import math
+import time
+from collections import Counter, OrderedDict
+from threading import Lock
+
+from ..indexer.positional_index import decode_positions
+from .spell_correction import edit_distance
+
+
+class ContextSpellCorrection:
+    def __init__(
+        self,
+        spell_correction,
+        positional_index,
+        error_probability=0.01,
+        lamda=0.7,
+        beam_width=5,
+        time_budget=0.05,
+        cache_size=1024,
+    ):
+        """
+        Initialize the ContextSpellCorrection
+
+        A noisy channel corrector: a rewrite of the query is scored by the probability of its
+        words under a bigram model of the summaries, times the probability of typing the query
+        when the rewrite was meant. The candidates of every word come from another corrector and
+        the rewrites are searched with a beam search.
+
+        Parameters
+        ----------
+        spell_correction : SpellCorrection
+            The corrector that suggests the candidates of each word. Its `word_counter` is
+            used as the unigram model.
+        positional_index : dict
+            The positional index of the summaries, with the structure of
+            {term: {document_id: [first_position, gap, gap, ...]}}.
+        error_probability : float
+            The probability of every edit in the channel model.
+        lamda : float
+            The weight of the bigram probability against the unigram probability.
+        beam_width : int
+            The number of partial rewrites that are kept after each word.
+        time_budget : float
+            The number of seconds a query can take. The words that are left when it runs out
+            are not corrected.
+        cache_size : int
+            The number of corrected queries to remember.
+        """
+        self.spell_correction = spell_correction
+        self.unigrams = spell_correction.word_counter
+        self.total_count = sum(self.unigrams.values())
+        self.bigrams = self.count_bigrams(positional_index)
+        self.log_error_probability = math.log(error_probability)
+        self.log_correct_probability = math.log(1 - error_probability)
+        self.lamda = lamda
+        self.beam_width = beam_width
+        self.time_budget = time_budget
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.cache_lock = Lock()
+
+    @property
+    def word_counter(self):
+        return self.unigrams
+
+    def count_bigrams(self, positional_index):
+        """
+        Count the pairs of terms that appear next to each other in the documents.
+
+        Parameters
+        ----------
+        positional_index : dict
+            The positional index of a field.
+
+        Returns
+        -------
+        Counter
+            The number of times each (first, second) pair of terms appears.
+        """
+        documents = {}
+        for term, postings in positional_index.items():
+            for doc_id, gaps in postings.items():
+                terms = documents.setdefault(doc_id, {})
+                for position in decode_positions(gaps):
+                    terms[position] = term
+
+        bigrams = Counter()
+        for terms in documents.values():
+            for position, term in terms.items():
+                # the items of a document are one position apart, so they do not make pairs
+                if (following := terms.get(position + 1, None)) is not None:
+                    bigrams[(term, following)] += 1
+        return bigrams
+
+    def language_log_probability(self, previous, word):
+        """
+        Calculate the log probability of a word after another one, with the bigram probability
+        interpolated with the unigram probability.
+        """
+        # a word that is not in the vocabulary is taken as a hundredth of a single occurrence
+        unigram = (self.unigrams.get(word, 0) or 0.01) / max(self.total_count, 1)
+        if previous is None or not self.unigrams.get(previous, 0):
+            return math.log(unigram)
+        bigram = self.bigrams.get((previous, word), 0) / self.unigrams[previous]
+        return math.log(self.lamda * bigram + (1 - self.lamda) * unigram)
+
+    def channel_log_probability(self, typed, intended):
+        """
+        Calculate the log probability of typing a word when another word was meant.
+        """
+        if typed == intended:
+            return self.log_correct_probability
+        return self.log_error_probability * edit_distance(typed, intended)
+
+    def get_candidates(self, word):
+        candidates = [word]
+        for candidate in self.spell_correction.find_nearest_words(word):
+            if candidate != word:
+                candidates.append(candidate)
+        return candidates
+
+    def spell_check(self, query):
+        """
+        Find correct form of a misspelled query.
+
+        Parameters
+        ----------
+        query : str
+            The misspelled query.
+
+        Returns
+        -------
+        str
+            Correct form of the query.
+        """
+        with self.cache_lock:
+            if query in self.cache:
+                self.cache.move_to_end(query)
+                return self.cache[query]
+
+        deadline = time.monotonic() + self.time_budget
+        words = query.split()
+        # every beam is (log probability, corrected words)
+        beams = [(0.0, [])]
+        finished = True
+        for i, word in enumerate(words):
+            if time.monotonic() > deadline:
+                beams = [(score, corrected + words[i:]) for score, corrected in beams[:1]]
+                finished = False
+                break
+            expanded = []
+            for candidate in self.get_candidates(word):
+                channel = self.channel_log_probability(word, candidate)
+                for score, corrected in beams:
+                    previous = corrected[-1] if corrected else None
+                    score += channel + self.language_log_probability(previous, candidate)
+                    expanded.append((score, corrected + [candidate]))
+            expanded.sort(key=lambda beam: beam[0], reverse=True)
+            beams = expanded[:self.beam_width]
+
+        result = " ".join(beams[0][1])
+        if finished:
+            with self.cache_lock:
+                self.cache[query] = result
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return result
@@ -1,10 +1,33 @@
-from requests import get
-from bs4 import BeautifulSoup
+from requests import Session, RequestException
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
 from collections import deque
-from concurrent.futures import ThreadPoolExecutor, wait
-from threading import Lock
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from threading import Condition, Lock
+import asyncio
+import hashlib
 import json
+import os
 import re
+import time
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+try:
+    import lxml
+    parser_features = 'lxml'
+except ImportError:
+    parser_features = 'html.parser'
+
+from .rate_limiter import TokenBucket, AdaptiveConcurrency, CrawlMetrics, get_backoff_delay
+from ..indexer.LSH import IncrementalMinHashLSH
+
+# only the tags that the information is read from are built into the trees of the pages
+movie_page_strainer = SoupStrainer(['title', 'li', 'a'])
+summary_page_strainer = SoupStrainer(['title', 'section'])
+review_page_strainer = SoupStrainer(['title', 'div'])
+json_data_pattern = re.compile(r'<script[^>]*type="application/ld\+json"[^>]*>(.*?)</script>', re.S)
 
 
 class IMDbCrawler:
@@ -14,9 +37,16 @@ class IMDbCrawler:
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36'
     }
-    top_250_URL = 'https://www.imdb.com/chart/top/'
-
-    def __init__(self, crawling_threshold=1000):
+    # the responses of an overloaded or throttling site, worth retrying later
+    retryable_statuses = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self, crawling_threshold=1000, base_URL='https://www.imdb.com', max_workers=20, max_frontier_size=None,
+        report_every=50, requests_per_second=10, max_retries=3, retry_base_delay=0.5, timeout=30,
+        crawled_path='data/IMDB_crawled.json', log_path='data/IMDB_crawled.jsonl',
+        checkpoint_path='data/IMDB_not_crawled.json', checkpoint_every=25, parse_workers=0,
+        validators_path='data/IMDB_validators.json', changed_path='data/IMDB_changed.json', near_duplicates=None,
+    ):
         """
         Initialize the crawler
 
@@ -24,14 +54,93 @@ class IMDbCrawler:
         ----------
         crawling_threshold: int
             The number of pages to crawl
+        base_URL: str
+            The address of the site, it can point to a local server that serves recorded pages
+        max_workers: int
+            The number of pages that are fetched at the same time
+        max_frontier_size: int
+            The maximum number of links waiting to be crawled. The links that are found when it is full
+            are dropped, they can be found again later. Defaults to crawling_threshold.
+        report_every: int
+            The number of crawled pages between two reports of the crawling rate
+        requests_per_second: float
+            The highest rate of requests to the site. The limit and the adaptive concurrency are global
+            rather than per host, as every page the crawler requests is on the host of base_URL.
+        max_retries: int
+            The number of times a failed request is retried
+        retry_base_delay: float
+            The delay of the first retry in seconds, it doubles with every retry and is jittered
+        timeout: float
+            The number of seconds to wait for a response
+        crawled_path: str
+            The JSON file of all the crawled movies, written at the end of the crawling
+        log_path: str
+            The JSON Lines file that every movie is appended to as soon as it is crawled. None to not log.
+        checkpoint_path: str
+            The JSON file of the frontier, written every checkpoint_every movies so the crawling can resume
+        checkpoint_every: int
+            The number of crawled movies between two checkpoints of the frontier
+        parse_workers: int
+            The number of processes that parse the pages, so the parsing does not hold the fetching
+            threads back. 0 to parse the pages in the fetching threads.
+        validators_path: str
+            The JSON file of the ETag, the Last-Modified date and the content hash of every crawled page,
+            so a re-crawling only downloads and parses the pages that changed. None to not keep them.
+        changed_path: str
+            The JSON file of the movies that were crawled or changed in this run, for the stages after
+            the crawling to only process them. None to not write it.
+        near_duplicates: IncrementalMinHashLSH
+            The LSH index of the summaries of the crawled movies. A movie whose summaries are a near duplicate
+            of a crawled movie gets the id of that movie as its near_duplicate_of, so it is not indexed.
         """
         #* DONE
         self.crawling_threshold = crawling_threshold
+        self.base_URL = base_URL.rstrip('/')
+        self.top_250_URL = self.base_URL + '/chart/top/'
+        self.max_workers = max_workers
         self.not_crawled = deque()
         self.crawled = list()
         self.added_ids = set()
+        self.max_frontier_size = max_frontier_size or crawling_threshold
+        self.report_every = report_every
         self.lock = Lock()
         self.add_queue_lock = None
+        # the workers wait on it for new links, with the same lock that guards the frontier
+        self.frontier_condition = Condition(self.lock)
+        self.in_flight = 0
+        self.start_time = None
+        # one pool of keep-alive connections is shared by all the threads
+        self.session = Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # the requests are spread by the token bucket and the number of them in flight adapts to the site.
+        # All the links are made from base_URL, so one limiter for the crawler is the limiter of its host.
+        self.rate_limiter = TokenBucket(requests_per_second)
+        self.concurrency = AdaptiveConcurrency(initial=min(4, max_workers), maximum=max_workers)
+        self.metrics = CrawlMetrics()
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.timeout = timeout
+        self.crawled_path = crawled_path
+        self.log_path = log_path
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self.log_file = None
+        self.parse_workers = parse_workers
+        self.parse_executor = None
+        self.validators_path = validators_path
+        self.changed_path = changed_path
+        # {URL: {'etag': str, 'last_modified': str, 'hash': str}}
+        self.validators = {}
+        self.changed = []
+        self.recrawling = False
+        self.near_duplicates = near_duplicates
+        # the URLs that are taken from the frontier but not crawled yet, by their ids
+        self.in_flight_URLs = {}
+        self.crawled_at_start = 0
+        self.crawled_positions = {}
+        self.concurrency_condition = None
 
     def get_id_from_URL(self, URL):
         """
@@ -50,55 +159,287 @@ class IMDbCrawler:
         #* DONE
         return URL.split('/')[4]
 
+    def get_movie_URL(self, id):
+        """
+        Get the URL of the page of a movie on the site, without any query string.
+
+        Parameters
+        ----------
+        id: str
+            The id of the movie
+        Returns
+        ----------
+        str
+            The URL of the movie
+        """
+        return f'{self.base_URL}/title/{id}/'
+
     def write_to_file_as_json(self):
         """
         Save the crawled files into json
         """
         #* DONE
-        with open('data/IMDB_crawled.json', 'w') as f:
-            json.dump(self.crawled, f)
+        with self.lock:
+            write_json_atomically(self.crawled_path, self.crawled)
+            self.write_checkpoint()
+            if self.validators_path is not None:
+                write_json_atomically(self.validators_path, self.validators)
+            if self.changed_path is not None:
+                write_json_atomically(self.changed_path, self.changed)
 
-        with open('IMDB_not_crawled.json', 'w') as f:
-            json.dump(self.not_crawled, f)
     def read_from_file_as_json(self):
         """
-        Read the crawled files from json
+        Read the crawled files from json, to resume a crawling that was stopped.
+
+        The movies are read from the crawled file and the crawl log, and the frontier from its last
+        checkpoint. The files that do not exist are skipped.
         """
         #* DONE
-        with open('data/IMDB_crawled.json', 'r') as f:
-            self.crawled = json.load(f)
-
+        crawled = {}
+        if os.path.exists(self.crawled_path):
+            with open(self.crawled_path, 'r') as f:
+                crawled.update((movie['id'], movie) for movie in json.load(f))
+        if self.log_path is not None and os.path.exists(self.log_path):
+            with open(self.log_path, 'r') as f:
+                for line in f:
+                    try:
+                        movie = json.loads(line)
+                    except json.JSONDecodeError:
+                        # the last line of a killed crawling may be cut
+                        continue
+                    crawled[movie['id']] = movie
+        self.crawled = list(crawled.values())
 
-        self.added_ids = {self.get_id_from_URL(url) for url in self.not_crawled}
-        self.added_ids.update([movie['id'] for movie in self.crawled])
+        self.not_crawled = deque()
+        self.added_ids = set()
+        if self.checkpoint_path is not None and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, 'r') as f:
+                checkpoint = json.load(f)
+            # the older checkpoints are only the list of the URLs
+            if isinstance(checkpoint, list):
+                checkpoint = {'not_crawled': checkpoint, 'added_ids': []}
+            self.not_crawled.extend(
+                url for url in checkpoint['not_crawled'] if self.get_id_from_URL(url) not in crawled
+            )
+            self.added_ids.update(checkpoint['added_ids'])
+
+        self.added_ids.update(self.get_id_from_URL(url) for url in self.not_crawled)
+        self.added_ids.update(crawled)
+
+        if self.validators_path is not None and os.path.exists(self.validators_path):
+            with open(self.validators_path, 'r') as f:
+                self.validators = json.load(f)
+
+        if self.near_duplicates is not None:
+            for movie in self.crawled:
+                if 'near_duplicate_of' not in movie and movie.get('summaries'):
+                    self.near_duplicates.add(movie['id'], ' '.join(movie['summaries']))
+
+    def write_checkpoint(self):
+        """
+        Save the frontier, with the URLs that are in flight, so the crawling can resume from it.
+        The caller must hold the lock.
+        """
+        # the frontier of a re-crawling is the movies that were crawled before, not the one to resume
+        if self.checkpoint_path is None or self.recrawling:
+            return
+        if self.log_file is not None:
+            # the checkpoint must not be ahead of the movies in the log
+            self.log_file.flush()
+            os.fsync(self.log_file.fileno())
+        write_json_atomically(self.checkpoint_path, {
+            'not_crawled': list(self.in_flight_URLs.values()) + list(self.not_crawled),
+            'added_ids': sorted(self.added_ids),
+        })
+
+    def open_log(self):
+        if self.log_path is None:
+            return
+        directory = os.path.dirname(self.log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.log_file = open(self.log_path, 'a+')
+        # a line that was cut when the crawling was killed is ended, so the next movie gets its own line
+        if self.log_file.tell():
+            self.log_file.seek(self.log_file.tell() - 1)
+            if self.log_file.read(1) != '\n':
+                self.log_file.write('\n')
+
+    def close_log(self):
+        with self.lock:
+            if self.log_file is not None:
+                self.log_file.close()
+                self.log_file = None
 
-    def crawl(self, URL):
+    def crawl(self, URL, validate=None, conditional=False):
         """
         Make a get request to the URL and return the response
 
+        The request waits for the rate limiter and the concurrency limit, and it is retried with a
+        jittered backoff if it fails, if the site is overloaded or if the page is not valid. The
+        validators of a successful response are kept for the next re-crawling.
+
         Parameters
         ----------
         URL: str
             The URL of the site
+        validate: callable
+            Takes the text of a successful response and returns False if it is an error page
+        conditional: bool
+            Send the validators of the last response of the URL, so the site can answer 304 Not Modified
         Returns
         ----------
         requests.models.Response
-            The response of the get request
+            The response of the get request. A RequestException is raised if the last attempt still
+            failed, e.g. with a 503 or an error page.
         """
         #* DONE
-        response = get(url=URL, headers=self.headers)
+        response = None
+        retry_after = None
+        headers = self.get_conditional_headers(URL) if conditional else self.headers
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.get_retry_delay(retry_after, attempt - 1))
+            self.rate_limiter.acquire()
+            self.concurrency.acquire()
+            start = time.monotonic()
+            try:
+                response = self.session.get(url=URL, headers=headers, timeout=self.timeout)
+                status, text, retry_after = response.status_code, response.text, response.headers.get('Retry-After')
+            except RequestException as e:
+                print(f"{URL}-request failed: {e}")
+                status = text = retry_after = None
+            retry = self.should_retry(status, text, validate)
+            self.record_request(time.monotonic() - start, status, retry, attempt)
+            if not retry:
+                break
+        if retry:
+            raise RequestException(f"{URL}-failed after {self.max_retries + 1} attempts")
+        if response.status_code == 200:
+            self.record_validators(URL, response.headers, response.text)
         return response
 
+    def get_conditional_headers(self, URL):
+        headers = dict(self.headers)
+        validators = self.validators.get(URL, {})
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def record_validators(self, URL, headers, text):
+        validators = {
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'hash': hashlib.sha1(text.encode()).hexdigest(),
+        }
+        with self.lock:
+            self.validators[URL] = validators
+
+    def crawl_if_changed(self, URL, validate=None):
+        """
+        Make a conditional get request to the URL and return its text if the page changed.
+
+        Parameters
+        ----------
+        URL: str
+            The URL of the site
+        validate: callable
+            Takes the text of a successful response and returns False if it is an error page
+        Returns
+        ----------
+        str
+            The text of the page, None if it is the same as when it was crawled before. A RequestException
+            is raised if the site answers with anything but 200 or 304.
+        """
+        hash = self.validators.get(URL, {}).get('hash')
+        response = self.crawl(URL, validate=validate, conditional=True)
+        if response.status_code == 304:
+            return None
+        if response.status_code != 200:
+            raise RequestException(f"{URL}-failed with status {response.status_code}")
+        # some sites ignore the validators, then the content hash tells if the page changed
+        if hash is not None and self.validators[URL]['hash'] == hash:
+            return None
+        return response.text
+
+    def should_retry(self, status, text, validate=None):
+        """
+        Check if a request has to be sent again.
+
+        Parameters
+        ----------
+        status: int
+            The status code of the response, None if no response was received
+        text: str
+            The text of the response
+        validate: callable
+            Takes the text of a successful response and returns False if it is an error page
+        Returns
+        ----------
+        bool
+            True if the request failed in a way that may not happen again
+        """
+        if status is None or status in self.retryable_statuses:
+            return True
+        # a 304 Not Modified has no text to validate
+        return status < 300 and validate is not None and not validate(text)
+
+    def record_request(self, latency, status, retry, attempt):
+        ok = status is not None and status < 400 and not retry
+        self.concurrency.release(latency, ok)
+        self.metrics.record(latency, ok, retry=attempt > 0)
+
+    def get_retry_delay(self, retry_after, attempt):
+        """
+        Get the number of seconds to wait before a retry, the Retry-After header of the site if it sent one.
+        """
+        if retry_after is not None and retry_after.isdigit():
+            return float(retry_after)
+        return get_backoff_delay(attempt, base=self.retry_base_delay)
+
+    def has_movie_data(self, text):
+        # the error pages of the site do not have the ld+json data of the movie
+        return 'application/ld+json' in text
+
+    def get_metrics(self):
+        """
+        Get the metrics of the requests of the crawler.
+
+        Returns
+        ----------
+        dict
+            The numbers of requests, errors and retries, the achieved request rate, the error rate, the
+            average latency, the current concurrency limit and the number of movies crawled per second.
+        """
+        metrics = self.metrics.get_metrics()
+        metrics['concurrency_limit'] = self.concurrency.limit
+        metrics['movies_per_second'] = self.get_movies_per_second()
+        return metrics
+
     def extract_top_250(self):
         """
         Extract the top 250 movies from the top 250 page and use them as seed for the crawler to start crawling.
         """
         #* DONE
-        response = get(self.top_250_URL, headers=self.headers)
-        res = re.search(r'json">([^<]+)</script>', response.text)
-        urls = [element['item']['url'] for element in json.loads(res.group(1))['itemListElement']]
-        self.not_crawled.extend(urls)
-        self.added_ids.update({self.get_id_from_URL(url) for url in urls})
+        self.add_top_250(self.crawl(self.top_250_URL).text)
+
+    def add_top_250(self, text):
+        """
+        Add the movies of the top 250 page to the movies to crawl.
+
+        Parameters
+        ----------
+        text: str
+            The HTML of the top 250 page
+        """
+        res = re.search(r'json">([^<]+)</script>', text)
+        ids = [self.get_id_from_URL(element['item']['url']) for element in json.loads(res.group(1))['itemListElement']]
+        # a resumed crawling has seen most of them already
+        ids = [id for id in dict.fromkeys(ids) if id not in self.added_ids]
+        self.not_crawled.extend(self.get_movie_URL(id) for id in ids)
+        self.added_ids.update(ids)
 
 
     def get_imdb_instance(self):
@@ -127,34 +468,109 @@ class IMDbCrawler:
         """
         Start crawling the movies until the crawling threshold is reached.
         #* DONE
-            replace WHILE_LOOP_CONSTRAINTS with the proper constraints for the while loop.
-            replace NEW_URL with the new URL to crawl.
-            replace THERE_IS_NOTHING_TO_CRAWL with the condition to check if there is nothing to crawl.
-            delete help variables.
+        The frontier is shared by max_workers threads. Each of them takes the next link itself, and the
+        crawling ends when the threshold is reached or when the frontier is empty and no page is in flight.
 
         ThreadPoolExecutor is used to make the crawler faster by using multiple threads to crawl the pages.
         You are free to use it or not. If used, not to forget safe access to the shared resources.
         """
 
-        # help variables
-        # WHILE_LOOP_CONSTRAINTS = None
-        # NEW_URL = None
-        # THERE_IS_NOTHING_TO_CRAWL = None
-        
         self.extract_top_250()
-        futures = []
-        crawled_counter = 0
-
-        with ThreadPoolExecutor(max_workers=20) as executor:
-            while crawled_counter <= self.crawling_threshold:
-                crawled_counter += 1
-                if self.not_crawled:
-                    URL = self.not_crawled.popleft()
-                    futures.append(executor.submit(self.crawl_page_info, URL))
-                else:
-                    wait(futures)
-                    break
-                    # futures = []
+        self.reset_progress()
+        self.open_log()
+        self.start_parsers()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [executor.submit(self.crawl_worker) for _ in range(self.max_workers)]
+                wait(futures)
+        finally:
+            self.stop_parsers()
+            self.close_log()
+        self.report_progress()
+
+    def crawl_worker(self, crawl_page_info=None):
+        """
+        Take links from the frontier and crawl them, until the crawling threshold is reached or there is
+        nothing left to crawl. A worker that finds the frontier empty waits for the pages that are still in
+        flight, as they may add new links.
+
+        Parameters
+        ----------
+        crawl_page_info: callable
+            Crawls the URL of a movie. Defaults to crawl_page_info.
+        """
+        crawl_page_info = crawl_page_info or self.crawl_page_info
+        while True:
+            with self.frontier_condition:
+                self.frontier_condition.wait_for(self.can_take_URL)
+                if self.is_crawling_finished():
+                    self.frontier_condition.notify_all()
+                    return
+                URL = self.take_URL()
+            try:
+                crawl_page_info(URL)
+            except Exception as e:
+                print(f"{URL}-failed to crawl: {e}")
+            finally:
+                with self.frontier_condition:
+                    self.finish_URL(URL)
+                    self.frontier_condition.notify_all()
+            self.report_progress(every=self.report_every)
+
+    def reset_progress(self):
+        self.crawled_at_start = len(self.crawled)
+        self.in_flight = 0
+        self.in_flight_URLs = {}
+        self.start_time = time.monotonic()
+
+    def can_take_URL(self):
+        return bool(self.not_crawled) or self.is_crawling_finished()
+
+    def is_crawling_finished(self):
+        # a resumed crawling counts the movies it has already crawled towards the threshold, and the pages
+        # that failed do not count. A movie leaves in_flight_URLs as soon as it is added to the crawled ones.
+        if not self.recrawling and len(self.crawled) + len(self.in_flight_URLs) >= self.crawling_threshold:
+            return True
+        return not self.not_crawled and self.in_flight == 0
+
+    def take_URL(self):
+        self.in_flight += 1
+        URL = self.not_crawled.popleft()
+        self.in_flight_URLs[self.get_id_from_URL(URL)] = URL
+        return URL
+
+    def finish_URL(self, URL):
+        self.in_flight -= 1
+        self.in_flight_URLs.pop(self.get_id_from_URL(URL), None)
+
+    def get_movies_per_second(self):
+        """
+        Get the number of movies crawled per second since the crawling started.
+        """
+        if self.start_time is None:
+            return 0.0
+        elapsed = time.monotonic() - self.start_time
+        return (len(self.crawled) - self.crawled_at_start) / elapsed if elapsed > 0 else 0.0
+
+    def report_progress(self, every=None):
+        """
+        Print the number of crawled movies and the crawling rate.
+
+        Parameters
+        ----------
+        every: int
+            If given, only report when the number of crawled movies is a multiple of it
+        """
+        crawled = len(self.crawled)
+        if every is not None and (not crawled or crawled % every):
+            return
+        metrics = self.get_metrics()
+        print(
+            f"crawled {crawled} movies, {metrics['movies_per_second']:.2f} movies per second, "
+            f"{metrics['request_rate']:.2f} requests per second, {metrics['error_rate']:.1%} errors, "
+            f"{metrics['concurrency_limit']} requests in flight at most"
+        )
 
     def crawl_page_info(self, URL):
         """
@@ -168,19 +584,308 @@ class IMDbCrawler:
         """
         # print("new iteration")
         #* DONE?
-        response = self.crawl(URL)
+        response = self.crawl(URL, validate=self.has_movie_data)
         movie = self.get_imdb_instance()
         movie['id'] = self.get_id_from_URL(URL)
         self.extract_movie_info(response, movie, URL)
+        self.add_crawled_movie(movie)
+
+    def start_recrawling(self):
+        """
+        Crawl the movies that were crawled before again, with conditional requests.
+
+        Only the pages that changed are downloaded and parsed, the other fields of a movie are kept.
+        The movies that changed replace their old versions and are added to the changed movies. All the
+        crawled movies are checked, as the crawling threshold only limits new movies, and the frontier of
+        the last crawling is kept for later.
+        """
+        frontier = self.not_crawled
+        self.not_crawled = deque(self.get_movie_URL(movie['id']) for movie in self.crawled)
+        self.crawled_positions = {movie['id']: i for i, movie in enumerate(self.crawled)}
+        self.reset_progress()
+        self.recrawling = True
+        self.open_log()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(self.crawl_worker, self.recrawl_page_info) for _ in range(self.max_workers)
+                ]
+                wait(futures)
+        finally:
+            self.close_log()
+            self.recrawling = False
+            self.not_crawled = frontier
+        self.report_progress()
+
+    def recrawl_page_info(self, URL):
+        """
+        Crawl the pages of a movie again, and update the movie if any of them changed.
+
+        Parameters
+        ----------
+        URL: str
+            The URL of the site
+        """
+        page = self.crawl_if_changed(URL, validate=self.has_movie_data)
+        summary = self.crawl_if_changed(IMDbCrawler.get_summary_link(URL))
+        review = self.crawl_if_changed(IMDbCrawler.get_review_link(URL))
+        if page is None and summary is None and review is None:
+            return
+
+        with self.lock:
+            movie = dict(self.crawled[self.crawled_positions[self.get_id_from_URL(URL)]])
+        # every page fills its own fields, so the fields of the pages that did not change are kept
+        if page is not None:
+            IMDbCrawler.parse_movie_page(page, movie, self.base_URL)
+        if summary is not None:
+            IMDbCrawler.parse_summary_page(summary, movie)
+        if review is not None:
+            IMDbCrawler.parse_review_page(review, movie)
+        self.update_crawled_movie(movie)
+
+    def update_crawled_movie(self, movie):
+        """
+        Replace a crawled movie with its new version.
+
+        Parameters
+        ----------
+        movie: dict
+            The new instance of the movie
+        """
+        movie.pop('near_duplicate_of', None)
+        # the summaries may have changed, so the old signature of the movie is dropped
+        if self.near_duplicates is not None:
+            self.near_duplicates.remove(movie['id'])
+        self.flag_near_duplicate(movie)
+        with self.lock:
+            self.crawled[self.crawled_positions[movie['id']]] = movie
+            self.changed.append(movie)
+            if self.log_file is not None:
+                self.log_file.write(json.dumps(movie) + '\n')
+                self.log_file.flush()
+
+    def add_crawled_movie(self, movie):
+        """
+        Save a crawled movie and add its related movies that are not seen yet to the movies to crawl.
+
+        Parameters
+        ----------
+        movie: dict
+            The instance of the movie
+        """
+        self.flag_near_duplicate(movie)
         with self.lock:
             try:
-                new_links = [url for url in movie['related_links'] if self.get_id_from_URL(url) not in self.added_ids]
                 self.crawled.append(movie)
-                self.not_crawled.extend(new_links)
-                self.added_ids.update({self.get_id_from_URL(url) for url in new_links})
+                self.changed.append(movie)
+                self.in_flight_URLs.pop(movie['id'], None)
+                if self.log_file is not None:
+                    self.log_file.write(json.dumps(movie) + '\n')
+                    self.log_file.flush()
+                room = self.max_frontier_size - len(self.not_crawled)
+                # the related links carry a query string, so only their ids are used
+                for url in movie['related_links'] or []:
+                    id = self.get_id_from_URL(url)
+                    if room <= 0:
+                        break
+                    if id not in self.added_ids:
+                        self.not_crawled.append(self.get_movie_URL(id))
+                        self.added_ids.add(id)
+                        room -= 1
+                if len(self.crawled) % self.checkpoint_every == 0:
+                    self.write_checkpoint()
+                self.frontier_condition.notify_all()
             except Exception as e:
                 print(e)
 
+    def flag_near_duplicate(self, movie):
+        """
+        Check the summaries of a movie against the crawled movies, and mark the movie if they are a near duplicate.
+
+        Parameters
+        ----------
+        movie: dict
+            The instance of the movie
+        """
+        if self.near_duplicates is None or not movie.get('summaries'):
+            return
+        if duplicates := self.near_duplicates.add_if_unique(movie['id'], ' '.join(movie['summaries'])):
+            movie['near_duplicate_of'] = duplicates[0]
+
+    def start_crawling_with_asyncio(self, max_concurrency=None):
+        """
+        Start crawling the movies until the crawling threshold is reached, with asyncio instead of threads.
+
+        All the requests go through one pooled aiohttp session that keeps its connections alive, and the
+        main, summary and review pages of each movie are fetched at the same time.
+
+        Parameters
+        ----------
+        max_concurrency: int
+            The maximum number of open connections. Defaults to max_workers.
+        """
+        if aiohttp is None:
+            raise ImportError('aiohttp is needed to crawl with asyncio')
+        asyncio.run(self.crawl_with_asyncio(max_concurrency or self.max_workers))
+
+    async def crawl_with_asyncio(self, max_concurrency):
+        connector = aiohttp.TCPConnector(limit=max_concurrency)
+        # the condition of the concurrency limit belongs to the event loop of this crawling
+        self.concurrency_condition = asyncio.Condition()
+        async with aiohttp.ClientSession(headers=self.headers, connector=connector) as session:
+            self.add_top_250(await self.fetch(session, self.top_250_URL))
+
+            self.reset_progress()
+            self.open_log()
+            self.start_parsers()
+            condition = asyncio.Condition()
+
+            async def worker():
+                while True:
+                    async with condition:
+                        await condition.wait_for(self.can_take_URL)
+                        if self.is_crawling_finished():
+                            condition.notify_all()
+                            return
+                        URL = self.take_URL()
+                    try:
+                        await self.crawl_page_info_with_asyncio(session, URL)
+                    finally:
+                        async with condition:
+                            self.finish_URL(URL)
+                            condition.notify_all()
+                    self.report_progress(every=self.report_every)
+
+            # every movie needs three requests, so there are a third as many workers as connections
+            try:
+                await asyncio.gather(*[worker() for _ in range(max(max_concurrency // 3, 1))])
+            finally:
+                self.stop_parsers()
+                self.close_log()
+        self.report_progress()
+
+    async def fetch(self, session, URL, validate=None):
+        """
+        Make a get request to the URL with asyncio, with the same rate limiting and retries as `crawl`.
+
+        Parameters
+        ----------
+        session: aiohttp.ClientSession
+            The session to send the request with
+        URL: str
+            The URL of the site
+        validate: callable
+            Takes the text of a successful response and returns False if it is an error page
+        Returns
+        ----------
+        str
+            The text of the response. A RequestException is raised if the last attempt still failed.
+        """
+        retry_after = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(self.get_retry_delay(retry_after, attempt - 1))
+            await asyncio.sleep(self.rate_limiter.reserve())
+            await self.acquire_concurrency()
+            start = time.monotonic()
+            status = text = retry_after = None
+            try:
+                async with session.get(URL, timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                    status, text, headers = response.status, await response.text(), response.headers
+                    retry_after = headers.get('Retry-After')
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"{URL}-request failed: {e}")
+            except asyncio.CancelledError:
+                # the request is not needed anymore, so its slot is freed without recording it
+                await self.cancel_concurrency()
+                raise
+            retry = self.should_retry(status, text, validate)
+            await self.release_concurrency(time.monotonic() - start, status, retry, attempt)
+            if not retry:
+                break
+        if retry:
+            raise RequestException(f"{URL}-failed after {self.max_retries + 1} attempts")
+        if status == 200:
+            self.record_validators(URL, headers, text)
+        return text
+
+    async def acquire_concurrency(self):
+        """
+        Wait until the concurrency limit allows one more request of the event loop.
+        """
+        # the requests of the loop wait on a condition that is notified when one of them finishes
+        if self.concurrency_condition is None:
+            self.concurrency_condition = asyncio.Condition()
+        async with self.concurrency_condition:
+            await self.concurrency_condition.wait_for(self.concurrency.try_acquire)
+
+    async def release_concurrency(self, latency, status, retry, attempt):
+        self.record_request(latency, status, retry, attempt)
+        async with self.concurrency_condition:
+            self.concurrency_condition.notify_all()
+
+    async def cancel_concurrency(self):
+        self.concurrency.cancel()
+        async with self.concurrency_condition:
+            self.concurrency_condition.notify_all()
+
+    async def crawl_page_info_with_asyncio(self, session, URL):
+        """
+        Crawl the pages of a movie at the same time and extract its information.
+
+        Parameters
+        ----------
+        session: aiohttp.ClientSession
+            The session to send the requests with
+        URL: str
+            The URL of the site
+        """
+        try:
+            page, summary, review = await self.fetch_movie_pages(session, URL)
+            movie = self.get_imdb_instance()
+            movie['id'] = self.get_id_from_URL(URL)
+            if self.parse_executor is None:
+                movie = parse_movie_pages(movie, page, summary, review, self.base_URL)
+            else:
+                movie = await asyncio.get_running_loop().run_in_executor(
+                    self.parse_executor, parse_movie_pages, movie, page, summary, review, self.base_URL
+                )
+        except Exception as e:
+            print(f"{URL}-failed to crawl: {e}")
+            return
+        self.add_crawled_movie(movie)
+
+    async def fetch_movie_pages(self, session, URL):
+        """
+        Fetch the main, summary and review pages of a movie at the same time.
+
+        Parameters
+        ----------
+        session: aiohttp.ClientSession
+            The session to send the requests with
+        URL: str
+            The URL of the site
+        Returns
+        ----------
+        list
+            The texts of the three pages. If one of them fails, the requests of the others are cancelled
+            and its exception is raised.
+        """
+        tasks = [
+            asyncio.create_task(self.fetch(session, URL, validate=self.has_movie_data)),
+            asyncio.create_task(self.fetch(session, IMDbCrawler.get_summary_link(URL))),
+            asyncio.create_task(self.fetch(session, IMDbCrawler.get_review_link(URL))),
+        ]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            # the movie has failed, so the pages that are still being fetched are not needed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
 
     def extract_movie_info(self, res, movie, URL):
         """
@@ -196,8 +901,52 @@ class IMDbCrawler:
             The URL of the site
         """
         #* DONE
-        soup = BeautifulSoup(res.text, features="html.parser")
-        data = json.loads(soup.find('script', attrs={'type':'application/ld+json'}).text)
+        summary = self.crawl(IMDbCrawler.get_summary_link(URL)).text
+        review = self.crawl(IMDbCrawler.get_review_link(URL)).text
+        movie.update(self.parse_movie(movie, res.text, summary, review))
+
+    def start_parsers(self):
+        if not self.parse_workers:
+            return
+        self.parse_executor = ProcessPoolExecutor(max_workers=self.parse_workers)
+        # the first task starts all the processes, before the fetching threads are running
+        self.parse_executor.submit(int).result()
+
+    def stop_parsers(self):
+        if self.parse_executor is not None:
+            self.parse_executor.shutdown()
+            self.parse_executor = None
+
+    def parse_movie(self, movie, page, summary, review):
+        """
+        Parse the pages of a movie, in the parsing processes if there are any.
+
+        Returns
+        ----------
+        dict
+            The movie with its information
+        """
+        if self.parse_executor is None:
+            return parse_movie_pages(movie, page, summary, review, self.base_URL)
+        return self.parse_executor.submit(parse_movie_pages, movie, page, summary, review, self.base_URL).result()
+
+    def parse_movie_page(text, movie, base_URL='https://www.imdb.com'):
+        """
+        Extract the information of the movie from its main page.
+
+        The JSON data is found with a regex, and only the detail items and the links of the page
+        are parsed.
+
+        Parameters
+        ----------
+        text: str
+            The HTML of the page
+        movie: dict
+            The instance of the movie
+        base_URL: str
+            The address of the site
+        """
+        data = json.loads(json_data_pattern.search(text).group(1))
         #*___________________________________
         movie['first_page_summary'] = IMDbCrawler.get_first_page_summary(data)
         movie['title'] = IMDbCrawler.get_title(data)
@@ -208,18 +957,41 @@ class IMDbCrawler:
         movie['stars'] = IMDbCrawler.get_stars(data)
         movie['mpaa'] = IMDbCrawler.get_mpaa(data)
 
+        soup = BeautifulSoup(text, features=parser_features, parse_only=movie_page_strainer)
         movie['release_year'] = IMDbCrawler.get_release_year(soup)
         movie['budget'] = IMDbCrawler.get_budget(soup)
         movie['gross_worldwide'] = IMDbCrawler.get_gross_worldwide(soup)
-        movie['related_links'] = IMDbCrawler.get_related_links(soup)
+        movie['related_links'] = IMDbCrawler.get_related_links(soup, base_URL)
         movie['languages'] = IMDbCrawler.get_languages(soup)
         movie['countries_of_origin'] = IMDbCrawler.get_countries_of_origin(soup)
-        #*___________________________________
-        summery = BeautifulSoup(self.crawl(IMDbCrawler.get_summary_link(URL)).text, features="html.parser")
+
+    def parse_summary_page(text, movie):
+        """
+        Extract the summaries and the synopsis of the movie from its plot summary page.
+
+        Parameters
+        ----------
+        text: str
+            The HTML of the page
+        movie: dict
+            The instance of the movie
+        """
+        summery = BeautifulSoup(text, features=parser_features, parse_only=summary_page_strainer)
         movie['summaries'] = IMDbCrawler.get_summaries(summery)
         movie['synopsis'] = IMDbCrawler.get_synopsis(summery)
-        #*___________________________________
-        review = BeautifulSoup(self.crawl(IMDbCrawler.get_review_link(URL)).text, features="html.parser")
+
+    def parse_review_page(text, movie):
+        """
+        Extract the reviews of the movie from its reviews page.
+
+        Parameters
+        ----------
+        text: str
+            The HTML of the page
+        movie: dict
+            The instance of the movie
+        """
+        review = BeautifulSoup(text, features=parser_features, parse_only=review_page_strainer)
         movie['reviews'] = IMDbCrawler.get_reviews_with_scores(review)
 
 
@@ -355,7 +1127,7 @@ class IMDbCrawler:
         except:
             print(f"{data['name']}-failed to get writers")
 
-    def get_related_links(soup):
+    def get_related_links(soup, base_URL='https://www.imdb.com'):
         """
         Get the related links of the movie from the More like this section of the page from the soup
 
@@ -363,6 +1135,8 @@ class IMDbCrawler:
         ----------
         soup: BeautifulSoup
             The soup of the page
+        base_URL: str
+            The address of the site
         Returns
         ----------
         List[str]
@@ -370,7 +1144,7 @@ class IMDbCrawler:
         """
         try:
             #* DONE
-            return ['https://www.imdb.com' + tag['href'] for tag in soup('a') if re.match(r'/title/([^/]+)/\?ref_=tt_sim.+', tag['href']) and tag.text.strip()]
+            return [base_URL + tag['href'] for tag in soup('a', href=True) if re.match(r'/title/([^/]+)/\?ref_=tt_sim.+', tag['href']) and tag.text.strip()]
         except:
             print(f"{soup.title.text}-failed to get related links")
 
@@ -606,9 +1380,61 @@ class IMDbCrawler:
             print(f"{soup.title.text}-failed to get gross worldwide")
 
 
+def parse_movie_pages(movie, page, summary, review, base_URL='https://www.imdb.com'):
+    """
+    Extract the information of a movie from its pages. It is a function of the module, so it can
+    run in the parsing processes.
+
+    Parameters
+    ----------
+    movie: dict
+        The instance of the movie
+    page: str
+        The HTML of the main page of the movie
+    summary: str
+        The HTML of the plot summary page
+    review: str
+        The HTML of the reviews page
+    base_URL: str
+        The address of the site
+
+    Returns
+    ----------
+    dict
+        The movie with its information
+    """
+    IMDbCrawler.parse_movie_page(page, movie, base_URL)
+    IMDbCrawler.parse_summary_page(summary, movie)
+    IMDbCrawler.parse_review_page(review, movie)
+    return movie
+
+
+def write_json_atomically(path, data):
+    """
+    Write a JSON file through a temporary file, so a crash never leaves a half written file behind.
+
+    Parameters
+    ----------
+    path: str
+        The path of the file
+    data: object
+        The JSON serializable data
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'w') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_path, path)
+
+
 def main():
-    imdb_crawler = IMDbCrawler(crawling_threshold=600)
-    # imdb_crawler.read_from_file_as_json()
+    imdb_crawler = IMDbCrawler(crawling_threshold=600, near_duplicates=IncrementalMinHashLSH())
+    # resumes the last crawling if it was stopped
+    imdb_crawler.read_from_file_as_json()
     imdb_crawler.start_crawling()
     imdb_crawler.write_to_file_as_json()
 
@@ -0,0 +1,350 @@
+import heapq
+import re
+
+from ..indexer.indexes_enum import Indexes
+from ..indexer.posting_list import Posting_list, intersect_posting_lists
+
+
+class QueryParser:
+    """
+    Parses boolean and fielded queries such as `stars:"tom hanks" AND genres:drama -horror`
+    into a tree of operators.
+
+    The supported syntax is:
+        - `AND` (or just a space) and `OR` between expressions. AND binds tighter than OR.
+        - `NOT expression` or `-expression` for exclusion.
+        - `"a phrase"` for terms that must appear next to each other.
+        - `field:expression` to restrict an expression to stars, genres or summaries.
+        - parentheses for grouping.
+    An expression without a field is searched in all the fields.
+    """
+    fields = {index.value: index for index in [Indexes.STARS, Indexes.GENRES, Indexes.SUMMARIES]}
+    token_pattern = re.compile(r'\s*(?:(\()|(\))|(-)(?=[^\s-])|("[^"]*"?)|([^\s()"]+))')
+
+    def __init__(self, normalize):
+        """
+        Initialize the QueryParser
+
+        Parameters
+        ----------
+        normalize : callable
+            Converts a piece of the query text into the list of terms that is used in the indexes.
+        """
+        self.normalize = normalize
+
+    def tokenize(self, query):
+        """
+        Split the query into tokens.
+
+        Parameters
+        ----------
+        query : str
+            The query text.
+
+        Returns
+        ----------
+        List[str]
+            The tokens of the query.
+        """
+        tokens = []
+        for match in self.token_pattern.finditer(query):
+            token = next((group for group in match.groups() if group), None)
+            if token is None:
+                continue
+            if token[0] != '"' and ':' in token:
+                field, rest = token.split(':', 1)
+                if field.lower() in self.fields:
+                    tokens.append(field.lower() + ':')
+                    if rest:
+                        tokens.append(rest)
+                    continue
+            tokens.append(token)
+        return tokens
+
+    def parse(self, query):
+        """
+        Parse the query into an operator tree.
+
+        Parameters
+        ----------
+        query : str
+            The query text.
+
+        Returns
+        ----------
+        Operator
+            The root of the operator tree, or None if the query has no searchable term.
+        """
+        self.tokens = self.tokenize(query)
+        self.position = 0
+        node = self.parse_or(None)
+        while self.position < len(self.tokens):
+            # unbalanced closing parentheses are ignored
+            self.position += 1
+            right = self.parse_or(None)
+            node = And.of([node, right])
+        return node
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def parse_or(self, field):
+        children = [self.parse_and(field)]
+        while self.peek() == 'OR':
+            self.position += 1
+            children.append(self.parse_and(field))
+        return Or.of(children)
+
+    def parse_and(self, field):
+        children = [self.parse_unary(field)]
+        while self.peek() not in (None, ')', 'OR'):
+            if self.peek() == 'AND':
+                self.position += 1
+                continue
+            children.append(self.parse_unary(field))
+        return And.of(children)
+
+    def parse_unary(self, field):
+        if self.peek() in ('NOT', '-'):
+            self.position += 1
+            child = self.parse_unary(field)
+            return Not(child) if child is not None else None
+        return self.parse_primary(field)
+
+    def parse_primary(self, field):
+        token = self.peek()
+        if token is None:
+            return None
+        self.position += 1
+
+        if token == '(':
+            node = self.parse_or(field)
+            if self.peek() == ')':
+                self.position += 1
+            return node
+        if token.endswith(':') and token[:-1] in self.fields:
+            return self.parse_primary(self.fields[token[:-1]])
+        if token in ('AND', 'OR', ')'):
+            return None
+
+        terms = self.normalize(token.strip('"'))
+        if not terms:
+            return None
+        fields = [field] if field is not None else list(self.fields.values())
+        if token.startswith('"') and len(terms) > 1:
+            return Or.of([Phrase(terms, field) for field in fields])
+        return Or.of([And.of([Term(term, field) for term in terms]) for field in fields])
+
+
+class Operator:
+    """
+    A node of the operator tree. Every node is executed against a SearchEngine and returns the
+    matched documents as a Posting_list.
+    """
+
+    def estimate(self, engine):
+        """
+        Estimate the number of documents that the operator returns.
+
+        Parameters
+        ----------
+        engine : SearchEngine
+            The search engine to execute the operator against.
+
+        Returns
+        ----------
+        int
+            The estimated number of documents.
+        """
+        raise NotImplementedError
+
+    def optimize(self, engine):
+        """
+        Reorder the operator and its children by their estimated cost.
+
+        Parameters
+        ----------
+        engine : SearchEngine
+            The search engine to execute the operator against.
+
+        Returns
+        ----------
+        Operator
+            The optimized operator.
+        """
+        return self
+
+    def execute(self, engine):
+        """
+        Execute the operator.
+
+        Parameters
+        ----------
+        engine : SearchEngine
+            The search engine to execute the operator against.
+
+        Returns
+        ----------
+        Posting_list
+            The matched documents.
+        """
+        raise NotImplementedError
+
+
+class Term(Operator):
+    def __init__(self, term, field):
+        self.term = term
+        self.field = field
+
+    def __repr__(self):
+        return f'{self.field.value}:{self.term}'
+
+    def estimate(self, engine):
+        posting_list = engine.get_posting_list(self.term, self.field)
+        return len(posting_list) if posting_list else 0
+
+    def execute(self, engine):
+        return engine.get_posting_list(self.term, self.field) or Posting_list({})
+
+
+class Phrase(Operator):
+    def __init__(self, terms, field):
+        self.terms = terms
+        self.field = field
+
+    def __repr__(self):
+        return f'{self.field.value}:"{" ".join(self.terms)}"'
+
+    def estimate(self, engine):
+        if self.field == Indexes.GENRES:
+            return Term(' '.join(self.terms), self.field).estimate(engine)
+        return min(Term(term, self.field).estimate(engine) for term in self.terms)
+
+    def execute(self, engine):
+        if self.field == Indexes.GENRES:
+            # genres are indexed as whole values, so a phrase is a single term
+            return Term(' '.join(self.terms), self.field).execute(engine)
+        if self.field in engine.positional_index:
+            return Posting_list(engine.find_phrase_matches(self.terms, self.field))
+        return And([Term(term, self.field) for term in self.terms]).execute(engine)
+
+
+class Not(Operator):
+    def __init__(self, child):
+        self.child = child
+
+    def __repr__(self):
+        return f'NOT {self.child}'
+
+    def estimate(self, engine):
+        return len(engine.get_all_documents()) - self.child.estimate(engine)
+
+    def optimize(self, engine):
+        self.child = self.child.optimize(engine)
+        return self
+
+    def execute(self, engine):
+        return subtract(engine.get_all_documents(), self.child.execute(engine))
+
+
+class And(Operator):
+    def __init__(self, children):
+        self.children = children
+
+    def __repr__(self):
+        return '(' + ' AND '.join(map(repr, self.children)) + ')'
+
+    @classmethod
+    def of(cls, children):
+        children = [child for child in children if child is not None]
+        if len(children) < 2:
+            return children[0] if children else None
+        return cls(children)
+
+    def estimate(self, engine):
+        positives = [child.estimate(engine) for child in self.children if not isinstance(child, Not)]
+        return min(positives) if positives else len(engine.get_all_documents())
+
+    def optimize(self, engine):
+        children = []
+        for child in self.children:
+            child = child.optimize(engine)
+            children.extend(child.children if isinstance(child, And) else [child])
+        # the rarest operands go first and the exclusions are applied last
+        children.sort(key=lambda child: (isinstance(child, Not), child.estimate(engine)))
+        self.children = children
+        return self
+
+    def execute(self, engine):
+        positives = [child for child in self.children if not isinstance(child, Not)]
+        negatives = [child.child for child in self.children if isinstance(child, Not)]
+
+        result = positives[0].execute(engine) if positives else engine.get_all_documents()
+        for child in positives[1:]:
+            if not len(result):
+                break
+            result = Posting_list(dict.fromkeys(intersect_posting_lists([result, child.execute(engine)]), 1))
+        for child in negatives:
+            if not len(result):
+                break
+            result = subtract(result, child.execute(engine))
+        return result
+
+
+class Or(Operator):
+    def __init__(self, children):
+        self.children = children
+
+    def __repr__(self):
+        return '(' + ' OR '.join(map(repr, self.children)) + ')'
+
+    @classmethod
+    def of(cls, children):
+        children = [child for child in children if child is not None]
+        if len(children) < 2:
+            return children[0] if children else None
+        return cls(children)
+
+    def estimate(self, engine):
+        return sum(child.estimate(engine) for child in self.children)
+
+    def optimize(self, engine):
+        children = []
+        for child in self.children:
+            child = child.optimize(engine)
+            children.extend(child.children if isinstance(child, Or) else [child])
+        # operands that can not match anything are not executed at all
+        self.children = [child for child in children if child.estimate(engine) > 0]
+        return self
+
+    def execute(self, engine):
+        doc_ids = []
+        for doc_id in heapq.merge(*[child.execute(engine).doc_ids for child in self.children]):
+            if not doc_ids or doc_ids[-1] != doc_id:
+                doc_ids.append(doc_id)
+        return Posting_list(dict.fromkeys(doc_ids, 1))
+
+
+def subtract(posting_list, excluded):
+    """
+    Remove the documents of a posting list from another one.
+
+    Parameters
+    ----------
+    posting_list : Posting_list
+        The documents to keep.
+    excluded : Posting_list
+        The documents to remove.
+
+    Returns
+    ----------
+    Posting_list
+        The documents of `posting_list` that are not in `excluded`.
+    """
+    doc_ids = []
+    pointer = 0
+    for doc_id in posting_list.doc_ids:
+        pointer = excluded.advance(doc_id, pointer)
+        if pointer == len(excluded) or excluded.doc_ids[pointer] != doc_id:
+            doc_ids.append(doc_id)
+    return Posting_list(dict.fromkeys(doc_ids, 1))
@@ -0,0 +1,249 @@
+import random
+import time
+from collections import deque
+from threading import Condition, Lock
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        """
+        Initialize the TokenBucket
+
+        The bucket gets `rate` tokens per second, up to `capacity`, and every request takes one.
+        A request that finds the bucket empty reserves the next token and waits for it, so the
+        requests are spread evenly even when many of them arrive together.
+
+        Parameters
+        ----------
+        rate : float
+            The number of requests per second.
+        capacity : float
+            The number of requests that can be sent at once after an idle period. Defaults to `rate`.
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self.lock = Lock()
+
+    def reserve(self):
+        """
+        Take a token from the bucket.
+
+        Returns
+        -------
+        float
+            The number of seconds to wait before sending the request.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= 1
+            return max(-self.tokens / self.rate, 0.0)
+
+    def acquire(self):
+        """
+        Take a token from the bucket, waiting for it if there is none.
+        """
+        time.sleep(self.reserve())
+
+
+class AdaptiveConcurrency:
+    def __init__(
+        self,
+        initial=4,
+        minimum=1,
+        maximum=20,
+        increase=1,
+        decrease=0.5,
+        latency_target=2.0,
+        error_threshold=0.1,
+        window=10,
+    ):
+        """
+        Initialize the AdaptiveConcurrency
+
+        Limits the number of requests in flight with additive increase and multiplicative decrease
+        (AIMD). After every `window` requests the limit grows by `increase` if the requests were
+        fast and successful, and is multiplied by `decrease` if their average latency was above
+        `latency_target` or their error rate was above `error_threshold`.
+
+        Parameters
+        ----------
+        initial : int
+            The limit to start with.
+        minimum : int
+            The smallest limit.
+        maximum : int
+            The largest limit.
+        increase : int
+            The number added to the limit when the site keeps up.
+        decrease : float
+            The factor of the limit when the site is overloaded.
+        latency_target : float
+            The highest acceptable average latency, in seconds.
+        error_threshold : float
+            The highest acceptable rate of failed requests.
+        window : int
+            The number of requests between two adjustments.
+        """
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.error_threshold = error_threshold
+        self.window = window
+        self.samples = []
+        self.in_flight = 0
+        self.condition = Condition()
+
+    def try_acquire(self):
+        """
+        Start a request if the limit allows it.
+
+        Returns
+        -------
+        bool
+            True if the request can be sent. It must be followed by `release`.
+        """
+        with self.condition:
+            if self.in_flight >= self.limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    def acquire(self):
+        """
+        Start a request, waiting until the limit allows it.
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    def release(self, latency, ok):
+        """
+        Finish a request and record how it went.
+
+        Parameters
+        ----------
+        latency : float
+            The number of seconds the request took.
+        ok : bool
+            False if the request failed or was refused.
+        """
+        with self.condition:
+            self.in_flight -= 1
+            self.samples.append((latency, ok))
+            if len(self.samples) >= self.window:
+                average_latency = sum(latency for latency, _ in self.samples) / len(self.samples)
+                error_rate = sum(not ok for _, ok in self.samples) / len(self.samples)
+                if average_latency > self.latency_target or error_rate > self.error_threshold:
+                    self.limit = max(self.minimum, int(self.limit * self.decrease))
+                else:
+                    self.limit = min(self.maximum, self.limit + self.increase)
+                self.samples = []
+            self.condition.notify_all()
+
+    def cancel(self):
+        """
+        Finish a request that was dropped before its response, without recording it.
+        """
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+
+class CrawlMetrics:
+    def __init__(self, window=60.0):
+        """
+        Initialize the CrawlMetrics
+
+        Parameters
+        ----------
+        window : float
+            The number of seconds of the recent requests that the request rate is measured over.
+        """
+        self.window = window
+        self.start_time = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_latency = 0.0
+        self.recent = deque()
+        self.lock = Lock()
+
+    def record(self, latency, ok, retry=False):
+        """
+        Record a request.
+
+        Parameters
+        ----------
+        latency : float
+            The number of seconds the request took.
+        ok : bool
+            False if the request failed or was refused.
+        retry : bool
+            True if the request was a retry of a failed one.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.requests += 1
+            self.errors += not ok
+            self.retries += retry
+            self.total_latency += latency
+            self.recent.append(now)
+            while self.recent[0] < now - self.window:
+                self.recent.popleft()
+
+    def get_request_rate(self):
+        """
+        Get the number of requests per second over the recent window.
+        """
+        with self.lock:
+            elapsed = min(time.monotonic() - self.start_time, self.window)
+            return len(self.recent) / elapsed if elapsed > 0 else 0.0
+
+    def get_metrics(self):
+        """
+        Get a summary of the requests.
+
+        Returns
+        -------
+        dict
+            The number of requests, errors and retries, the recent request rate, the error rate
+            and the average latency.
+        """
+        request_rate = self.get_request_rate()
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'retries': self.retries,
+                'request_rate': request_rate,
+                'error_rate': self.errors / self.requests if self.requests else 0.0,
+                'average_latency': self.total_latency / self.requests if self.requests else 0.0,
+            }
+
+
+def get_backoff_delay(attempt, base=0.5, cap=30.0):
+    """
+    Get the time to wait before retrying a failed request, with exponential backoff and full jitter.
+
+    Parameters
+    ----------
+    attempt : int
+        The number of the failed attempt, starting from 0.
+    base : float
+        The delay of the first retry, in seconds.
+    cap : float
+        The largest delay, in seconds.
+
+    Returns
+    -------
+    float
+        A random number of seconds between 0 and the exponential delay of the attempt.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
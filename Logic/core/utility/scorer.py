@@ -40,6 +40,8 @@ class Scorer:
             If we had pairs of (document_id, tf) sorted by document_id, we could improve this.
                 We could initialize a list of pointers, each pointing to the first element of each list.
                 Then, we could iterate through the lists in parallel.
+            For conjunctive queries SearchEngine does this with `Posting_list` and passes the
+            intersection to the scoring methods as `documents`.
 
         """
         list_of_documents = []
@@ -91,7 +93,7 @@ class Scorer:
         #* DONE
         return dict(Counter(query))
 
-    def compute_scores_with_vector_space_model(self, query, method):
+    def compute_scores_with_vector_space_model(self, query, method, documents=None):
         """
         compute scores with vector space model
 
@@ -101,6 +103,9 @@ class Scorer:
             The query to be scored
         method : str ((n|l)(n|t)(n|c).(n|l)(n|t)(n|c))
             The method to use for searching.
+        documents : list, optional
+            The documents to score. If None, every document that contains at least one of the
+            terms in the query is scored.
 
         Returns
         -------
@@ -112,7 +117,7 @@ class Scorer:
         query_tfs = self.get_query_tfs(query)
         scores = {}
 
-        docs = self.get_list_of_documents(query)
+        docs = self.get_list_of_documents(query) if documents is None else documents
         doc_method, query_method = method.split('.')
 
         for doc_id in docs:
@@ -182,7 +187,7 @@ class Scorer:
 
 
     def compute_socres_with_okapi_bm25(
-        self, query, average_document_field_length, document_lengths
+        self, query, average_document_field_length, document_lengths, documents=None
     ):
         """
         compute scores with okapi bm25
@@ -196,6 +201,9 @@ class Scorer:
         document_lengths : dict
             A dictionary of the document lengths. The keys are the document IDs, and the values are
             the document's length in that field.
+        documents : list, optional
+            The documents to score. If None, every document that contains at least one of the
+            terms in the query is scored.
 
         Returns
         -------
@@ -205,7 +213,8 @@ class Scorer:
 
         #* DONE
         scores = {}
-        documents = self.get_list_of_documents(query)
+        if documents is None:
+            documents = self.get_list_of_documents(query)
 
         for document_id in documents:
             score = self.get_okapi_bm25_score(query, document_id, average_document_field_length, document_lengths)
@@ -258,7 +267,7 @@ class Scorer:
         return score
 
     def compute_scores_with_unigram_model(
-        self, query, smoothing_method, document_lengths=None, alpha=0.5, lamda=0.5
+        self, query, smoothing_method, document_lengths=None, alpha=0.5, lamda=0.5, documents=None
     ):
         """
         Calculates the scores for each document based on the unigram model.
@@ -277,6 +286,9 @@ class Scorer:
         lamda : float, optional
             The parameter used in some smoothing methods to balance between the document
             probability and the collection probability. Defaults to 0.5.
+        documents : list, optional
+            The documents to score. If None, every document that contains at least one of the
+            terms in the query is scored.
 
         Returns
         -------
@@ -286,7 +298,8 @@ class Scorer:
 
         #* DONE
         scors = {}
-        documents = self.get_list_of_documents(query)
+        if documents is None:
+            documents = self.get_list_of_documents(query)
 
         for document_id in documents:
             score = self.compute_score_with_unigram_model(query,
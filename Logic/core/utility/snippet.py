@@ -1,14 +1,20 @@
+import heapq
+import math
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
 import nltk
-from nltk.tokenize import word_tokenize
 try:
     from nltk.corpus import stopwords
 except:
     nltk.download('stopwords')
     from nltk.corpus import stopwords
 
+from ..indexer.snippet_index import index_tokens, token_pattern
+
 
 class Snippet:
-    def __init__(self, number_of_words_on_each_side=5):
+    def __init__(self, number_of_words_on_each_side=5, snippet_index=None):
         """
         Initialize the Snippet
 
@@ -16,9 +22,17 @@ class Snippet:
         ----------
         number_of_words_on_each_side : int
             The number of words on each side of the query word in the doc to be presented in the snippet.
+        snippet_index : dict
+            The precomputed positions and offsets of the tokens of the docs, with the structure of
+            {doc_id: {"positions": {token: [positions]}, "offsets": [[start, end], ...]}}.
+            The docs that are not in it are tokenized when they are requested.
         """
         self.number_of_words_on_each_side = number_of_words_on_each_side
         self.stopwords = set(stopwords.words('english'))
+        self.snippet_index = snippet_index if snippet_index is not None else {}
+        self.document_frequencies = Counter()
+        for tokens in self.snippet_index.values():
+            self.document_frequencies.update(tokens['positions'].keys())
 
     def remove_stop_words_from_query(self, query):
         """
@@ -37,11 +51,23 @@ class Snippet:
 
         #* DONE: remove stop words from the query.
 
-        words = query.lower().split()
-        filtered_words = [word for word in words if word not in self.stop_words]
-        return ' '.join(filtered_words)
+        words = []
+        for match in token_pattern.finditer(query.lower()):
+            if match.group() not in self.stopwords and match.group() not in words:
+                words.append(match.group())
+        return ' '.join(words)
+
+    def get_tokens(self, doc, doc_id=None):
+        """
+        Get the positions and offsets of the tokens of a doc, from the snippet index if it has them.
+        """
+        tokens = self.snippet_index.get(doc_id, None)
+        # the offsets of an outdated index may not fit the doc
+        if tokens is not None and (not tokens['offsets'] or tokens['offsets'][-1][1] <= len(doc)):
+            return tokens
+        return index_tokens(doc)
 
-    def find_snippet(self, doc, query):
+    def find_snippet(self, doc, query, doc_id=None, template='***{}***'):
         """
         Find snippet in a doc based on a query.
 
@@ -51,6 +77,10 @@ class Snippet:
             The retrieved doc which the snippet should be extracted from that.
         query : str
             The query which the snippet should be extracted based on that.
+        doc_id : str
+            The ID of the doc, to use its precomputed tokens.
+        template : str
+            The format of a highlighted query word.
 
         Returns
         -------
@@ -63,24 +93,236 @@ class Snippet:
         final_snippet = ""
         not_exist_words = []
 
-        # TODO: Extract snippet and the tokens which are not present in the doc.
+        #* DONE: Extract snippet and the tokens which are not present in the doc.
 
-        filtered_query = self.remove_stop_words_from_query(query)
-        doc_words = doc.split()
+        tokens = self.get_tokens(doc, doc_id)
+        positions, offsets = tokens['positions'], tokens['offsets']
 
-        snippets = []
-        not_exist_words = []
+        windows = []
+        highlighted = []
+        for word in self.remove_stop_words_from_query(query).split():
+            if word not in positions:
+                not_exist_words.append(word)
+                continue
+            first = positions[word][0]
+            windows.append((
+                max(first - self.number_of_words_on_each_side, 0),
+                min(first + self.number_of_words_on_each_side, len(offsets) - 1),
+            ))
+            highlighted.extend(positions[word])
+        highlighted.sort()
 
-        for word in filtered_query.split():
-            if word in doc_words:
-                word_idx = doc_words.index(word)
-                start = max(word_idx - self.number_of_words_on_each_side, 0)
-                end = min(word_idx + self.number_of_words_on_each_side + 1, len(doc_words))
-                snippet = doc_words[start:word_idx] + [f'***{word}***'] + doc_words[word_idx + 1:end]
-                snippets.append(' '.join(snippet))
+        # the overlapping windows are shown as one
+        merged = []
+        for start, end in sorted(windows):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
             else:
-                not_exist_words.append(word)
+                merged.append([start, end])
+
+        final_snippet = ' ... '.join(
+            self.render(doc, offsets, start, end, highlighted, template) for start, end in merged
+        )
+
+        return final_snippet, not_exist_words
+
+    def get_idf(self, word):
+        """
+        Get the smoothed inverse document frequency of a word in the docs of the snippet index.
+        """
+        number_of_documents = len(self.snippet_index)
+        return math.log((number_of_documents + 1) / (self.document_frequencies[word] + 1)) + 1
+
+    def find_best_snippet(self, doc, query, doc_id=None, max_length=None, template='***{}***'):
+        """
+        Find the window of a doc that covers the most important query words.
+
+        Parameters
+        ----------
+        doc : str
+            The retrieved doc which the snippet should be extracted from that.
+        query : str
+            The query which the snippet should be extracted based on that.
+        doc_id : str
+            The ID of the doc, to use its precomputed tokens.
+        max_length : int
+            The maximum number of tokens in the snippet. Defaults to the length of the windows
+            of `find_snippet`.
+        template : str
+            The format of a highlighted query word.
+
+        Returns
+        -------
+        final_snippet : str
+            The extracted snippet, with "..." on the sides that are cut from the doc.
+        not_exist_words : list
+            Words in the query which don't exist in the doc.
+        """
+        return self.find_best_snippets([doc], query, [doc_id], max_length, template)[0]
+
+    def find_best_snippets(self, docs, query, doc_ids=None, max_length=None, template='***{}***'):
+        """
+        Find the best snippets of a number of docs, like a page of results, for one query.
+
+        Parameters
+        ----------
+        docs : list of str
+            The retrieved docs.
+        query : str
+            The query which the snippets should be extracted based on that.
+        doc_ids : list of str
+            The IDs of the docs, to use their precomputed tokens.
+        max_length : int
+            The maximum number of tokens in a snippet.
+        template : str
+            The format of a highlighted query word.
+
+        Returns
+        -------
+        list of tuple
+            The (final_snippet, not_exist_words) of each doc, like `find_best_snippet`.
+        """
+        if max_length is None:
+            max_length = 2 * self.number_of_words_on_each_side + 1
+        if doc_ids is None:
+            doc_ids = [None] * len(docs)
+        words = self.remove_stop_words_from_query(query).split()
+        idfs = {word: self.get_idf(word) for word in words}
+
+        snippets = []
+        for doc, doc_id in zip(docs, doc_ids):
+            tokens = self.get_tokens(doc, doc_id)
+            positions, offsets = tokens['positions'], tokens['offsets']
+            not_exist_words = [word for word in words if word not in positions]
+            if not offsets:
+                snippets.append(('', not_exist_words))
+                continue
+
+            occurrences = list(heapq.merge(*[
+                [(position, word) for position in positions[word]]
+                for word in words if word in positions
+            ]))
+            start, end = self.find_best_window(occurrences, idfs, max_length)
+
+            # the rest of the length is spread on both sides of the matched words
+            extra = max_length - (end - start + 1)
+            start = max(start - extra // 2, 0)
+            end = min(start + max_length - 1, len(offsets) - 1)
+            start = max(end - max_length + 1, 0)
+
+            highlighted = [position for position, _ in occurrences]
+            snippet = self.render(doc, offsets, start, end, highlighted, template)
+            if start > 0:
+                snippet = '... ' + snippet
+            if end < len(offsets) - 1:
+                snippet = snippet + ' ...'
+            snippets.append((snippet, not_exist_words))
+        return snippets
+
+    def find_best_window(self, occurrences, idfs, max_length):
+        """
+        Find the span of at most `max_length` tokens with the highest sum of the idfs of the
+        distinct query words in it. The window slides over the occurrences once, so it takes
+        linear time.
+
+        Parameters
+        ----------
+        occurrences : list of tuple
+            The (position, word) of the occurrences of the query words, sorted by position.
+        idfs : dict
+            The idf of each query word.
+        max_length : int
+            The maximum number of tokens in the span.
+
+        Returns
+        -------
+        tuple
+            The positions of the first and the last tokens of the best span, (0, 0) if there
+            is no occurrence.
+        """
+        best_score, best = 0, (0, 0)
+        counts = Counter()
+        score = 0
+        left = 0
+        for position, word in occurrences:
+            if not counts[word]:
+                score += idfs[word]
+            counts[word] += 1
+            while position - occurrences[left][0] >= max_length:
+                left_word = occurrences[left][1]
+                counts[left_word] -= 1
+                if not counts[left_word]:
+                    score -= idfs[left_word]
+                left += 1
+            # the scores are compared with a tolerance, so the sums of floats do not move the window
+            if score > best_score + 1e-9:
+                best_score, best = score, (occurrences[left][0], position)
+        return best
+
+    def highlight(self, doc, query, doc_id=None, template='***{}***'):
+        """
+        Highlight all the query words in a whole doc.
+
+        Parameters
+        ----------
+        doc : str
+            The doc to highlight.
+        query : str
+            The query whose words are highlighted.
+        doc_id : str
+            The ID of the doc, to use its precomputed tokens.
+        template : str
+            The format of a highlighted query word.
+
+        Returns
+        -------
+        str
+            The doc with the query words highlighted.
+        """
+        tokens = self.get_tokens(doc, doc_id)
+        positions, offsets = tokens['positions'], tokens['offsets']
+        if not offsets:
+            return doc
 
-        final_snippet = ' ... '.join(snippets)
+        highlighted = sorted(
+            position
+            for word in self.remove_stop_words_from_query(query).split()
+            for position in positions.get(word, [])
+        )
+        text = self.render(doc, offsets, 0, len(offsets) - 1, highlighted, template)
+        return doc[:offsets[0][0]] + text + doc[offsets[-1][1]:]
 
-        return final_snippet, not_exist_words
\ No newline at end of file
+    def render(self, doc, offsets, start, end, highlighted, template):
+        """
+        Cut the text of the tokens from `start` to `end` out of a doc, and highlight the tokens
+        at the `highlighted` positions in one pass.
+
+        Parameters
+        ----------
+        doc : str
+            The raw doc.
+        offsets : list
+            The character offsets of the tokens of the doc.
+        start : int
+            The position of the first token.
+        end : int
+            The position of the last token.
+        highlighted : list
+            The sorted positions of the tokens to highlight.
+        template : str
+            The format of a highlighted token.
+
+        Returns
+        -------
+        str
+            The highlighted text.
+        """
+        pieces = []
+        cursor = offsets[start][0]
+        for i in range(bisect_left(highlighted, start), bisect_right(highlighted, end)):
+            token_start, token_end = offsets[highlighted[i]]
+            pieces.append(doc[cursor:token_start])
+            pieces.append(template.format(doc[token_start:token_end]))
+            cursor = token_end
+        pieces.append(doc[cursor:offsets[end][1]])
+        return ''.join(pieces)
@@ -1,17 +1,29 @@
+import json
+import math
+import os
 from collections import Counter, defaultdict
 
 
 class SpellCorrection:
-    def __init__(self, all_documents):
+    def __init__(self, all_documents=None, jaccard_threshold=0.2, vocabulary=None):
         """
         Initialize the SpellCorrection
 
         Parameters
         ----------
         all_documents : list of str
-            The input documents.
+            The input documents. Not needed if a vocabulary is given.
+        jaccard_threshold : float
+            The minimum jaccard score of a candidate. The candidates below it are never scored.
+        vocabulary : Vocabulary_index
+            The stored frequencies and shingles of the indexed terms, used instead of the documents.
         """
-        self.all_shingled_words, self.word_counter = self.shingling_and_counting(all_documents)
+        self.jaccard_threshold = jaccard_threshold
+        if vocabulary is not None:
+            self.all_shingled_words, self.word_counter = vocabulary.shingles, vocabulary.frequencies
+        else:
+            self.all_shingled_words, self.word_counter = self.shingling_and_counting(all_documents)
+        self.shingle_index, self.shingle_frequency = self.index_shingles(self.all_shingled_words)
 
     def shingle_word(self, word, k=2):
         """
@@ -81,11 +93,37 @@ class SpellCorrection:
 
         for document in all_documents:
             words = document.split()
-            word_counter += Counter(words)
+            word_counter.update(words)
             for word in words:
-                all_shingled_words[word].union(self.shingle_word(word))
+                if word not in all_shingled_words:
+                    all_shingled_words[word] = self.shingle_word(word)
 
         return all_shingled_words, word_counter
+
+    def index_shingles(self, all_shingled_words):
+        """
+        Build an inverted index from shingles to the words that contain them.
+
+        Parameters
+        ----------
+        all_shingled_words : dict
+            A dictionary from words to their shingle sets.
+
+        Returns
+        -------
+        shingle_index : dict
+            The words of each shingle, bucketed by the size of their shingle sets.
+            So the index type is: {shingle: {shingle_set_size: [words]}}
+        shingle_frequency : dict
+            The number of words that contain each shingle.
+        """
+        shingle_index = {}
+        shingle_frequency = Counter()
+        for word, shingles in all_shingled_words.items():
+            for shingle in shingles:
+                shingle_index.setdefault(shingle, {}).setdefault(len(shingles), []).append(word)
+                shingle_frequency[shingle] += 1
+        return shingle_index, shingle_frequency
     
     def find_nearest_words(self, word):
         """
@@ -104,17 +142,36 @@ class SpellCorrection:
 
         # TODO: Find 5 nearest candidates here.
         shingled_word = self.shingle_word(word)
-        candidates = []
+        if not shingled_word:
+            return []
+
+        # a word with a jaccard score of at least t has between t*n and n/t shingles, and it shares
+        # at least one of the (n - ceil(t*n) + 1) rarest shingles of the query word
+        t = self.jaccard_threshold
+        n = len(shingled_word)
+        min_overlap = max(math.ceil(t * n - 1e-9), 1)
+        min_size = min_overlap
+        max_size = math.floor(n / t + 1e-9) if t > 0 else math.inf
+        prefix = sorted(shingled_word, key=lambda shingle: self.shingle_frequency.get(shingle, 0))
+        prefix = prefix[:n - min_overlap + 1]
+
+        candidates = set()
+        for shingle in prefix:
+            for size, words in self.shingle_index.get(shingle, {}).items():
+                if min_size <= size <= max_size:
+                    candidates.update(words)
 
-        for candidate_word, candidate_shingles in self.all_shingled_words.items():
-            if score := self.jaccard_score(shingled_word, candidate_shingles) > 0:
-                candidates.append((candidate_word, score))
+        scored = []
+        for candidate_word in candidates:
+            score = self.jaccard_score(shingled_word, self.all_shingled_words[candidate_word])
+            if score > 0 and score >= t:
+                scored.append((candidate_word, score))
 
-        candidates.sort(key=lambda x: x[1])
-        top5_candidates = [t[0] for t in candidates[:-6:-1]]
+        scored.sort(key=lambda x: (x[1], self.word_counter[x[0]]), reverse=True)
+        top5_candidates = [candidate for candidate, _ in scored[:5]]
 
         return top5_candidates
-    
+
     def spell_check(self, query):
         """
         Find correct form of a misspelled query.
@@ -142,4 +199,200 @@ class SpellCorrection:
             corrected_query.append(word)
         final_result = " ".join(corrected_query)
 
-        return final_result
\ No newline at end of file
+        return final_result
+
+class SymSpellCorrection(SpellCorrection):
+    def __init__(self, all_documents=None, max_edit_distance=2, prefix_length=7, path=None,
+                 vocabulary=None):
+        """
+        Initialize the SymSpellCorrection
+
+        Every word of the corpus is stored under all the strings that can be made by deleting up
+        to `max_edit_distance` characters from it. A misspelled word is corrected by generating its
+        own deletions and looking them up, so no other word of the vocabulary is visited.
+
+        Parameters
+        ----------
+        all_documents : list of str
+            The input documents. Not needed if the dictionary is loaded from `path`.
+        max_edit_distance : int
+            The maximum edit distance of a correction.
+        prefix_length : int
+            Only the first `prefix_length` characters of the words are used for the deletions,
+            which keeps the dictionary small.
+        path : str
+            The file of the dictionary. If it exists and was built with the same settings and
+            words, the dictionary is loaded from it. Otherwise the dictionary is built and saved
+            to it.
+        vocabulary : Vocabulary_index
+            The stored frequencies of the indexed terms, used instead of the documents.
+        """
+        # the shingle index of SpellCorrection is never used here, so its __init__ is not called
+        word_counter = None
+        if vocabulary is not None:
+            word_counter = Counter(vocabulary.frequencies)
+        elif all_documents is not None:
+            _, word_counter = self.shingling_and_counting(all_documents)
+
+        if path is not None and os.path.exists(path):
+            self.load(path)
+            if (self.max_edit_distance == max_edit_distance and self.prefix_length == prefix_length
+                    and (word_counter is None or self.word_counter == word_counter)):
+                return
+            if word_counter is None:
+                word_counter = self.word_counter
+
+        if word_counter is None:
+            raise ValueError("The documents, a vocabulary or a saved dictionary is needed")
+        self.max_edit_distance = max_edit_distance
+        self.prefix_length = prefix_length
+        self.word_counter = word_counter
+        self.deletes = self.build_deletes(self.word_counter)
+        if path is not None:
+            self.save(path)
+
+    def get_deletes(self, word):
+        """
+        Generate the strings made by deleting up to `max_edit_distance` characters from a word.
+
+        Parameters
+        ----------
+        word : str
+            The input word.
+
+        Returns
+        -------
+        set
+            The deletions, including the word itself.
+        """
+        deletes = {word}
+        edits = {word}
+        for _ in range(self.max_edit_distance):
+            edits = {edit[:i] + edit[i + 1:] for edit in edits for i in range(len(edit))}
+            deletes.update(edits)
+        return deletes
+
+    def build_deletes(self, word_counter):
+        """
+        Build the deletion dictionary of the vocabulary.
+
+        Parameters
+        ----------
+        word_counter : dict
+            A dictionary from words to their TFs.
+
+        Returns
+        -------
+        dict
+            A dictionary from deletions to the words that produce them.
+        """
+        deletes = defaultdict(list)
+        for word in word_counter:
+            for delete in self.get_deletes(word[:self.prefix_length]):
+                deletes[delete].append(word)
+        return dict(deletes)
+
+    def find_nearest_words(self, word):
+        """
+        Find correct form of a misspelled word.
+
+        Parameters
+        ----------
+        word : str
+            The misspelled word.
+
+        Returns
+        -------
+        list of str
+            5 nearest words, sorted by their edit distance and then by their TFs.
+        """
+        candidates = {}
+        for delete in self.get_deletes(word[:self.prefix_length]):
+            for candidate in self.deletes.get(delete, []):
+                if candidate in candidates:
+                    continue
+                candidates[candidate] = edit_distance(word, candidate, self.max_edit_distance)
+
+        ranked = sorted(
+            (distance, -self.word_counter[candidate], candidate)
+            for candidate, distance in candidates.items()
+            if distance is not None
+        )
+        return [candidate for _, _, candidate in ranked[:5]]
+
+    def save(self, path):
+        """
+        Save the dictionary to a file.
+
+        Parameters
+        ----------
+        path : str
+            The file to save the dictionary in.
+        """
+        with open(path, 'w') as file:
+            json.dump({
+                'max_edit_distance': self.max_edit_distance,
+                'prefix_length': self.prefix_length,
+                'word_counter': self.word_counter,
+                'deletes': self.deletes,
+            }, file)
+
+    def load(self, path):
+        """
+        Load the dictionary from a file that was written by `save`.
+
+        Parameters
+        ----------
+        path : str
+            The file of the dictionary.
+        """
+        with open(path, 'r') as file:
+            data = json.load(file)
+        self.max_edit_distance = data['max_edit_distance']
+        self.prefix_length = data['prefix_length']
+        self.word_counter = Counter(data['word_counter'])
+        self.deletes = data['deletes']
+
+
+def edit_distance(first, second, max_distance=None, transpositions=True):
+    """
+    Calculate the Damerau-Levenshtein (optimal string alignment) distance of two words.
+
+    Parameters
+    ----------
+    first : str
+        The first word.
+    second : str
+        The second word.
+    max_distance : int
+        If given, the calculation stops as soon as the distance gets bigger than it.
+    transpositions : bool
+        If False, swapping two adjacent characters counts as two edits, which is the Levenshtein
+        distance. Unlike the optimal string alignment distance it is a metric.
+
+    Returns
+    -------
+    int
+        The edit distance, or None if it is bigger than `max_distance`.
+    """
+    if max_distance is not None and abs(len(first) - len(second)) > max_distance:
+        return None
+
+    previous_previous = None
+    previous = list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        current = [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = 0 if first[i - 1] == second[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (transpositions and i > 1 and j > 1 and first[i - 1] == second[j - 2]
+                    and first[i - 2] == second[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if max_distance is not None and min(current) > max_distance:
+            return None
+        previous_previous, previous = previous, current
+
+    distance = previous[-1]
+    if max_distance is not None and distance > max_distance:
+        return None
+    return distance
@@ -0,0 +1,196 @@
+import os
+import time
+from threading import RLock
+
+from .core.search import SearchEngine
+from .core.utility.spell_correction import SpellCorrection, SymSpellCorrection
+from .core.utility.context_spell_correction import ContextSpellCorrection
+from .core.utility.snippet import Snippet
+from .core.indexer.document_store import Document_store
+from .core.indexer.indexes_enum import Indexes, Index_types
+from .core.indexer.index_reader import Index_reader
+from .core.indexer.vocabulary_index import Vocabulary_index
+
+
+class Services:
+    # the files that the services derive from the indexes themselves, they are not watched for
+    # changes or writing them would drop the objects that were just loaded
+    symspell_file = "spell_correction_symspell.json"
+    derived_files = {symspell_file}
+
+    def __init__(
+        self, path="data/index/", check_interval=5, spell_correction="symspell", context_spell_correction=True
+    ):
+        """
+        Holds the heavy objects that the UI needs, so they are loaded once per process and shared
+        between all the sessions. Every object is loaded on its first use, and they are all
+        dropped and loaded again when the files of the indexes change.
+
+        Parameters
+        ----------
+        path : str
+            The path to the indexes.
+        check_interval : float
+            The minimum number of seconds between two checks for changes in the indexes.
+        spell_correction : str
+            The backend of the spell correction, "symspell" for the deletion dictionary that is
+            saved next to the indexes, or "shingle" for the Jaccard similarity of the shingles.
+        context_spell_correction : bool
+            If True and the summaries have a positional index, the candidates of the backend are
+            chosen by a bigram model of the summaries instead of one word at a time.
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self.spell_correction_backend = spell_correction
+        self.context_spell_correction = context_spell_correction
+        self.loaders = {
+            "search_engine": self.load_search_engine,
+            "movies_dataset": self.load_movies_dataset,
+            "movies_projection": self.load_movies_projection,
+            "spell_correction": self.load_spell_correction,
+            "snippet": self.load_snippet,
+        }
+        self.resources = {}
+        self.lock = RLock()
+        self.fingerprint = None
+        self.last_check = 0
+
+    @property
+    def search_engine(self) -> SearchEngine:
+        return self.get("search_engine")
+
+    @property
+    def movies_dataset(self) -> Document_store:
+        return self.get("movies_dataset")
+
+    @property
+    def movies_projection(self) -> dict:
+        return self.get("movies_projection")
+
+    @property
+    def spell_correction(self) -> SpellCorrection:
+        return self.get("spell_correction")
+
+    @property
+    def snippet(self) -> Snippet:
+        return self.get("snippet")
+
+    def get(self, name):
+        """
+        Gets a shared object, loading it if it is not loaded yet.
+
+        Parameters
+        ----------
+        name : str
+            The name of the object.
+
+        Returns
+        ----------
+        object
+            The shared object.
+        """
+        with self.lock:
+            self.check_for_changes()
+            if name not in self.resources:
+                self.resources[name] = self.loaders[name]()
+            return self.resources[name]
+
+    def warm_up(self):
+        """
+        Loads all the shared objects, so the first search does not have to wait for them.
+        """
+        for name in self.loaders:
+            self.get(name)
+
+    def reload(self):
+        """
+        Drops all the loaded objects, they are loaded again on their next use.
+        """
+        with self.lock:
+            if dataset := self.resources.get("movies_dataset", None):
+                dataset.close()
+            self.resources = {}
+            self.fingerprint = self.get_fingerprint()
+
+    def get_fingerprint(self):
+        """
+        Gets the names, sizes and modification times of the files of the indexes, without the
+        files that are derived from them.
+        """
+        if not os.path.isdir(self.path):
+            return None
+        fingerprint = []
+        for entry in sorted(os.scandir(self.path), key=lambda entry: entry.name):
+            if entry.is_file() and entry.name not in self.derived_files:
+                stat = entry.stat()
+                fingerprint.append((entry.name, stat.st_size, stat.st_mtime_ns))
+        return tuple(fingerprint)
+
+    def check_for_changes(self):
+        """
+        Reloads the objects if the indexes have changed since they were loaded.
+        """
+        now = time.monotonic()
+        if now - self.last_check < self.check_interval:
+            return
+        self.last_check = now
+
+        fingerprint = self.get_fingerprint()
+        if self.fingerprint is None:
+            self.fingerprint = fingerprint
+        elif fingerprint != self.fingerprint:
+            self.reload()
+
+    def load_search_engine(self):
+        return SearchEngine(self.path)
+
+    def load_movies_dataset(self):
+        return Document_store(self.path)
+
+    def load_movies_projection(self):
+        return Document_store.load_projection(self.path, fields=("title", "stars"))
+
+    def load_spell_correction(self):
+        spell_correction = self.load_spell_correction_backend()
+        if self.context_spell_correction:
+            positional_index = self.get("search_engine").positional_index.get(Indexes.SUMMARIES, None)
+            if positional_index is not None:
+                return ContextSpellCorrection(spell_correction, positional_index.index)
+        return spell_correction
+
+    def load_spell_correction_backend(self):
+        # the vocabulary of the indexes is used if it was built, otherwise the stored documents
+        vocabulary_path = self.path + Indexes.DOCUMENTS.value + "_" + Index_types.VOCABULARY.value + ".json"
+        if os.path.exists(vocabulary_path):
+            source_path = vocabulary_path
+        else:
+            source_path = Document_store.get_path(self.path, ".bin")
+
+        symspell_path = os.path.join(self.path, self.symspell_file)
+        if self.spell_correction_backend == "symspell" and os.path.exists(symspell_path):
+            # the dictionary is only reused if it was built after the last change of its source
+            if os.path.getmtime(symspell_path) >= os.path.getmtime(source_path):
+                return SymSpellCorrection(path=symspell_path)
+            os.remove(symspell_path)
+
+        if source_path == vocabulary_path:
+            vocabulary = Vocabulary_index.load(self.path)
+            if self.spell_correction_backend == "symspell":
+                return SymSpellCorrection(path=symspell_path, vocabulary=vocabulary)
+            return SpellCorrection(vocabulary=vocabulary)
+
+        dataset = self.get("movies_dataset")
+        documents = []
+        for movie in dataset.get_many(list(dataset.keys()), fields=["stars", "summaries"]).values():
+            documents.append(" ".join((movie["stars"] or []) + (movie["summaries"] or [])).lower())
+        if self.spell_correction_backend == "symspell":
+            return SymSpellCorrection(documents, path=symspell_path)
+        return SpellCorrection(documents)
+
+    def load_snippet(self):
+        # the precomputed tokens of the summaries are optional
+        try:
+            snippet_index = Index_reader(self.path, Indexes.DOCUMENTS, Index_types.SNIPPET).index
+        except FileNotFoundError:
+            snippet_index = None
+        return Snippet(snippet_index=snippet_index)
@@ -0,0 +1,60 @@
+import os
+import re
+import sys
+import time
+
+import json
+
+from bs4 import BeautifulSoup
+
+from imdb_server import pages_path
+from Logic.core.utility.crawler import IMDbCrawler, parse_movie_pages, parser_features
+
+
+def read_movies(path):
+    movies = []
+    for name in sorted(os.listdir(path)):
+        if match := re.fullmatch(r'(tt\d+)\.html', name):
+            pages = []
+            for suffix in ['', '_plotsummary', '_reviews']:
+                with open(os.path.join(path, match.group(1) + suffix + '.html')) as file:
+                    pages.append(file.read())
+            movies.append(pages)
+    return movies
+
+
+def benchmark(parse, movies, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for pages in movies:
+            parse(pages)
+    return len(movies) * repeat / (time.perf_counter() - start)
+
+
+def parse_full_trees(pages):
+    # the pages as they were parsed before, with three whole trees for every movie
+    page, summary, review = [BeautifulSoup(page, features='html.parser') for page in pages]
+    data = json.loads(page.find('script', attrs={'type': 'application/ld+json'}).text)
+    return [
+        IMDbCrawler.get_title(data), IMDbCrawler.get_stars(data),
+        IMDbCrawler.get_release_year(page), IMDbCrawler.get_budget(page),
+        IMDbCrawler.get_gross_worldwide(page), IMDbCrawler.get_related_links(page),
+        IMDbCrawler.get_languages(page), IMDbCrawler.get_countries_of_origin(page),
+        IMDbCrawler.get_summaries(summary), IMDbCrawler.get_synopsis(summary),
+        IMDbCrawler.get_reviews_with_scores(review),
+    ]
+
+
+def main(path=pages_path, repeat=200):
+    """
+    Compare the parsing of the saved pages of a directory, named like the pages of the test server.
+    """
+    movies = read_movies(path)
+    full_trees = benchmark(parse_full_trees, movies, repeat)
+    fast = benchmark(lambda pages: parse_movie_pages({}, *pages), movies, repeat)
+    print(f'whole trees with html.parser: {full_trees:.1f} movies per second')
+    print(f'regex and strained trees with {parser_features}: {fast:.1f} movies per second')
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:2])
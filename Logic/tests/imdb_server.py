@@ -0,0 +1,98 @@
+import hashlib
+import os
+import re
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+pages_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+
+
+class IMDbPageHandler(BaseHTTPRequestHandler):
+    """
+    Serves the recorded IMDb pages in the pages directory with the same paths as the site.
+    The pages have an ETag and a Last-Modified date, and the conditional requests are answered.
+    """
+    # keep-alive needs HTTP/1.1
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        self.server.requests.append((self.client_address, path))
+        time.sleep(self.server.delays.get(path, 0))
+
+        if self.server.failures.get(path, 0) > 0:
+            # a page that is set to fail answers like an overloaded site
+            self.server.failures[path] -= 1
+            body = b'<html><head><title>Service Unavailable</title></head></html>'
+            self.send_response(self.server.failure_status)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if path == '/chart/top/':
+            name = 'top.html'
+        elif match := re.fullmatch(r'/title/(tt\d+)/(plotsummary/|reviews/)?', path):
+            name = match.group(1) + ('_' + match.group(2)[:-1] if match.group(2) else '') + '.html'
+        else:
+            name = None
+
+        file_path = os.path.join(self.server.pages_path, name) if name is not None else None
+        if file_path is None or not os.path.exists(file_path):
+            self.send_error(404)
+            return
+        with open(file_path, 'rb') as file:
+            body = file.read()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', formatdate(os.path.getmtime(file_path), usegmt=True))
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionError:
+            # the client stopped waiting, e.g. its request was cancelled
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(pages_path=pages_path):
+    """
+    Start a stand-in IMDb server on a free local port.
+
+    Parameters
+    ----------
+    pages_path: str
+        The directory of the pages to serve
+
+    Returns
+    ----------
+    ThreadingHTTPServer
+        The running server. Its `base_URL` is the address to crawl, and `requests` holds the
+        (client address, path) of every request it got. A path can be made to fail a number of
+        times with `failures[path] = number`, answering with `failure_status`, and slowed down by a number of seconds with
+        `delays[path] = seconds`. Call `shutdown` to stop it.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), IMDbPageHandler)
+    server.requests = []
+    server.failures = {}
+    server.failure_status = 503
+    server.delays = {}
+    server.pages_path = pages_path
+    server.base_URL = f'http://127.0.0.1:{server.server_address[1]}'
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,97 @@
+from Logic.core.indexer.document_lengths_index import DocumentLengthsIndex
+from Logic.core.indexer.document_store import Document_store
+from Logic.core.indexer.facet_index import Facet_index
+from Logic.core.indexer.index import Index
+from Logic.core.indexer.metadata_index import Metadata_index
+from Logic.core.indexer.numeric_index import Numeric_index
+from Logic.core.indexer.positional_index import Positional_index
+from Logic.core.indexer.tiered_index import Tiered_index
+
+# the movies as they are crawled
+movies = [
+    {
+        'id': 'tt0000001',
+        'title': 'The Banker',
+        'stars': ['Tim Robbins', 'Morgan Freeman'],
+        'genres': ['Drama'],
+        'summaries': ['A banker is sent to prison for a crime he never committed.'],
+        'rating': '9.3',
+        'release_year': 'October 14, 1994 (United States)',
+        'budget': '$25,000,000 (estimated)',
+        'gross_worldwide': '$29,332,133',
+        'mpaa': 'R',
+        'languages': ['English'],
+        'countries_of_origin': ['United States'],
+    },
+    {
+        'id': 'tt0000002',
+        'title': 'The Family',
+        'stars': ['Marlon Brando', 'Al Pacino'],
+        'genres': ['Crime', 'Drama'],
+        'summaries': ['The prison story of an old banker and his family.'],
+        'rating': '1.0',
+        'release_year': 'March 24, 1972 (United States)',
+        'budget': '$6,000,000 (estimated)',
+        'gross_worldwide': '$250,341,816',
+        'mpaa': 'PG-13',
+        'languages': ['English', 'Italian'],
+        'countries_of_origin': ['United States'],
+    },
+    {
+        'id': 'tt0000003',
+        'title': 'The Knight',
+        'stars': ['Christian Bale', 'Heath Ledger'],
+        'genres': ['Action', 'Crime'],
+        'summaries': ['Batman fights the joker in Gotham city.'],
+        'rating': '9.0',
+        'release_year': 'July 18, 2008 (United States)',
+        'budget': '$185,000,000 (estimated)',
+        'gross_worldwide': '$1,006,234,167',
+        'mpaa': 'PG-13',
+        'languages': ['English'],
+        'countries_of_origin': ['United States', 'United Kingdom'],
+    },
+]
+
+# the same movies after the preprocessor
+preprocessed_movies = [
+    {
+        'id': 'tt0000001',
+        'stars': ['tim robbins', 'morgan freeman'],
+        'genres': ['drama'],
+        'summaries': ['banker sent prison crime never committed'],
+    },
+    {
+        'id': 'tt0000002',
+        'stars': ['marlon brando', 'al pacino'],
+        'genres': ['crime', 'drama'],
+        'summaries': ['prison story old banker family'],
+    },
+    {
+        'id': 'tt0000003',
+        'stars': ['christian bale', 'heath ledger'],
+        'genres': ['action', 'crime'],
+        'summaries': ['batman fight joker gotham city'],
+    },
+]
+
+
+def build_index(path):
+    """
+    Builds all the indexes of the sample movies in a directory, like the indexing scripts do.
+
+    Parameters
+    ----------
+    path : str
+        The directory to build the indexes in, ending with a slash.
+    """
+    index = Index(preprocessed_movies)
+    for index_name in index.index:
+        index.store_index(path, index_name)
+    Document_store.store_documents(movies, path)
+    Tiered_index(path)
+    DocumentLengthsIndex(path)
+    Metadata_index(path)
+    Positional_index(path)
+    Numeric_index(path)
+    Facet_index(path)
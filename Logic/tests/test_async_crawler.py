@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import aiohttp
+from requests import RequestException
+
+from imdb_server import start_server
+from Logic.core.utility.crawler import IMDbCrawler
+
+
+def test_crawl_with_asyncio():
+    server = start_server()
+    try:
+        crawler = IMDbCrawler(crawling_threshold=10, base_URL=server.base_URL, log_path=None, checkpoint_path=None)
+        crawler.start_crawling_with_asyncio(max_concurrency=6)
+    finally:
+        server.shutdown()
+
+    movies = {movie['id']: movie for movie in crawler.crawled}
+    assert set(movies) == {'tt0000001', 'tt0000002', 'tt0000003'}, f'Crawled {sorted(movies)}'
+
+    movie = movies['tt0000001']
+    assert movie['title'] == 'The First Movie'
+    assert movie['stars'] == ['Actor 0A', 'Actor 0B']
+    assert movie['writers'] == ['Writer 0']
+    assert movie['related_links'] == [server.base_URL + '/title/tt0000002/?ref_=tt_sim_tt_i_1']
+    assert movie['budget'] == '$20,000,000 (estimated)'
+    assert len(movie['summaries']) == 2 and len(movie['synopsis']) == 1
+    assert [rating for _, rating in movie['reviews']] == ['10/10', '-']
+
+    # every page is requested once, over kept-alive connections
+    paths = [path for _, path in server.requests]
+    assert len(paths) == len(set(paths)) == 1 + 3 * len(movies)
+    clients = {client for client, _ in server.requests}
+    assert len(clients) <= 6, f'{len(clients)} connections were opened'
+
+
+def test_failed_requests_raise_after_the_retries():
+    server = start_server()
+    server.failures = {'/title/tt0000001/': 2, '/title/tt0000002/': 10}
+    crawler = IMDbCrawler(
+        crawling_threshold=10, base_URL=server.base_URL, max_retries=2, retry_base_delay=0.01,
+        log_path=None, checkpoint_path=None,
+    )
+
+    async def fetch(URL, validate=None):
+        async with aiohttp.ClientSession() as session:
+            return await crawler.fetch(session, URL, validate)
+
+    try:
+        assert 'The First Movie' in asyncio.run(fetch(server.base_URL + '/title/tt0000001/'))
+        for fetch_page in [
+            lambda: asyncio.run(fetch(server.base_URL + '/title/tt0000002/')),
+            lambda: crawler.crawl(server.base_URL + '/title/tt0000002/'),
+            # a page without the data of a movie is an error page
+            lambda: asyncio.run(fetch(server.base_URL + '/title/tt0000003/reviews/', crawler.has_movie_data)),
+        ]:
+            try:
+                fetch_page()
+                assert False, 'the last failed response was returned'
+            except RequestException:
+                pass
+    finally:
+        server.shutdown()
+
+    metrics = crawler.get_metrics()
+    assert metrics['requests'] == 3 + 3 + 3 + 3 and metrics['errors'] == 2 + 3 + 3 + 3
+    assert crawler.concurrency.in_flight == 0
+
+
+def test_pages_of_a_failed_movie_are_cancelled():
+    server = start_server()
+    server.failures = {'/title/tt0000001/plotsummary/': 1}
+    server.delays = {'/title/tt0000001/reviews/': 5}
+    crawler = IMDbCrawler(
+        crawling_threshold=10, base_URL=server.base_URL, max_retries=0, log_path=None, checkpoint_path=None,
+    )
+
+    async def crawl_page_info(URL):
+        crawler.concurrency_condition = asyncio.Condition()
+        async with aiohttp.ClientSession() as session:
+            await crawler.crawl_page_info_with_asyncio(session, URL)
+
+    try:
+        start = time.monotonic()
+        asyncio.run(crawl_page_info(server.base_URL + '/title/tt0000001/'))
+        elapsed = time.monotonic() - start
+    finally:
+        server.shutdown()
+
+    # the slow review page is not waited for, and its slot is freed
+    assert elapsed < 4
+    assert not crawler.crawled
+    assert crawler.concurrency.in_flight == 0
+    assert crawler.get_metrics()['requests'] == 2
+
+
+if __name__ == '__main__':
+    test_crawl_with_asyncio()
+    test_failed_requests_raise_after_the_retries()
+    test_pages_of_a_failed_movie_are_cancelled()
+    print('Async crawler is correct')
@@ -0,0 +1,55 @@
+import random
+import tempfile
+
+from sample_index import build_index
+from Logic.core.indexer.indexes_enum import Indexes
+from Logic.core.search import SearchEngine
+from Logic.core.utility.bk_tree import BKTree
+from Logic.core.utility.spell_correction import edit_distance
+
+
+def test_search_matches_a_scan():
+    generator = random.Random(0)
+    words = {''.join(generator.choice('abcde') for _ in range(generator.randint(1, 7))) for _ in range(500)}
+    tree = BKTree(words)
+    assert len(tree) == len(words)
+
+    for query in ['', 'a', 'abc', 'edcba', 'aaaaaaa', 'bad', 'cabbage']:
+        for max_distance in [0, 1, 2]:
+            expected = sorted(
+                (edit_distance(query, word, transpositions=False), word) for word in words
+                if edit_distance(query, word, transpositions=False) <= max_distance
+            )
+            assert sorted(tree.search(query, max_distance)) == expected, (query, max_distance)
+
+
+def test_duplicates_and_empty_tree():
+    tree = BKTree(['banker', 'banker', 'banner'])
+    assert len(tree) == 2
+    assert [word for _, word in tree.search('banker', 0)] == ['banker']
+    assert BKTree([]).search('banker', 2) == []
+
+
+def test_fuzzy_search():
+    with tempfile.TemporaryDirectory() as directory:
+        build_index(directory + '/')
+        engine = SearchEngine(directory + '/')
+
+    # the tree of the stars is built with the search engine, the others on their first use
+    assert set(engine.bk_trees) == {Indexes.STARS}
+    stars_tree = engine.bk_trees[Indexes.STARS]
+    weights = {Indexes.STARS: 1}
+    assert engine.search('freman', 'OkapiBM25', weights) == []
+    result = engine.search('freman', 'OkapiBM25', weights, fuzzy_distance=1)
+    assert [doc_id for doc_id, _ in result] == ['tt0000001']
+    assert engine.get_bk_tree(Indexes.STARS) is stars_tree
+    assert Indexes.SUMMARIES not in engine.bk_trees
+    engine.search('bankr', 'OkapiBM25', {Indexes.SUMMARIES: 1}, fuzzy_distance=1, fuzzy_fields=(Indexes.SUMMARIES,))
+    assert Indexes.SUMMARIES in engine.bk_trees
+
+
+if __name__ == '__main__':
+    test_search_matches_a_scan()
+    test_duplicates_and_empty_tree()
+    test_fuzzy_search()
+    print('BK-tree tests passed.')
@@ -0,0 +1,70 @@
+from collections import defaultdict
+
+from Logic.core.indexer.positional_index import encode_positions
+from Logic.core.utility.context_spell_correction import ContextSpellCorrection
+from Logic.core.utility.spell_correction import SymSpellCorrection
+
+summaries = {
+    'tt1': ['rich banker sent prison', 'banker escape prison'],
+    'tt2': ['old banker lose money', 'banker family'],
+    'tt3': ['soldier carry red banner', 'red banner war'],
+}
+
+
+def get_positional_index():
+    index = defaultdict(dict)
+    for doc_id, items in summaries.items():
+        positions = defaultdict(list)
+        position = 0
+        for item in items:
+            for term in item.split():
+                positions[term].append(position)
+                position += 1
+            position += 1
+        for term, term_positions in positions.items():
+            index[term][doc_id] = encode_positions(term_positions)
+    return index
+
+
+def get_spell_correction(**kwargs):
+    documents = [item for items in summaries.values() for item in items]
+    return ContextSpellCorrection(SymSpellCorrection(documents), get_positional_index(), **kwargs)
+
+
+def test_bigrams_do_not_cross_items():
+    bigrams = get_spell_correction().bigrams
+    assert bigrams[('red', 'banner')] == 2
+    assert bigrams[('banker', 'escape')] == 1
+    # "prison" ends the first summary of tt1 and "banker" starts the second one
+    assert ('prison', 'banker') not in bigrams
+    assert ('banner', 'red') not in bigrams
+
+
+def test_the_context_chooses_the_correction():
+    spell_correction = get_spell_correction()
+    # "banser" is one edit away from both "banker" and "banner", and "banker" is more frequent
+    assert spell_correction.spell_check('banser') == 'banker'
+    assert spell_correction.spell_check('red banser') == 'red banner'
+    assert spell_correction.spell_check('old banser') == 'old banker'
+    assert spell_correction.spell_check('rich banker') == 'rich banker'
+    assert spell_correction.spell_check('') == ''
+
+
+def test_cache_and_time_budget():
+    spell_correction = get_spell_correction(cache_size=1)
+    assert spell_correction.spell_check('red banser') == 'red banner'
+    assert list(spell_correction.cache) == ['red banser']
+    spell_correction.spell_check('banser')
+    assert list(spell_correction.cache) == ['banser']
+
+    # the words that are left when the time runs out are kept as they are, and not cached
+    spell_correction = get_spell_correction(time_budget=-1)
+    assert spell_correction.spell_check('red banser') == 'red banser'
+    assert not spell_correction.cache
+
+
+if __name__ == '__main__':
+    test_bigrams_do_not_cross_items()
+    test_the_context_chooses_the_correction()
+    test_cache_and_time_budget()
+    print('Context spell correction tests passed.')
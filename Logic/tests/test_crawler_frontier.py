@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+
+from imdb_server import pages_path, start_server
+from Logic.core.utility.crawler import IMDbCrawler
+
+
+def crawl(crawling_threshold, max_workers, server=None, **kwargs):
+    server = server or start_server()
+    try:
+        crawler = IMDbCrawler(
+            crawling_threshold=crawling_threshold, base_URL=server.base_URL, max_workers=max_workers,
+            log_path=None, checkpoint_path=None, **kwargs
+        )
+        crawler.start_crawling()
+    finally:
+        server.shutdown()
+    return crawler
+
+
+def test_threshold_is_respected():
+    crawler = crawl(crawling_threshold=2, max_workers=8)
+    assert sorted(movie['id'] for movie in crawler.crawled) == ['tt0000001', 'tt0000002']
+    assert crawler.in_flight == 0
+
+
+def test_links_found_by_workers_are_crawled():
+    # the seed has one movie, the others are only found while it is in flight
+    crawler = crawl(crawling_threshold=10, max_workers=8)
+    assert sorted(movie['id'] for movie in crawler.crawled) == ['tt0000001', 'tt0000002', 'tt0000003']
+    assert not crawler.not_crawled
+    assert crawler.get_movies_per_second() > 0
+
+
+def test_failed_pages_do_not_count_towards_the_threshold():
+    with tempfile.TemporaryDirectory() as directory:
+        shutil.copytree(pages_path, directory, dirs_exist_ok=True)
+        # the first movie links to both of the others, so the third one is found even if the second one fails
+        path = os.path.join(directory, 'tt0000001.html')
+        with open(path, 'r') as file:
+            page = file.read()
+        with open(path, 'w') as file:
+            file.write(page.replace(
+                '<a href="/title/tt0000001/?ref_=tt_ov_i">',
+                '<a href="/title/tt0000003/?ref_=tt_sim_tt_i_2"><span>More like this</span></a>\n'
+                '<a href="/title/tt0000001/?ref_=tt_ov_i">',
+            ))
+
+        server = start_server(directory)
+        server.failures = {'/title/tt0000002/': 10}
+        server.failure_status = 500
+        crawler = crawl(crawling_threshold=2, max_workers=8, server=server, max_retries=0)
+
+    assert sorted(movie['id'] for movie in crawler.crawled) == ['tt0000001', 'tt0000003']
+    assert crawler.in_flight == 0
+
+
+if __name__ == '__main__':
+    test_threshold_is_respected()
+    test_links_found_by_workers_are_crawled()
+    test_failed_pages_do_not_count_towards_the_threshold()
+    print('Crawler frontier is correct')
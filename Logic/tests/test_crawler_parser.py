@@ -0,0 +1,49 @@
+import os
+
+from imdb_server import pages_path, start_server
+from Logic.core.utility.crawler import IMDbCrawler, parse_movie_pages
+
+
+def read_pages(id):
+    pages = []
+    for suffix in ['', '_plotsummary', '_reviews']:
+        with open(os.path.join(pages_path, id + suffix + '.html')) as file:
+            pages.append(file.read())
+    return pages
+
+
+def test_saved_pages_are_parsed():
+    movie = parse_movie_pages({'id': 'tt0000001'}, *read_pages('tt0000001'), base_URL='https://www.imdb.com')
+    assert movie['title'] == 'The First Movie'
+    assert movie['directors'] == ['Director 0'] and movie['writers'] == ['Writer 0']
+    assert movie['release_year'] == 'October 10, 1990 (United States)'
+    assert movie['countries_of_origin'] == ['United States']
+    assert movie['budget'] == '$20,000,000 (estimated)' and movie['gross_worldwide'] == '$50,341,469'
+    assert movie['related_links'] == ['https://www.imdb.com/title/tt0000002/?ref_=tt_sim_tt_i_1']
+    assert len(movie['summaries']) == 2 and len(movie['synopsis']) == 1
+    assert [rating for _, rating in movie['reviews']] == ['10/10', '-']
+
+
+def test_pages_are_parsed_in_processes():
+    server = start_server()
+    try:
+        crawlers = []
+        for parse_workers in [0, 2]:
+            crawler = IMDbCrawler(
+                crawling_threshold=10, base_URL=server.base_URL, parse_workers=parse_workers,
+                log_path=None, checkpoint_path=None,
+            )
+            crawler.start_crawling()
+            crawlers.append(crawler)
+    finally:
+        server.shutdown()
+
+    movies, movies_of_processes = [sorted(crawler.crawled, key=lambda movie: movie['id']) for crawler in crawlers]
+    assert len(movies) == 3
+    assert movies == movies_of_processes
+
+
+if __name__ == '__main__':
+    test_saved_pages_are_parsed()
+    test_pages_are_parsed_in_processes()
+    print('Crawler parser is correct')
@@ -0,0 +1,39 @@
+import time
+
+from imdb_server import start_server
+from Logic.core.utility.crawler import IMDbCrawler
+from Logic.core.utility.rate_limiter import TokenBucket
+
+
+def test_token_bucket_spreads_requests():
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+    assert 0.18 <= elapsed < 1, f'11 requests at 50 per second took {elapsed:.2f} seconds'
+
+
+def test_failed_requests_are_retried():
+    server = start_server()
+    server.failures = {'/title/tt0000001/': 2, '/title/tt0000002/reviews/': 1}
+    try:
+        crawler = IMDbCrawler(
+            crawling_threshold=10, base_URL=server.base_URL, requests_per_second=100, retry_base_delay=0.01,
+            log_path=None, checkpoint_path=None,
+        )
+        crawler.start_crawling()
+    finally:
+        server.shutdown()
+
+    assert sorted(movie['id'] for movie in crawler.crawled) == ['tt0000001', 'tt0000002', 'tt0000003']
+    metrics = crawler.get_metrics()
+    assert metrics['retries'] == 3 and metrics['errors'] == 3
+    assert metrics['requests'] == len(server.requests)
+    assert metrics['request_rate'] > 0
+
+
+if __name__ == '__main__':
+    test_token_bucket_spreads_requests()
+    test_failed_requests_are_retried()
+    print('Crawler rate limiting is correct')
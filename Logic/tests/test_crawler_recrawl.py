@@ -0,0 +1,114 @@
+import json
+import os
+import shutil
+import tempfile
+
+from requests import RequestException
+
+from imdb_server import pages_path, start_server
+from Logic.core.utility.crawler import IMDbCrawler
+
+
+def make_crawler(directory, base_URL, crawling_threshold=10):
+    return IMDbCrawler(
+        crawling_threshold=crawling_threshold, base_URL=base_URL, max_workers=4,
+        crawled_path=os.path.join(directory, 'IMDB_crawled.json'),
+        log_path=os.path.join(directory, 'IMDB_crawled.jsonl'),
+        checkpoint_path=os.path.join(directory, 'IMDB_not_crawled.json'),
+        validators_path=os.path.join(directory, 'IMDB_validators.json'),
+        changed_path=os.path.join(directory, 'IMDB_changed.json'),
+    )
+
+
+def test_only_changed_movies_are_recrawled():
+    with tempfile.TemporaryDirectory() as directory:
+        pages = os.path.join(directory, 'pages')
+        shutil.copytree(pages_path, pages)
+        server = start_server(pages)
+        try:
+            crawler = make_crawler(directory, server.base_URL)
+            crawler.start_crawling()
+            crawler.write_to_file_as_json()
+            first_movies = {movie['id']: movie for movie in crawler.crawled}
+
+            # nothing changed, every page is answered with 304 Not Modified
+            crawler = make_crawler(directory, server.base_URL)
+            crawler.read_from_file_as_json()
+            crawler.start_recrawling()
+            assert crawler.changed == []
+            assert crawler.get_metrics()['requests'] == 9
+
+            with open(os.path.join(pages, 'tt0000002_reviews.html')) as file:
+                review = file.read()
+            with open(os.path.join(pages, 'tt0000002_reviews.html'), 'w') as file:
+                file.write(review.replace('</body>', (
+                    '<div class="lister-item-content"><a class="title">New review</a>'
+                    '<div class="text show-more__control">A new review.</div></div></body>'
+                )))
+
+            crawler = make_crawler(directory, server.base_URL)
+            crawler.read_from_file_as_json()
+            crawler.start_recrawling()
+            crawler.write_to_file_as_json()
+        finally:
+            server.shutdown()
+
+        assert [movie['id'] for movie in crawler.changed] == ['tt0000002']
+        movie = crawler.changed[0]
+        assert len(movie['reviews']) == len(first_movies['tt0000002']['reviews']) + 1
+        assert movie['summaries'] == first_movies['tt0000002']['summaries']
+        assert not crawler.not_crawled
+
+        with open(os.path.join(directory, 'IMDB_changed.json')) as f:
+            assert [movie['id'] for movie in json.load(f)] == ['tt0000002']
+        with open(os.path.join(directory, 'IMDB_crawled.json')) as f:
+            movies = {movie['id']: movie for movie in json.load(f)}
+        assert movies['tt0000002'] == movie and movies['tt0000001'] == first_movies['tt0000001']
+
+
+def test_every_crawled_movie_is_checked():
+    with tempfile.TemporaryDirectory() as directory:
+        server = start_server()
+        try:
+            crawler = make_crawler(directory, server.base_URL)
+            crawler.start_crawling()
+            crawler.write_to_file_as_json()
+
+            # the threshold only limits the new movies
+            crawler = make_crawler(directory, server.base_URL, crawling_threshold=1)
+            crawler.read_from_file_as_json()
+            crawler.start_recrawling()
+        finally:
+            server.shutdown()
+
+    assert crawler.changed == []
+    assert crawler.get_metrics()['requests'] == 9
+
+
+def test_only_not_modified_is_unchanged():
+    server = start_server()
+    server.failures = {'/title/tt0000002/': 10}
+    try:
+        crawler = IMDbCrawler(
+            base_URL=server.base_URL, max_retries=1, retry_base_delay=0.01, log_path=None, checkpoint_path=None,
+        )
+        # a page without validators is new
+        URL = server.base_URL + '/title/tt0000001/'
+        assert 'The First Movie' in crawler.crawl_if_changed(URL)
+        assert crawler.crawl_if_changed(URL) is None
+
+        for URL in [server.base_URL + '/title/tt0000009/', server.base_URL + '/title/tt0000002/']:
+            try:
+                crawler.crawl_if_changed(URL)
+                assert False, f'{URL} was taken as unchanged'
+            except RequestException:
+                pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    test_only_changed_movies_are_recrawled()
+    test_every_crawled_movie_is_checked()
+    test_only_not_modified_is_unchanged()
+    print('Crawler re-crawls only the changed movies')
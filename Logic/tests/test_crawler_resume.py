@@ -0,0 +1,49 @@
+import json
+import os
+import tempfile
+
+from imdb_server import start_server
+from Logic.core.utility.crawler import IMDbCrawler
+
+
+def make_crawler(directory, crawling_threshold, base_URL):
+    return IMDbCrawler(
+        crawling_threshold=crawling_threshold, base_URL=base_URL, max_workers=1,
+        crawled_path=os.path.join(directory, 'IMDB_crawled.json'),
+        log_path=os.path.join(directory, 'IMDB_crawled.jsonl'),
+        checkpoint_path=os.path.join(directory, 'IMDB_not_crawled.json'),
+        checkpoint_every=1,
+        validators_path=os.path.join(directory, 'IMDB_validators.json'),
+        changed_path=os.path.join(directory, 'IMDB_changed.json'),
+    )
+
+
+def test_stopped_crawling_is_resumed():
+    server = start_server()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            # the first crawling stops before the last movie, without writing the crawled file
+            crawler = make_crawler(directory, 2, server.base_URL)
+            crawler.start_crawling()
+            with open(os.path.join(directory, 'IMDB_crawled.jsonl')) as f:
+                assert sorted(json.loads(line)['id'] for line in f) == ['tt0000001', 'tt0000002']
+            with open(os.path.join(directory, 'IMDB_not_crawled.json')) as f:
+                assert json.load(f)['not_crawled'] == [crawler.get_movie_URL('tt0000003')]
+
+            server.requests.clear()
+            crawler = make_crawler(directory, 10, server.base_URL)
+            crawler.read_from_file_as_json()
+            crawler.start_crawling()
+            crawler.write_to_file_as_json()
+
+            assert sorted(movie['id'] for movie in crawler.crawled) == ['tt0000001', 'tt0000002', 'tt0000003']
+            assert not any('tt0000001' in path or 'tt0000002' in path for _, path in server.requests)
+            with open(os.path.join(directory, 'IMDB_crawled.json')) as f:
+                assert len(json.load(f)) == 3
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    test_stopped_crawling_is_resumed()
+    print('Crawler resumes correctly')
@@ -0,0 +1,46 @@
+import tempfile
+
+from sample_index import movies
+from Logic.core.indexer.document_store import Document_store
+
+
+def test_get_documents_across_blocks():
+    documents = [{'id': 'tt%07d' % number, 'title': f'Movie {number}', 'rating': str(number % 10)}
+                 for number in range(50)]
+    with tempfile.TemporaryDirectory() as directory:
+        Document_store.store_documents(documents, directory + '/', block_size=8)
+        store = Document_store(directory + '/', cache_size=2)
+        assert len(store) == 50 and len(store.blocks) == 7
+        assert 'tt0000049' in store and 'tt0000050' not in store
+
+        assert store.get('tt0000009') == documents[9]
+        assert store.get('tt0000050') is None
+        assert store.get('tt0000050', default={}) == {}
+        assert store.get('tt0000017', fields=['title', 'year']) == {'title': 'Movie 17', 'year': None}
+
+        doc_ids = ['tt0000049', 'tt0000000', 'tt0000050', 'tt0000008', 'tt0000001']
+        found = store.get_many(doc_ids, fields=['title'])
+        assert list(found) == ['tt0000049', 'tt0000000', 'tt0000008', 'tt0000001']
+        assert found['tt0000008'] == {'title': 'Movie 8'}
+        # only the last blocks stay decompressed
+        assert len(store.cache) == 2
+        store.close()
+
+
+def test_projection():
+    with tempfile.TemporaryDirectory() as directory:
+        Document_store.store_projection(movies, directory + '/')
+        Document_store.store_projection(movies, directory + '/', fields=('genres',))
+        projection = Document_store.load_projection(directory + '/')
+        genres = Document_store.load_projection(directory + '/', fields=('genres',))
+
+    assert projection['id'] == ['tt0000001', 'tt0000002', 'tt0000003']
+    assert projection['title'] == ['The Banker', 'The Family', 'The Knight']
+    assert projection['stars'][2] == ['Christian Bale', 'Heath Ledger']
+    assert list(genres) == ['id', 'genres']
+
+
+if __name__ == '__main__':
+    test_get_documents_across_blocks()
+    test_projection()
+    print('Document store tests passed.')
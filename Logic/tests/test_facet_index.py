@@ -0,0 +1,52 @@
+import tempfile
+
+from sample_index import build_index
+from Logic.core.indexer.facet_index import normalize_facet_value
+from Logic.core.indexer.indexes_enum import Indexes
+from Logic.core.search import SearchEngine
+
+
+def test_values_are_normalized():
+    assert normalize_facet_value('PG-13') == 'pg-13'
+    assert normalize_facet_value(' United  States ') == 'united states'
+    assert normalize_facet_value('') is None
+    assert normalize_facet_value(None) is None
+
+
+def test_facets_keep_the_crawled_values():
+    with tempfile.TemporaryDirectory() as directory:
+        build_index(directory + '/')
+        engine = SearchEngine(directory + '/')
+
+    assert sorted(engine.facet_index['mpaa']) == ['pg-13', 'r']
+    assert sorted(engine.facet_index['countries_of_origin']) == ['united kingdom', 'united states']
+    assert engine.find_faceted_documents({'mpaa': 'PG-13'}) == {'tt0000002', 'tt0000003'}
+    assert engine.find_faceted_documents({'countries_of_origin': ['United Kingdom']}) == {'tt0000003'}
+    assert engine.find_faceted_documents({'genres': ['Drama', 'Action'], 'mpaa': ['pg-13']}) == {
+        'tt0000002', 'tt0000003',
+    }
+    assert engine.find_faceted_documents({'genres': ['Horror']}) == set()
+
+
+def test_search_with_facets():
+    with tempfile.TemporaryDirectory() as directory:
+        build_index(directory + '/')
+        engine = SearchEngine(directory + '/')
+
+    weights = {Indexes.SUMMARIES: 1}
+    result, counts = engine.search(
+        'banker prison', 'OkapiBM25', weights, facet_filters={'mpaa': ['PG-13']},
+        facet_counts=['genres', 'languages'],
+    )
+    assert [doc_id for doc_id, _ in result] == ['tt0000002']
+    assert counts == {'genres': {'crime': 1, 'drama': 1}, 'languages': {'english': 1, 'italian': 1}}
+
+    result, counts = engine.search('banker prison', 'OkapiBM25', weights, facet_counts=['mpaa'])
+    assert counts == {'mpaa': {'r': 1, 'pg-13': 1}}
+
+
+if __name__ == '__main__':
+    test_values_are_normalized()
+    test_facets_keep_the_crawled_values()
+    test_search_with_facets()
+    print('Facet index tests passed.')
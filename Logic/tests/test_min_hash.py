@@ -0,0 +1,78 @@
+import random
+
+import numpy as np
+
+from Logic.core.indexer.LSH import MinHashLSH
+
+
+def make_documents(count=300, seed=0):
+    generator = random.Random(seed)
+    words = 'the a banker prison crime story movie years plot first end new old man woman city town house'.split()
+    documents = [' '.join(generator.choice(words) for _ in range(generator.randint(0, 40))) for _ in range(count)]
+    documents[1] = ''
+    return documents
+
+
+def test_signatures_are_the_minimum_hashes():
+    documents = make_documents()
+    # the documents are read from a generator in chunks, and hashed in batches
+    lsh = MinHashLSH((doc for doc in documents), 20, seed=1, chunk_size=70)
+    lsh.batch_size = 500
+    signature = lsh.min_hash_signature()
+
+    assert signature.shape == (20, len(documents))
+    for doc in [0, 1, 2, len(documents) - 1]:
+        hashes = lsh.hash_shingles(lsh.shingle_document(documents[doc])).tolist()
+        expected = [min(((a * x + b) % lsh.prime for x in hashes), default=lsh.prime) for a, b in zip(lsh.a.tolist(), lsh.b.tolist())]
+        assert signature[:, doc].tolist() == expected
+
+
+def test_signatures_estimate_jaccard_score():
+    documents = make_documents()
+    documents.append(documents[0] + ' town')
+    lsh = MinHashLSH(documents, 200, seed=1)
+    signature = lsh.min_hash_signature()
+    estimate = np.mean(signature[:, 0] == signature[:, -1])
+    score = lsh.jaccard_score(lsh.shingle_document(documents[0]), lsh.shingle_document(documents[-1]))
+    assert abs(estimate - score) < 0.15
+
+
+def test_characteristic_matrix_is_sparse():
+    documents = make_documents()
+    lsh = MinHashLSH(documents, 20, k=2, words=True, chunk_size=70)
+    matrix = lsh.build_characteristic_matrix()
+
+    assert matrix.format == 'csr' and matrix.shape == (len(documents), lsh.prime)
+    for doc in [0, 1, len(documents) - 1]:
+        shingles = lsh.shingle_document(documents[doc], 2, words=True)
+        assert sorted(matrix[doc].indices.tolist()) == sorted(lsh.hash_shingles(shingles).tolist())
+    assert all(len(shingle.split()) == 2 for shingle in lsh.shingle_document(documents[0], 2, words=True))
+
+
+def test_candidate_pairs_share_a_band():
+    documents = make_documents()
+    documents += [documents[0], documents[2] + ' end', documents[2] + ' city end']
+    lsh = MinHashLSH(documents, 20, seed=1)
+    signature = lsh.min_hash_signature()
+    pairs = lsh.candidate_pairs(signature, bands=10, rows_per_band=2)
+
+    expected = [
+        [first, second]
+        for first in range(len(documents)) for second in range(first + 1, len(documents))
+        if any((signature[i:i + 2, first] == signature[i:i + 2, second]).all() for i in range(0, 20, 2))
+    ]
+    assert pairs.tolist() == expected
+    assert [0, len(documents) - 3] in expected
+    assert lsh.candidate_pairs(signature, bands=10, rows_per_band=2, processes=2).tolist() == expected
+
+    buckets = lsh.lsh_buckets(signature, bands=10, rows_per_band=2)
+    bucket_pairs = {(first, second) for docs in buckets.values() for first in docs for second in docs if first < second}
+    assert sorted(bucket_pairs) == [tuple(pair) for pair in expected]
+
+
+if __name__ == '__main__':
+    test_signatures_are_the_minimum_hashes()
+    test_signatures_estimate_jaccard_score()
+    test_characteristic_matrix_is_sparse()
+    test_candidate_pairs_share_a_band()
+    print('Min-Hash signatures are correct')
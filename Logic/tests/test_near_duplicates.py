@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+
+from imdb_server import pages_path, start_server
+from Logic.core.indexer.index import Index
+from Logic.core.indexer.LSH import IncrementalMinHashLSH
+from Logic.core.utility.crawler import IMDbCrawler
+
+
+def test_near_duplicate_summaries_are_flagged():
+    with tempfile.TemporaryDirectory() as directory:
+        pages = os.path.join(directory, 'pages')
+        shutil.copytree(pages_path, pages)
+        # the third movie has the summaries of the first one
+        shutil.copy(os.path.join(pages, 'tt0000001_plotsummary.html'), os.path.join(pages, 'tt0000003_plotsummary.html'))
+        server = start_server(pages)
+        try:
+            crawler = IMDbCrawler(
+                crawling_threshold=10, base_URL=server.base_URL, max_workers=1, log_path=None, checkpoint_path=None,
+                near_duplicates=IncrementalMinHashLSH(),
+            )
+            crawler.start_crawling()
+        finally:
+            server.shutdown()
+
+    movies = {movie['id']: movie for movie in crawler.crawled}
+    assert movies['tt0000003']['near_duplicate_of'] == 'tt0000001'
+    assert 'near_duplicate_of' not in movies['tt0000001'] and 'near_duplicate_of' not in movies['tt0000002']
+    assert len(crawler.near_duplicates) == 2
+
+
+def test_near_duplicates_are_not_indexed():
+    documents = [
+        {'id': 'tt1', 'stars': ['anna'], 'genres': ['drama'], 'summaries': ['a banker is sent to prison for a crime']},
+        {'id': 'tt2', 'stars': ['ben'], 'genres': ['drama'], 'summaries': ['a family moves to a haunted house']},
+        {'id': 'tt3', 'stars': ['carl'], 'genres': ['drama'], 'summaries': ['a banker is sent to prison for a crime']},
+    ]
+    index = Index(documents, near_duplicates=IncrementalMinHashLSH())
+    assert sorted(index.index['documents']) == ['tt1', 'tt2']
+    assert 'tt3' not in index.index['stars'].get('carl', {})
+
+    index.add_document_to_index({'id': 'tt4', 'stars': ['dan'], 'genres': [], 'summaries': ['a family moves to a haunted house']})
+    assert 'tt4' not in index.index['documents']
+
+
+def test_added_again_replaces_the_signature():
+    lsh = IncrementalMinHashLSH()
+    assert lsh.add_if_unique('tt1', 'a banker is sent to prison for a crime') == []
+    # the summaries of tt1 changed, so its old summaries are free for another movie
+    assert lsh.add_if_unique('tt1', 'a family moves to a haunted house') == []
+    assert lsh.add_if_unique('tt2', 'a banker is sent to prison for a crime') == []
+    assert lsh.query('a family moves to a haunted house') == ['tt1']
+    assert len(lsh) == 2
+
+    # a movie that became a near duplicate is not kept with its old signature
+    assert lsh.add_if_unique('tt2', 'a family moves to a haunted house') == ['tt1']
+    assert lsh.query('a banker is sent to prison for a crime') == []
+    assert len(lsh) == 1 and all(not bucket or 'tt2' not in sum(bucket.values(), []) for bucket in lsh.buckets)
+
+
+def test_recrawled_summaries_replace_the_signature():
+    with tempfile.TemporaryDirectory() as directory:
+        pages = os.path.join(directory, 'pages')
+        shutil.copytree(pages_path, pages)
+        server = start_server(pages)
+        try:
+            crawler = IMDbCrawler(
+                crawling_threshold=10, base_URL=server.base_URL, max_workers=1, log_path=None, checkpoint_path=None,
+                near_duplicates=IncrementalMinHashLSH(),
+            )
+            crawler.start_crawling()
+            old_summaries = ' '.join(next(movie for movie in crawler.crawled if movie['id'] == 'tt0000001')['summaries'])
+            # the first movie gets the summaries of the second one
+            shutil.copy(os.path.join(pages, 'tt0000002_plotsummary.html'), os.path.join(pages, 'tt0000001_plotsummary.html'))
+            crawler.start_recrawling()
+        finally:
+            server.shutdown()
+
+    movies = {movie['id']: movie for movie in crawler.crawled}
+    assert movies['tt0000001']['near_duplicate_of'] == 'tt0000002'
+    assert len(crawler.near_duplicates) == 2
+    assert crawler.near_duplicates.query(old_summaries) == []
+
+
+if __name__ == '__main__':
+    test_near_duplicate_summaries_are_flagged()
+    test_near_duplicates_are_not_indexed()
+    test_added_again_replaces_the_signature()
+    test_recrawled_summaries_replace_the_signature()
+    print('Near duplicates are flagged')
@@ -0,0 +1,49 @@
+import json
+import tempfile
+
+from sample_index import build_index
+from Logic.core.indexer.indexes_enum import Indexes
+from Logic.core.indexer.numeric_index import Numeric_column
+from Logic.core.search import SearchEngine
+
+
+def test_values_are_parsed_from_the_crawled_documents():
+    with tempfile.TemporaryDirectory() as directory:
+        build_index(directory + '/')
+        with open(directory + '/documents_numeric.json', 'r') as file:
+            numeric_index = json.load(file)
+
+    assert numeric_index['rating'] == {
+        'values': [1.0, 9.0, 9.3], 'doc_ids': ['tt0000002', 'tt0000003', 'tt0000001'],
+    }
+    assert numeric_index['release_year']['values'] == [1972, 1994, 2008]
+    assert numeric_index['budget']['values'] == [6000000, 25000000, 185000000]
+    assert numeric_index['gross_worldwide']['doc_ids'] == ['tt0000001', 'tt0000002', 'tt0000003']
+
+
+def test_column_range():
+    column = Numeric_column([1.0, 8.0, 8.0, 9.3], ['a', 'b', 'c', 'd'])
+    assert list(column.range(8, None)) == ['b', 'c', 'd']
+    assert list(column.range(None, 8)) == ['a', 'b', 'c']
+    assert list(column.range(8.5, 9)) == []
+    assert list(column.range()) == ['a', 'b', 'c', 'd']
+
+
+def test_search_with_filters():
+    with tempfile.TemporaryDirectory() as directory:
+        build_index(directory + '/')
+        engine = SearchEngine(directory + '/')
+
+    weights = {Indexes.SUMMARIES: 1}
+    result = engine.search('banker prison', 'OkapiBM25', weights, filters={'rating': (8, None)})
+    assert [doc_id for doc_id, _ in result] == ['tt0000001']
+    result = engine.search('banker prison', 'OkapiBM25', weights, safe_ranking=False,
+                           filters={'rating': (8, None), 'release_year': (None, 1990)})
+    assert result == []
+
+
+if __name__ == '__main__':
+    test_values_are_parsed_from_the_crawled_documents()
+    test_column_range()
+    test_search_with_filters()
+    print('Numeric index tests passed.')
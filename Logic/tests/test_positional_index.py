@@ -0,0 +1,49 @@
+import tempfile
+
+from sample_index import build_index
+from Logic.core.indexer.indexes_enum import Indexes
+from Logic.core.indexer.positional_index import decode_positions, encode_positions, intersect_phrase, intersect_window
+from Logic.core.search import SearchEngine
+
+
+def test_positions_are_delta_encoded():
+    assert encode_positions([3, 7, 8, 20]) == [3, 4, 1, 12]
+    assert decode_positions(encode_positions([3, 7, 8, 20])) == [3, 7, 8, 20]
+
+
+def test_phrase_intersection():
+    # "a b c" starts at 1 and 10, at 5 "b" is not followed by "c"
+    assert intersect_phrase([[1, 5, 10], [2, 6, 11], [3, 12]]) == [1, 10]
+    assert intersect_phrase([[1, 5], [3, 7]]) == []
+
+
+def test_window_intersection():
+    assert intersect_window([[1, 20], [3, 30]], 2) == [1]
+    assert intersect_window([[1, 20], [3, 30]], 1) == []
+    # the order of the terms does not matter in a window
+    assert intersect_window([[5], [3]], 2) == [3]
+
+
+def test_phrase_and_window_search_with_unsafe_ranking():
+    with tempfile.TemporaryDirectory() as directory:
+        build_index(directory + '/')
+        engine = SearchEngine(directory + '/')
+
+    weights = {Indexes.STARS: 0, Indexes.GENRES: 0, Indexes.SUMMARIES: 1}
+    for safe_ranking in [True, False]:
+        result = engine.search('banker prison', 'OkapiBM25', weights, safe_ranking=safe_ranking)
+        assert sorted(doc_id for doc_id, _ in result) == ['tt0000001', 'tt0000002']
+
+        result = engine.search('banker sent prison', 'OkapiBM25', weights, safe_ranking=safe_ranking, phrase=True)
+        assert [doc_id for doc_id, _ in result] == ['tt0000001']
+
+        result = engine.search('banker prison', 'ltn.lnn', weights, safe_ranking=safe_ranking, window=2)
+        assert sorted(doc_id for doc_id, _ in result) == ['tt0000001']
+
+
+if __name__ == '__main__':
+    test_positions_are_delta_encoded()
+    test_phrase_intersection()
+    test_window_intersection()
+    test_phrase_and_window_search_with_unsafe_ranking()
+    print('Positional index tests passed.')
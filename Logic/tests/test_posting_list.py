@@ -0,0 +1,52 @@
+import tempfile
+from bisect import bisect_left
+
+from sample_index import build_index
+from Logic.core.indexer.indexes_enum import Indexes
+from Logic.core.indexer.posting_list import Posting_list, intersect_posting_lists
+from Logic.core.search import SearchEngine
+
+
+def test_advance_matches_a_linear_scan():
+    doc_ids = ['tt%07d' % number for number in range(0, 200, 3)]
+    posting_list = Posting_list({doc_id: 1 for doc_id in doc_ids})
+    targets = ['tt%07d' % number for number in range(-1, 202)]
+    for start in [0, 1, 7, 30, len(doc_ids) - 1, len(doc_ids)]:
+        for target in targets:
+            expected = max(start, bisect_left(doc_ids, target))
+            assert posting_list.advance(target, start) == expected, (target, start)
+
+
+def test_advance_on_short_lists():
+    assert Posting_list({}).advance('tt1') == 0
+    assert Posting_list({'tt2': 1}).advance('tt1') == 0
+    assert Posting_list({'tt2': 1}).advance('tt3') == 1
+
+
+def test_intersection():
+    first = Posting_list({'tt%07d' % number: 1 for number in range(0, 1000, 2)})
+    second = Posting_list({'tt%07d' % number: 1 for number in range(0, 1000, 3)})
+    third = Posting_list({'tt0000006': 2, 'tt0000007': 1, 'tt0000600': 1, 'tt0000999': 1})
+    assert intersect_posting_lists([first, second, third]) == ['tt0000006', 'tt0000600']
+    assert intersect_posting_lists([first, Posting_list({'tt0000001': 1})]) == []
+    assert intersect_posting_lists([]) == []
+
+
+def test_conjunctive_search():
+    with tempfile.TemporaryDirectory() as directory:
+        build_index(directory + '/')
+        engine = SearchEngine(directory + '/')
+
+    weights = {Indexes.GENRES: 1}
+    result = engine.search('crime drama', 'OkapiBM25', weights)
+    assert sorted(doc_id for doc_id, _ in result) == ['tt0000001', 'tt0000002', 'tt0000003']
+    result = engine.search('crime drama', 'OkapiBM25', weights, conjunctive=True)
+    assert [doc_id for doc_id, _ in result] == ['tt0000002']
+
+
+if __name__ == '__main__':
+    test_advance_matches_a_linear_scan()
+    test_advance_on_short_lists()
+    test_intersection()
+    test_conjunctive_search()
+    print('Posting list tests passed.')
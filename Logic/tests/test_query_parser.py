@@ -0,0 +1,49 @@
+import tempfile
+
+from sample_index import build_index
+from Logic.core.search import SearchEngine
+from Logic.core.utility.query_parser import QueryParser
+
+
+def parse(query):
+    return repr(QueryParser(lambda text: text.lower().split()).parse(query))
+
+
+def test_parse_fields_and_operators():
+    assert parse('stars:"Tom Hanks" AND genres:drama') == '(stars:"tom hanks" AND genres:drama)'
+    assert parse('genres:drama -genres:horror') == '(genres:drama AND NOT genres:horror)'
+    # AND binds tighter than OR
+    assert parse('genres:a genres:b OR genres:c') == '((genres:a AND genres:b) OR genres:c)'
+    assert parse('genres:(a OR b) NOT c') == (
+        '((genres:a OR genres:b) AND NOT (stars:c OR genres:c OR summaries:c))'
+    )
+
+
+def test_parse_malformed_queries():
+    assert parse('') == 'None'
+    assert parse('AND OR') == 'None'
+    assert parse('genres:(drama') == 'genres:drama'
+    assert parse('genres:drama) genres:crime') == '(genres:drama AND genres:crime)'
+    # a field that does not exist is kept as a part of the term
+    assert parse('year:1994') == '(stars:year:1994 OR genres:year:1994 OR summaries:year:1994)'
+
+
+def test_boolean_search():
+    with tempfile.TemporaryDirectory() as directory:
+        build_index(directory + '/')
+        engine = SearchEngine(directory + '/')
+
+    assert engine.boolean_search('genres:crime') == ['tt0000002', 'tt0000003']
+    assert engine.boolean_search('genres:crime -genres:drama') == ['tt0000003']
+    assert engine.boolean_search('genres:crime OR stars:freeman') == ['tt0000001', 'tt0000002', 'tt0000003']
+    assert engine.boolean_search('summaries:"banker sent prison"') == ['tt0000001']
+    assert engine.boolean_search('summaries:"prison banker"') == []
+    assert engine.boolean_search('-banker') == ['tt0000003']
+    assert engine.boolean_search('genres:crime', max_results=1) == ['tt0000002']
+
+
+if __name__ == '__main__':
+    test_parse_fields_and_operators()
+    test_parse_malformed_queries()
+    test_boolean_search()
+    print('Query parser tests passed.')
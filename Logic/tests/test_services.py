@@ -0,0 +1,38 @@
+import os
+import tempfile
+import time
+
+from sample_index import build_index
+from Logic.core.indexer.document_store import Document_store
+from Logic.services import Services
+
+
+def test_objects_are_shared_until_the_indexes_change():
+    with tempfile.TemporaryDirectory() as directory:
+        path = directory + '/'
+        build_index(path)
+        services = Services(path, check_interval=0, context_spell_correction=False)
+
+        search_engine = services.search_engine
+        assert services.search_engine is search_engine
+
+        # writing the SymSpell dictionary next to the indexes does not reload anything
+        spell_correction = services.spell_correction
+        assert os.path.exists(path + Services.symspell_file)
+        assert services.search_engine is search_engine
+        assert services.spell_correction is spell_correction
+
+        # a newer document store makes the dictionary stale, and it is rebuilt only once
+        future = time.time() + 60
+        os.utime(Document_store.get_path(path, '.bin'), (future, future))
+        assert services.search_engine is not search_engine
+        search_engine = services.search_engine
+        spell_correction = services.spell_correction
+        assert services.search_engine is search_engine
+        assert services.spell_correction is spell_correction
+        services.reload()
+
+
+if __name__ == '__main__':
+    test_objects_are_shared_until_the_indexes_change()
+    print('Services tests passed.')
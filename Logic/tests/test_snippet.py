@@ -0,0 +1,88 @@
+import json
+import tempfile
+
+from Logic.core.indexer.document_store import Document_store
+from Logic.core.indexer.snippet_index import Snippet_index, index_tokens
+from Logic.core.utility.snippet import Snippet
+
+doc = "A banker's life: Andy is sent to Shawshank prison, where he befriends Red and plans an escape."
+
+
+def test_tokens_keep_their_offsets():
+    tokens = index_tokens(doc)
+    assert tokens['positions']['banker\'s'] == [1]
+    assert tokens['positions']['shawshank'] == [7]
+    start, end = tokens['offsets'][7]
+    assert doc[start:end] == 'Shawshank'
+    assert index_tokens('') == {'positions': {}, 'offsets': []}
+
+
+def test_snippet_index_is_built_from_the_store():
+    documents = [
+        {'id': 'tt1', 'first_page_summary': doc},
+        {'id': 'tt2', 'first_page_summary': None},
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        Document_store.store_documents(documents, directory + '/')
+        Snippet_index(directory + '/')
+        with open(directory + '/documents_snippet.json', 'r') as file:
+            snippet_index = json.load(file)
+
+    assert snippet_index == {'tt1': index_tokens(doc), 'tt2': index_tokens('')}
+
+
+def test_find_snippet():
+    snippet = Snippet(number_of_words_on_each_side=2)
+    final_snippet, not_exist_words = snippet.find_snippet(doc, 'the shawshank escape of morgan')
+    assert final_snippet == 'sent to ***Shawshank*** prison, where ... plans an ***escape***'
+    assert not_exist_words == ['morgan']
+
+    # the overlapping windows are merged
+    final_snippet, _ = snippet.find_snippet(doc, 'shawshank prison')
+    assert final_snippet == 'sent to ***Shawshank*** ***prison***, where he'
+
+
+def test_outdated_snippet_index_is_not_used():
+    snippet = Snippet(number_of_words_on_each_side=1, snippet_index={'tt1': index_tokens(doc + ' Andy escapes.')})
+    assert snippet.get_tokens(doc, 'tt1') == index_tokens(doc)
+    assert snippet.get_tokens(doc + ' Andy escapes.', 'tt1') == index_tokens(doc + ' Andy escapes.')
+    final_snippet, _ = snippet.find_snippet(doc, 'red', doc_id='tt1')
+    assert final_snippet == 'befriends ***Red*** and'
+
+
+def test_best_snippet_covers_the_rarest_words():
+    docs = {
+        'tt1': 'prison prison prison. Years later the prison guard finds the letter of Andy in the prison yard.',
+        'tt2': 'A prison drama.',
+        'tt3': 'A prison escape.',
+    }
+    snippet = Snippet(snippet_index={doc_id: index_tokens(text) for doc_id, text in docs.items()})
+    assert snippet.get_idf('letter') > snippet.get_idf('prison')
+
+    # the first window has more occurrences of "prison", but only the later one has both words
+    final_snippet, not_exist_words = snippet.find_best_snippet(docs['tt1'], 'prison letter', 'tt1', max_length=5)
+    assert final_snippet == '... ***prison*** guard finds the ***letter*** ...'
+    assert not_exist_words == []
+
+    final_snippet, _ = snippet.find_best_snippet(docs['tt1'], 'prison yard', 'tt1', max_length=4)
+    assert final_snippet == '... in the ***prison*** ***yard***'
+
+    snippets = snippet.find_best_snippets([docs['tt2'], ''], 'prison', ['tt2', None], max_length=2)
+    assert snippets == [('... ***prison*** drama', []), ('', ['prison'])]
+
+
+def test_highlight():
+    snippet = Snippet()
+    assert snippet.highlight(doc, 'red escape', template='<b>{}</b>') == doc.replace(
+        'Red', '<b>Red</b>').replace('escape', '<b>escape</b>')
+    assert snippet.highlight('...', 'red') == '...'
+
+
+if __name__ == '__main__':
+    test_tokens_keep_their_offsets()
+    test_snippet_index_is_built_from_the_store()
+    test_find_snippet()
+    test_outdated_snippet_index_is_not_used()
+    test_best_snippet_covers_the_rarest_words()
+    test_highlight()
+    print('Snippet tests passed.')
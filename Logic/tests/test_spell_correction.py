@@ -0,0 +1,113 @@
+import os
+import tempfile
+from collections import Counter
+
+from Logic.core.utility.spell_correction import SpellCorrection, SymSpellCorrection, edit_distance
+from Logic.utils import correct_text
+
+documents = [
+    'tim robbins morgan freeman banker sent prison crime never committed',
+    'marlon brando al pacino prison story old banker family',
+    'christian bale heath ledger batman fight joker gotham city',
+    'robin robins robbing prison prisoner banner banker banker',
+]
+
+
+def find_nearest_words_by_scanning(spell_correction, word):
+    shingled_word = spell_correction.shingle_word(word)
+    scored = []
+    for candidate, shingles in spell_correction.all_shingled_words.items():
+        score = spell_correction.jaccard_score(shingled_word, shingles)
+        if score > 0 and score >= spell_correction.jaccard_threshold:
+            scored.append((candidate, score))
+    scored.sort(key=lambda x: (x[1], spell_correction.word_counter[x[0]]), reverse=True)
+    return [candidate for candidate, _ in scored[:5]]
+
+
+def rank(spell_correction, word, candidate):
+    score = spell_correction.jaccard_score(
+        spell_correction.shingle_word(word), spell_correction.all_shingled_words[candidate]
+    )
+    return score, spell_correction.word_counter[candidate]
+
+
+def test_prefix_filter_finds_the_same_words_as_a_scan():
+    for threshold in [0.1, 0.2, 0.5, 0.8]:
+        spell_correction = SpellCorrection(documents, jaccard_threshold=threshold)
+        for word in ['robins', 'prisn', 'banekr', 'bnker', 'gothm', 'freman', 'x', 'ab', 'committed']:
+            found = spell_correction.find_nearest_words(word)
+            expected = find_nearest_words_by_scanning(spell_correction, word)
+            # the words with equal scores and frequencies can come in any order
+            assert [rank(spell_correction, word, candidate) for candidate in found] == [
+                rank(spell_correction, word, candidate) for candidate in expected
+            ], (threshold, word)
+
+
+def test_spell_check():
+    spell_correction = SpellCorrection(documents)
+    assert spell_correction.spell_check('prisn bnker') == 'prison banker'
+    assert spell_correction.find_nearest_words('a') == []
+
+
+def test_correct_text():
+    assert correct_text('The prisn of the bnker', documents) == 'the prison of the banker'
+    # a query that needs no correction is returned as it was typed
+    assert correct_text('The  Prison of the Banker', documents) == 'The  Prison of the Banker'
+
+
+def test_edit_distance():
+    assert edit_distance('banker', 'banker') == 0
+    assert edit_distance('banker', 'bnker') == 1
+    assert edit_distance('banker', 'bankre') == 1
+    assert edit_distance('banker', 'bankre', transpositions=False) == 2
+    assert edit_distance('banker', 'bank', max_distance=1) is None
+
+
+def test_symspell_finds_the_words_within_the_edit_distance():
+    spell_correction = SymSpellCorrection(documents, max_edit_distance=2)
+    words = set(' '.join(documents).split())
+    for word in ['prisn', 'banekr', 'robns', 'gothm', 'joker', 'xyz']:
+        expected = sorted(
+            (edit_distance(word, candidate), -spell_correction.word_counter[candidate], candidate)
+            for candidate in words if edit_distance(word, candidate) <= 2
+        )
+        assert spell_correction.find_nearest_words(word) == [candidate for _, _, candidate in expected[:5]], word
+    assert spell_correction.spell_check('prisn bnker') == 'prison banker'
+
+
+class Vocabulary:
+    def __init__(self, frequencies):
+        self.frequencies = Counter(frequencies)
+
+
+def test_symspell_dictionary_is_rebuilt_when_it_does_not_match():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'symspell.json')
+        SymSpellCorrection(documents, max_edit_distance=1, path=path)
+
+        loaded = SymSpellCorrection(path=path, max_edit_distance=1)
+        assert loaded.find_nearest_words('bnker') == ['banker']
+
+        # other settings rebuild the stored words with them
+        loaded = SymSpellCorrection(path=path, max_edit_distance=2, prefix_length=5)
+        assert (loaded.max_edit_distance, loaded.prefix_length) == (2, 5)
+        assert loaded.find_nearest_words('bnker') == ['banker', 'banner', 'joker']
+        assert SymSpellCorrection(path=path, max_edit_distance=2, prefix_length=5).deletes == loaded.deletes
+
+        # another vocabulary replaces the stored one
+        loaded = SymSpellCorrection(path=path, max_edit_distance=2, prefix_length=5,
+                                    vocabulary=Vocabulary({'batman': 3, 'joker': 1}))
+        assert loaded.find_nearest_words('bnker') == ['joker']
+        assert set(SymSpellCorrection(path=path, max_edit_distance=2, prefix_length=5).word_counter) == {
+            'batman', 'joker',
+        }
+
+
+if __name__ == '__main__':
+    test_prefix_filter_finds_the_same_words_as_a_scan()
+    test_spell_check()
+    test_correct_text()
+    test_edit_distance()
+    test_symspell_finds_the_words_within_the_edit_distance()
+    test_symspell_dictionary_is_rebuilt_when_it_does_not_match()
+    print('Spell correction tests passed.')
@@ -0,0 +1,50 @@
+import tempfile
+
+from sample_index import build_index, preprocessed_movies
+from Logic.core.indexer.index import Index
+from Logic.core.indexer.vocabulary_index import Vocabulary_index
+
+
+def test_vocabulary_of_the_indexes():
+    with tempfile.TemporaryDirectory() as directory:
+        build_index(directory + '/')
+        built = Vocabulary_index(directory + '/')
+        loaded = Vocabulary_index.load(directory + '/')
+
+    assert loaded.frequencies == built.frequencies and loaded.shingles == built.shingles
+    assert loaded.frequencies['banker'] == 2 and loaded.frequencies['freeman'] == 1
+    # genres are not a part of the vocabulary
+    assert 'drama' not in loaded.frequencies
+    assert loaded.shingles['joker'] == {'jo', 'ok', 'ke', 'er'}
+
+
+def test_vocabulary_follows_the_index():
+    with tempfile.TemporaryDirectory() as directory:
+        build_index(directory + '/')
+        vocabulary = Vocabulary_index(directory + '/')
+    frequencies = dict(vocabulary.frequencies)
+    shingles = dict(vocabulary.shingles)
+
+    index = Index(preprocessed_movies, vocabulary=vocabulary)
+    document = {
+        'id': 'tt0000004', 'stars': ['morgan freeman'], 'genres': ['thriller'],
+        'summaries': ['banker hunt serial killer'],
+    }
+    index.add_document_to_index(document)
+    assert vocabulary.frequencies['banker'] == 3 and vocabulary.frequencies['freeman'] == 2
+    assert vocabulary.frequencies['killer'] == 1 and 'ki' in vocabulary.shingles['killer']
+    assert 'thriller' not in vocabulary.frequencies
+
+    index.remove_document_from_index('tt0000004')
+    assert dict(vocabulary.frequencies) == frequencies
+    assert vocabulary.shingles == shingles
+
+    index.remove_document_from_index('tt0000003')
+    assert 'joker' not in vocabulary.frequencies and 'joker' not in vocabulary.shingles
+    assert vocabulary.frequencies['banker'] == 2
+
+
+if __name__ == '__main__':
+    test_vocabulary_of_the_indexes()
+    test_vocabulary_follows_the_index()
+    print('Vocabulary index tests passed.')
@@ -3,15 +3,56 @@ from .core.search import SearchEngine
 from .core.utility.spell_correction import SpellCorrection
 from .core.utility.snippet import Snippet
 from .core.indexer.indexes_enum import Indexes, Index_types
+from .core.utility.preprocess import Preprocessor
+from .core.indexer.document_store import Document_store
+from .services import Services
 import json
 
 
-movies_dataset = None  # TODO: load your movies dataset (from the json file you saved your indexes in), here
-# You can refer to `get_movie_by_id` to see how this is used.
-# search_engine = SearchEngine()
+# the search engine, spell corrector, document store and snippet generator, shared by all the sessions
+services = Services()
+# the fields of a movie that are shown in the UI
+movie_fields = ["id", "title", "first_page_summary", "directors", "stars", "genres"]
 
 
-def correct_text(text: str, all_documents: List[str]) -> str:
+def get_search_engine() -> SearchEngine:
+    """
+    Get the shared search engine, it is loaded on the first call.
+
+    Returns
+    ----------
+    SearchEngine
+        The search engine
+    """
+    return services.search_engine
+
+
+def get_movies_dataset() -> Document_store:
+    """
+    Get the shared document store of the movies, it is opened on the first call.
+    Opening it only reads the offset table, the movies are read when they are requested.
+
+    Returns
+    ----------
+    Document_store
+        The document store
+    """
+    return services.movies_dataset
+
+
+def get_movies_projection() -> Dict[str, list]:
+    """
+    Get the titles and stars of all the movies, they are loaded on the first call.
+
+    Returns
+    ----------
+    dict
+        The columns of the projection with the structure of {"id": [...], "title": [...], "stars": [...]}
+    """
+    return services.movies_projection
+
+
+def correct_text(text: str, all_documents: List[str] = None) -> str:
     """
     Correct the give query text, if it is misspelled using Jacard similarity
 
@@ -20,16 +61,28 @@ def correct_text(text: str, all_documents: List[str]) -> str:
     text: str
         The query text
     all_documents : list of str
-        The input documents.
+        The input documents. If None, the shared spell corrector of the indexed movies is used.
 
     Returns
     str
         The corrected form of the given text
     """
-    # TODO: You can add any preprocessing steps here, if needed!
-    spell_correction_obj = SpellCorrection(all_documents)
-    text = spell_correction_obj.spell_check(text)
-    return text
+    if all_documents is None:
+        spell_correction_obj = services.spell_correction
+    else:
+        spell_correction_obj = SpellCorrection(all_documents)
+    # the indexed vocabulary has no stopwords, so they are kept as they are and the
+    # other words are corrected together, in the context of each other
+    stopwords = Preprocessor([]).stopwords
+    words = text.lower().split()
+    positions = [i for i, word in enumerate(words) if word not in stopwords]
+    corrected = spell_correction_obj.spell_check(" ".join(words[i] for i in positions)).split()
+    # a query that needs no correction is kept with its own case and spacing
+    if all(words[i] == word for i, word in zip(positions, corrected)):
+        return text
+    for i, word in zip(positions, corrected):
+        words[i] = word
+    return " ".join(words)
 
 
 def search(
@@ -42,6 +95,7 @@ def search(
     smoothing_method = None, 
     alpha=0.5, 
     lamda=0.5, 
+    fuzzy_distance: int = None,
 ):
     """
     Finds relevant documents to query
@@ -63,22 +117,41 @@ def search(
             Indexes.SUMMARIES: weights[2],
 
     preferred_genre:
-        A list containing preference rates for each genre. If None, the preference rates are equal.
-        (You can leave it None for now)
+        A genre (or a list of genres) that the retrieved movies must have. If None, all genres are accepted.
+
+    fuzzy_distance:
+        If given, the query words also match the star names that are at most this many edits away.
 
     Returns
     ----------------------------------------------------------------------------------------------------
     list
     Retrieved documents with snippet
     """
-    # weights = ...  # TODO
-    # return search_engine.search(
-    #     query, method, weights, max_results=max_result_count, safe_ranking=True
-    # )
-    return None
-
-
-def get_movie_by_id(id: str, movies_dataset: List[Dict[str, str]]) -> Dict[str, str]:
+    weights = {
+        Indexes.STARS: weights[0],
+        Indexes.GENRES: weights[1],
+        Indexes.SUMMARIES: weights[2],
+    }
+    facet_filters = None
+    if preferred_genre:
+        genres = [preferred_genre] if isinstance(preferred_genre, str) else preferred_genre
+        facet_filters = {"genres": genres}
+
+    return get_search_engine().search(
+        query,
+        method,
+        weights,
+        max_results=max_result_count if max_result_count != -1 else None,
+        safe_ranking=True,
+        smoothing_method=smoothing_method,
+        alpha=alpha,
+        lamda=lamda,
+        facet_filters=facet_filters,
+        fuzzy_distance=fuzzy_distance,
+    )
+
+
+def get_movie_by_id(id: str, movies_dataset: Document_store = None) -> Dict[str, str]:
     """
     Get movie by its id
 
@@ -87,31 +160,60 @@ def get_movie_by_id(id: str, movies_dataset: List[Dict[str, str]]) -> Dict[str,
     id: str
         The id of the movie
 
-    movies_dataset: List[Dict[str, str]]
-        The dataset of movies
+    movies_dataset: Document_store
+        The dataset of movies. If None, the shared document store is used.
 
     Returns
     ----------------------------------------------------------------------------------------------------
     dict
         The movie with the given id
     """
-    # result = movies_dataset.get(
-    #     id,
-    #     {
-    #         "Title": "This is movie's title",
-    #         "Summary": "This is a summary",
-    #         "URL": "https://www.imdb.com/title/tt0111161/",
-    #         "Cast": ["Morgan Freeman", "Tim Robbins"],
-    #         "Genres": ["Drama", "Crime"],
-    #         "Image_URL": "https://m.media-amazon.com/images/M/MV5BNDE3ODcxYzMtY2YzZC00NmNlLWJiNDMtZDViZWM2MzIxZDYwXkEyXkFqcGdeQXVyNjAwNDUxODI@._V1_.jpg",
-    #     },
-    # )
-
-    # result["Image_URL"] = (
-    #     "https://m.media-amazon.com/images/M/MV5BNDE3ODcxYzMtY2YzZC00NmNlLWJiNDMtZDViZWM2MzIxZDYwXkEyXkFqcGdeQXVyNjAwNDUxODI@._V1_.jpg"  # a default picture for selected movies
-    # )
-    # result["URL"] = (
-    #     f"https://www.imdb.com/title/{result['id']}"  # The url pattern of IMDb movies
-    # )
-    # return result
-    return None
+    return get_movies_by_ids([id], movies_dataset)[0]
+
+
+def get_movies_by_ids(ids: List[str], movies_dataset: Document_store = None) -> List[Dict[str, str]]:
+    """
+    Get movies by their ids. Only the fields that are shown in the UI are read, and every block
+    of the document store is decompressed once for the whole list.
+
+    Parameters
+    ---------------------------------------------------------------------------------------------------
+    ids: List[str]
+        The ids of the movies
+
+    movies_dataset: Document_store
+        The dataset of movies. If None, the shared document store is used.
+
+    Returns
+    ----------------------------------------------------------------------------------------------------
+    list
+        The movies with the given ids, in the same order
+    """
+    if movies_dataset is None:
+        movies_dataset = get_movies_dataset()
+    movies = movies_dataset.get_many(ids, fields=movie_fields)
+
+    results = []
+    for id in ids:
+        result = movies.get(
+            id,
+            {
+                "id": id,
+                "title": "This is movie's title",
+                "first_page_summary": "This is a summary",
+                "directors": [],
+                "stars": ["Morgan Freeman", "Tim Robbins"],
+                "genres": ["Drama", "Crime"],
+            },
+        )
+        for field in ["directors", "stars", "genres"]:
+            result[field] = result[field] or []
+        result["first_page_summary"] = result["first_page_summary"] or ""
+        result["Image_URL"] = (
+            "https://m.media-amazon.com/images/M/MV5BNDE3ODcxYzMtY2YzZC00NmNlLWJiNDMtZDViZWM2MzIxZDYwXkEyXkFqcGdeQXVyNjAwNDUxODI@._V1_.jpg"  # a default picture for selected movies
+        )
+        result["URL"] = (
+            f"https://www.imdb.com/title/{result['id']}"  # The url pattern of IMDb movies
+        )
+        results.append(result)
+    return results
@@ -6,11 +6,7 @@ from Logic import utils
 import time
 from enum import Enum
 import random
-from Logic.core.utility.snippet import Snippet
 from Logic.core.link_analysis.analyzer import LinkAnalyzer
-from Logic.core.indexer.index_reader import Index_reader, Indexes
-
-snippet_obj = Snippet()
 
 
 class color(Enum):
@@ -23,42 +19,54 @@ class color(Enum):
     MAGENTA = "#FF00FF"
 
 
+@st.cache_resource
+def warm_up_services():
+    """
+    Loads the search engine, spell corrector, document store and snippet generator once per
+    process, when the first session starts. All the sessions share them through `utils.services`.
+    """
+    utils.services.warm_up()
+    return utils.services
+
+
+@st.cache_resource
+def get_link_analysis_corpus():
+    """
+    Builds the corpus of the link analysis once, from the title and stars columns of the movies,
+    and shares it between all the sessions.
+    """
+    columns = utils.get_movies_projection()
+    corpus = [
+        {"id": movie_id, "title": movie_title, "stars": stars or []}
+        for movie_id, movie_title, stars in zip(
+            columns["id"], columns["title"], columns["stars"]
+        )
+    ]
+    movies_by_id = {movie["id"]: movie for movie in corpus}
+    return corpus, movies_by_id
+
+
 def get_top_x_movies_by_rank(x: int, results: list):
-    path = "../Logic/core/index/"  # Link to the index folder
-    document_index = Index_reader(path, Indexes.DOCUMENTS)
-    corpus = []
-    root_set = []
-    for movie_id, movie_detail in document_index.index.items():
-        movie_title = movie_detail["title"]
-        stars = movie_detail["stars"]
-        corpus.append({"id": movie_id, "title": movie_title, "stars": stars})
-
-    for element in results:
-        movie_id = element[0]
-        movie_detail = document_index.index[movie_id]
-        movie_title = movie_detail["title"]
-        stars = movie_detail["stars"]
-        root_set.append({"id": movie_id, "title": movie_title, "stars": stars})
+    corpus, movies_by_id = get_link_analysis_corpus()
+    root_set = [
+        movies_by_id[element[0]] for element in results if element[0] in movies_by_id
+    ]
     analyzer = LinkAnalyzer(root_set=root_set)
     analyzer.expand_graph(corpus=corpus)
     actors, movies = analyzer.hits(max_result=x)
     return actors, movies
 
 
-def get_summary_with_snippet(movie_info, query):
-    summary = movie_info["first_page_summary"]
-    snippet, not_exist_words = snippet_obj.find_snippet(summary, query)
-    if "***" in snippet:
-        snippet = snippet.split()
-        for i in range(len(snippet)):
-            current_word = snippet[i]
-            if current_word.startswith("***") and current_word.endswith("***"):
-                current_word_without_star = current_word[3:-3]
-                summary = summary.lower().replace(
-                    current_word_without_star,
-                    f"<b><font size='4' color={random.choice(list(color)).value}>{current_word_without_star}</font></b>",
-                )
-    return summary
+def get_summaries_with_snippets(movie_infos, query, max_length=50):
+    template = f"<b><font size='4' color={random.choice(list(color)).value}>{{}}</font></b>"
+    snippets = utils.services.snippet.find_best_snippets(
+        [info["first_page_summary"] for info in movie_infos],
+        query,
+        [info["id"] for info in movie_infos],
+        max_length=max_length,
+        template=template,
+    )
+    return [snippet for snippet, _ in snippets]
 
 
 def search_time(start, end):
@@ -91,14 +99,16 @@ def search_handling(
             st.divider()
 
         st.markdown(f"**Top {num_filter_results} Movies:**")
+        infos = utils.get_movies_by_ids(top_movies)
+        summaries = get_summaries_with_snippets(infos, search_term)
         for i in range(len(top_movies)):
             card = st.columns([3, 1])
-            info = utils.get_movie_by_id(top_movies[i], utils.movies_dataset)
+            info = infos[i]
             with card[0].container():
                 st.title(info["title"])
                 st.markdown(f"[Link to movie]({info['URL']})")
                 st.markdown(
-                    f"<b><font size = '4'>Summary:</font></b> {get_summary_with_snippet(info, search_term)}",
+                    f"<b><font size = '4'>Summary:</font></b> {summaries[i]}",
                     unsafe_allow_html=True,
                 )
 
@@ -130,9 +140,9 @@ def search_handling(
         return
 
     if search_button:
-        corrected_query = utils.correct_text(search_term, utils.all_documents)
+        corrected_query = utils.correct_text(search_term)
 
-        if corrected_query != search_term:
+        if corrected_query != search_term.lower():
             st.warning(f"Your search terms were corrected to: {corrected_query}")
             search_term = corrected_query
 
@@ -158,15 +168,17 @@ def search_handling(
 
             search_time(start_time, end_time)
 
+        infos = utils.get_movies_by_ids([movie_id for movie_id, _ in result])
+        summaries = get_summaries_with_snippets(infos, search_term)
         for i in range(len(result)):
             card = st.columns([3, 1])
-            info = utils.get_movie_by_id(result[i][0], utils.movies_dataset)
+            info = infos[i]
             with card[0].container():
                 st.title(info["title"])
                 st.markdown(f"[Link to movie]({info['URL']})")
                 st.write(f"Relevance Score: {result[i][1]}")
                 st.markdown(
-                    f"<b><font size = '4'>Summary:</font></b> {get_summary_with_snippet(info, search_term)}",
+                    f"<b><font size = '4'>Summary:</font></b> {summaries[i]}",
                     unsafe_allow_html=True,
                 )
 
@@ -205,6 +217,7 @@ def search_handling(
 
 
 def main():
+    warm_up_services()
     st.title("Search Engine")
     st.write(
         "This is a simple search engine for IMDB movies. You can search through IMDB dataset and find the most relevant movie to your search terms."